@@ -14,7 +14,8 @@ if config.config_file_name is not None:
 target_metadata = Base.metadata
 
 def get_url():
-    return settings.DATABASE_URL.replace("postgresql://", "postgresql+asyncpg://")
+    # Миграции выполняются синхронно (psycopg2), приложение работает через asyncpg
+    return settings.DATABASE_URL.replace("postgresql+asyncpg://", "postgresql://", 1)
 
 def run_migrations_offline() -> None:
     url = get_url()
@@ -51,4 +52,3 @@ if context.is_offline_mode():
     run_migrations_offline()
 else:
     run_migrations_online()
-
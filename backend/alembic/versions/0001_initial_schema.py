@@ -0,0 +1,165 @@
+"""Initial schema
+
+Revision ID: 0001
+Revises: 
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0001'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+ENUM_TYPES = ('appealstatus', 'appealcategory', 'appealpriority', 'enrichmentstatus', 'userrole')
+
+
+def upgrade() -> None:
+    op.create_table('analytics_events',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('event_type', sa.String(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=True),
+    sa.Column('appeal_id', sa.Integer(), nullable=True),
+    sa.Column('metadata', sa.JSON(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_analytics_events_id'), 'analytics_events', ['id'], unique=False)
+    op.create_table('appeal_stats_daily',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('status', sa.Enum('PENDING', 'IN_PROGRESS', 'RESOLVED', 'REJECTED', 'CLOSED', name='appealstatus'), nullable=False),
+    sa.Column('category', sa.Enum('ROADS', 'LIGHTING', 'IMPROVEMENT', 'ECOLOGY', 'SAFETY', 'HEALTHCARE', 'UTILITIES', 'SOCIAL', 'OTHER', name='appealcategory'), nullable=False),
+    sa.Column('priority', sa.Enum('LOW', 'MEDIUM', 'HIGH', 'URGENT', name='appealpriority'), nullable=False),
+    sa.Column('district', sa.String(), nullable=False),
+    sa.Column('sentiment', sa.String(), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.Column('resolved_with_time', sa.Integer(), nullable=False),
+    sa.Column('resolution_hours_sum', sa.Float(), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('day', 'status', 'category', 'priority', 'district', 'sentiment', name='uq_appeal_stats_daily_bucket')
+    )
+    op.create_index(op.f('ix_appeal_stats_daily_day'), 'appeal_stats_daily', ['day'], unique=False)
+    op.create_index(op.f('ix_appeal_stats_daily_id'), 'appeal_stats_daily', ['id'], unique=False)
+    op.create_table('departments',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('email', sa.String(), nullable=True),
+    sa.Column('phone', sa.String(), nullable=True),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('name')
+    )
+    op.create_index(op.f('ix_departments_id'), 'departments', ['id'], unique=False)
+    op.create_table('users',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('email', sa.String(), nullable=False),
+    sa.Column('phone', sa.String(), nullable=True),
+    sa.Column('full_name', sa.String(), nullable=False),
+    sa.Column('hashed_password', sa.String(), nullable=True),
+    sa.Column('role', sa.Enum('CITIZEN', 'OPERATOR', 'ADMIN', name='userrole'), nullable=False),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.Column('is_admin', sa.Boolean(), nullable=True),
+    sa.Column('is_verified', sa.Boolean(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_users_email'), 'users', ['email'], unique=True)
+    op.create_index(op.f('ix_users_id'), 'users', ['id'], unique=False)
+    op.create_index(op.f('ix_users_phone'), 'users', ['phone'], unique=True)
+    op.create_table('appeals',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('title', sa.String(), nullable=False),
+    sa.Column('description', sa.Text(), nullable=False),
+    sa.Column('category', sa.Enum('ROADS', 'LIGHTING', 'IMPROVEMENT', 'ECOLOGY', 'SAFETY', 'HEALTHCARE', 'UTILITIES', 'SOCIAL', 'OTHER', name='appealcategory'), nullable=False),
+    sa.Column('status', sa.Enum('PENDING', 'IN_PROGRESS', 'RESOLVED', 'REJECTED', 'CLOSED', name='appealstatus'), nullable=False),
+    sa.Column('priority', sa.Enum('LOW', 'MEDIUM', 'HIGH', 'URGENT', name='appealpriority'), nullable=False),
+    sa.Column('latitude', sa.Float(), nullable=True),
+    sa.Column('longitude', sa.Float(), nullable=True),
+    sa.Column('address', sa.String(), nullable=True),
+    sa.Column('district', sa.String(), nullable=True),
+    sa.Column('images', sa.JSON(), nullable=True),
+    sa.Column('audio', sa.String(), nullable=True),
+    sa.Column('ai_summary', sa.Text(), nullable=True),
+    sa.Column('ai_sentiment', sa.String(), nullable=True),
+    sa.Column('ai_confidence', sa.Float(), nullable=True),
+    sa.Column('is_duplicate', sa.Boolean(), nullable=True),
+    sa.Column('duplicate_of', sa.Integer(), nullable=True),
+    sa.Column('minhash_signature', sa.JSON(), nullable=True),
+    sa.Column('enrichment_status', sa.Enum('PENDING', 'COMPLETED', 'FAILED', name='enrichmentstatus'), nullable=False),
+    sa.Column('enriched_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('department_id', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('resolved_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['department_id'], ['departments.id'], ),
+    sa.ForeignKeyConstraint(['duplicate_of'], ['appeals.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_appeals_id'), 'appeals', ['id'], unique=False)
+    op.create_table('appeal_embeddings',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('appeal_id', sa.Integer(), nullable=False),
+    sa.Column('model', sa.String(), nullable=False),
+    sa.Column('vector', sa.LargeBinary(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['appeal_id'], ['appeals.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('appeal_id')
+    )
+    op.create_index(op.f('ix_appeal_embeddings_id'), 'appeal_embeddings', ['id'], unique=False)
+    op.create_table('appeal_lsh_buckets',
+    sa.Column('bucket', sa.BigInteger(), nullable=False),
+    sa.Column('appeal_id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['appeal_id'], ['appeals.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('bucket', 'appeal_id')
+    )
+    op.create_index(op.f('ix_appeal_lsh_buckets_appeal_id'), 'appeal_lsh_buckets', ['appeal_id'], unique=False)
+    op.create_table('comments',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('text', sa.Text(), nullable=False),
+    sa.Column('is_internal', sa.Boolean(), nullable=True),
+    sa.Column('appeal_id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['appeal_id'], ['appeals.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_comments_id'), 'comments', ['id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_comments_id'), table_name='comments')
+    op.drop_table('comments')
+    op.drop_index(op.f('ix_appeal_lsh_buckets_appeal_id'), table_name='appeal_lsh_buckets')
+    op.drop_table('appeal_lsh_buckets')
+    op.drop_index(op.f('ix_appeal_embeddings_id'), table_name='appeal_embeddings')
+    op.drop_table('appeal_embeddings')
+    op.drop_index(op.f('ix_appeals_id'), table_name='appeals')
+    op.drop_table('appeals')
+    op.drop_index(op.f('ix_users_phone'), table_name='users')
+    op.drop_index(op.f('ix_users_id'), table_name='users')
+    op.drop_index(op.f('ix_users_email'), table_name='users')
+    op.drop_table('users')
+    op.drop_index(op.f('ix_departments_id'), table_name='departments')
+    op.drop_table('departments')
+    op.drop_index(op.f('ix_appeal_stats_daily_id'), table_name='appeal_stats_daily')
+    op.drop_index(op.f('ix_appeal_stats_daily_day'), table_name='appeal_stats_daily')
+    op.drop_table('appeal_stats_daily')
+    op.drop_index(op.f('ix_analytics_events_id'), table_name='analytics_events')
+    op.drop_table('analytics_events')
+    # Типы перечислений PostgreSQL не удаляются вместе с таблицами
+    if op.get_bind().dialect.name == 'postgresql':
+        for name in ENUM_TYPES:
+            op.execute(f'DROP TYPE IF EXISTS {name}')
@@ -0,0 +1,46 @@
+"""Indexes for appeal list, enrichment queue and comments queries
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 12:10:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+# Сортировка списка: created_at DESC, id DESC (в том числе для курсора)
+ORDER = [sa.text('created_at DESC'), sa.text('id DESC')]
+
+INDEXES = [
+    ('ix_appeals_created_at_id', 'appeals', ORDER, {}),
+    ('ix_appeals_user_id_created_at', 'appeals', ['user_id'] + ORDER, {}),
+    ('ix_appeals_status_created_at', 'appeals', ['status'] + ORDER, {}),
+    ('ix_appeals_category_created_at', 'appeals', ['category'] + ORDER, {}),
+    (
+        'ix_appeals_enrichment_pending',
+        'appeals',
+        ['id'],
+        {'postgresql_where': sa.text("enrichment_status = 'PENDING'")}
+    ),
+    ('ix_comments_appeal_id_created_at', 'comments', ['appeal_id', 'created_at'], {}),
+]
+
+
+def upgrade() -> None:
+    # CONCURRENTLY не блокирует запись в таблицы, но не работает внутри транзакции
+    with op.get_context().autocommit_block():
+        for name, table, columns, kwargs in INDEXES:
+            op.create_index(name, table, columns, postgresql_concurrently=True, **kwargs)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True)
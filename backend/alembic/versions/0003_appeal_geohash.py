@@ -0,0 +1,76 @@
+"""Geohash column and index for area queries on appeals
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 15:40:00.000000
+
+"""
+from alembic import context, op
+import sqlalchemy as sa
+from app.core import geohash
+from app.core.config import settings
+
+
+# revision identifiers, used by Alembic.
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 1000
+
+
+def upgrade() -> None:
+    op.add_column('appeals', sa.Column('geohash', sa.String(length=12), nullable=True))
+
+    # Заполнение для существующих обращений с координатами. geohash считается в Python,
+    # поэтому в режиме --sql заполнение пропускается: после применения SQL-скрипта
+    # выполните python scripts/backfill_geohash.py
+    if not context.is_offline_mode():
+        _backfill()
+
+    # CONCURRENTLY не работает внутри транзакции
+    with op.get_context().autocommit_block():
+        op.create_index('ix_appeals_geohash', 'appeals', ['geohash'], postgresql_concurrently=True)
+
+
+def _backfill() -> None:
+    conn = op.get_bind()
+    appeals = sa.table(
+        'appeals',
+        sa.column('id', sa.Integer),
+        sa.column('latitude', sa.Float),
+        sa.column('longitude', sa.Float),
+        sa.column('geohash', sa.String)
+    )
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            sa.select(appeals.c.id, appeals.c.latitude, appeals.c.longitude)
+            .where(
+                appeals.c.id > last_id,
+                appeals.c.latitude.isnot(None),
+                appeals.c.longitude.isnot(None)
+            )
+            .order_by(appeals.c.id)
+            .limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        conn.execute(
+            appeals.update().where(appeals.c.id == sa.bindparam('appeal_id')),
+            [
+                {
+                    'appeal_id': row.id,
+                    'geohash': geohash.encode(row.latitude, row.longitude, settings.GEOHASH_PRECISION)
+                }
+                for row in rows
+            ]
+        )
+        last_id = rows[-1].id
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_appeals_geohash', table_name='appeals', postgresql_concurrently=True)
+    op.drop_column('appeals', 'geohash')
@@ -0,0 +1,24 @@
+"""Enrichment claim timestamp on appeals
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-19 10:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0007'
+down_revision = '0006'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('appeals', sa.Column('enrichment_claimed_at', sa.DateTime(timezone=True), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('appeals', 'enrichment_claimed_at')
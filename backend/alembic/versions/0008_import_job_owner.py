@@ -0,0 +1,24 @@
+"""Import job lease owner
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0008'
+down_revision = '0007'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('import_jobs', sa.Column('owner', sa.String(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('import_jobs', 'owner')
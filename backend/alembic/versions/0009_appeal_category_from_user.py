@@ -0,0 +1,27 @@
+"""Flag for appeal categories chosen by the author
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0009'
+down_revision = '0008'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'appeals',
+        sa.Column('category_from_user', sa.Boolean(), nullable=False, server_default=sa.false())
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('appeals', 'category_from_user')
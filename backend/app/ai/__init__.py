@@ -1,5 +1,6 @@
 from app.ai.classifier import AIClassifier
 from app.ai.analyzer import AIAnalyzer
+from app.ai.combined import CombinedAnalyzer
 
-__all__ = ["AIClassifier", "AIAnalyzer"]
+__all__ = ["AIClassifier", "AIAnalyzer", "CombinedAnalyzer"]
 
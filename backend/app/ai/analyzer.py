@@ -1,15 +1,19 @@
-import openai
 from typing import Dict
 from app.core.config import settings
+from app.ai.cache import AIResultCache
+from app.ai.llm import chat_json
+from app.core.metrics import LLM_FALLBACKS
+from app.ai.rules import RuleMatch, match_rules
+
+# Версию нужно увеличивать при изменении промпта — это сбрасывает кэш ответов
+PROMPT_VERSION = 1
+
+sentiment_cache = AIResultCache("sentiment", PROMPT_VERSION)
 
 
 class AIAnalyzer:
     """Анализатор тональности и содержания обращений"""
     
-    def __init__(self):
-        if settings.OPENAI_API_KEY:
-            openai.api_key = settings.OPENAI_API_KEY
-    
     async def analyze_sentiment(self, text: str) -> Dict[str, any]:
         """Анализ тональности обращения"""
         if settings.OPENAI_API_KEY:
@@ -19,9 +23,11 @@ class AIAnalyzer:
     
     async def _analyze_with_gpt(self, text: str) -> Dict[str, any]:
         """Анализ тональности с GPT"""
+        cached = await sentiment_cache.get(text)
+        if cached is not None:
+            return self._parse_gpt_result(cached)
+        
         try:
-            client = openai.OpenAI(api_key=settings.OPENAI_API_KEY)
-            
             prompt = f"""Определи тональность следующего обращения: positive, negative, или neutral.
 
 Обращение: {text}
@@ -32,35 +38,36 @@ class AIAnalyzer:
     "confidence": 0.0-1.0
 }}"""
             
-            response = client.chat.completions.create(
-                model=settings.AI_MODEL,
-                messages=[
-                    {"role": "system", "content": "Ты помощник для анализа тональности. Отвечай только валидным JSON."},
-                    {"role": "user", "content": prompt}
-                ],
+            result = await chat_json(
+                "Ты помощник для анализа тональности. Отвечай только валидным JSON.",
+                prompt,
+                max_tokens=50,
                 temperature=0.3,
-                max_tokens=50
+                operation="sentiment"
             )
-            
-            import json
-            result = json.loads(response.choices[0].message.content)
-            
-            return {
-                "sentiment": result.get("sentiment", "neutral"),
-                "confidence": float(result.get("confidence", 0.7))
-            }
-        except Exception as e:
+            parsed = self._parse_gpt_result(result)
+        except Exception:
+            LLM_FALLBACKS.inc(operation="sentiment")
             return self._analyze_with_rules(text)
+        
+        await sentiment_cache.set(text, result)
+        return parsed
+    
+    def _parse_gpt_result(self, result: Dict) -> Dict[str, any]:
+        """Разбор JSON-ответа модели"""
+        return {
+            "sentiment": result.get("sentiment", "neutral"),
+            "confidence": float(result.get("confidence", 0.7))
+        }
     
     def _analyze_with_rules(self, text: str) -> Dict[str, any]:
         """Правило-основанный анализ тональности"""
-        text_lower = text.lower()
-        
-        negative_words = ["плохо", "ужасно", "не работает", "сломан", "проблема", "жалоба"]
-        positive_words = ["спасибо", "хорошо", "отлично", "благодарю"]
-        
-        negative_count = sum(1 for word in negative_words if word in text_lower)
-        positive_count = sum(1 for word in positive_words if word in text_lower)
+        return self._analyze_match(match_rules(text))
+    
+    def _analyze_match(self, match: RuleMatch) -> Dict[str, any]:
+        """Тональность по найденным ключевым словам"""
+        negative_count = match.negative_count
+        positive_count = match.positive_count
         
         if negative_count > positive_count:
             sentiment = "negative"
@@ -76,4 +83,3 @@ class AIAnalyzer:
             "sentiment": sentiment,
             "confidence": confidence
         }
-
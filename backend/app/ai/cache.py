@@ -0,0 +1,122 @@
+import hashlib
+import json
+import logging
+import re
+from typing import Dict, List, Optional
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.redis import get_redis
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_text(text: str) -> str:
+    """Нормализация текста для ключа кэша: регистр, ё, пробелы"""
+    return _WHITESPACE.sub(" ", text.lower().replace("ё", "е")).strip()
+
+
+class AIResultCache:
+    """
+    Кэш ответов модели с адресацией по содержимому.
+    Ключ: хеш нормализованного текста + модель + версия промпта.
+    Первый уровень — LRU в процессе, второй (опционально) — Redis.
+    """
+
+    _instances: List["AIResultCache"] = []
+
+    def __init__(self, namespace: str, prompt_version: int):
+        self.namespace = namespace
+        self.prompt_version = prompt_version
+        self.local = TTLCache(max_size=settings.AI_CACHE_MAX_SIZE, ttl=settings.AI_CACHE_TTL)
+        self.hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+        AIResultCache._instances.append(self)
+
+    @classmethod
+    def all(cls) -> List["AIResultCache"]:
+        return list(cls._instances)
+
+    @property
+    def prefix(self) -> str:
+        return f"ai:{self.namespace}:"
+
+    def make_key(self, text: str) -> str:
+        digest = hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()
+        # Смена модели или промпта дает новые ключи — старые записи вытеснит TTL/LRU
+        return f"{self.prefix}{settings.AI_MODEL}:v{self.prompt_version}:{digest}"
+
+    def _redis(self):
+        return get_redis() if settings.AI_CACHE_REDIS else None
+
+    async def get(self, text: str) -> Optional[Dict]:
+        """Поиск ответа модели для текста"""
+        if not settings.AI_CACHE_ENABLED:
+            return None
+
+        key = self.make_key(text)
+        value = self.local.get(key)
+        if value is not None:
+            self.hits += 1
+            return value
+
+        redis = self._redis()
+        if redis is not None:
+            try:
+                raw = await redis.get(key)
+            except Exception as e:
+                logger.warning("AI cache: redis get failed: %s", e)
+                raw = None
+            if raw is not None:
+                value = json.loads(raw)
+                self.local.set(key, value)
+                self.redis_hits += 1
+                return value
+
+        self.misses += 1
+        return None
+
+    async def set(self, text: str, value: Dict):
+        """Сохранение ответа модели"""
+        if not settings.AI_CACHE_ENABLED:
+            return
+
+        key = self.make_key(text)
+        self.local.set(key, value)
+
+        redis = self._redis()
+        if redis is not None:
+            try:
+                await redis.set(key, json.dumps(value, ensure_ascii=False), ex=settings.AI_CACHE_TTL)
+            except Exception as e:
+                logger.warning("AI cache: redis set failed: %s", e)
+
+    async def invalidate(self) -> int:
+        """Удаление всех записей кэша (например, после изменения промпта)"""
+        removed = len(self.local)
+        self.local.clear()
+
+        redis = self._redis()
+        if redis is not None:
+            try:
+                keys = [key async for key in redis.scan_iter(match=f"{self.prefix}*", count=500)]
+                for i in range(0, len(keys), 500):
+                    removed += await redis.unlink(*keys[i:i + 500])
+            except Exception as e:
+                logger.warning("AI cache: redis invalidate failed: %s", e)
+        return removed
+
+    def stats(self) -> Dict:
+        lookups = self.hits + self.redis_hits + self.misses
+        return {
+            "namespace": self.namespace,
+            "model": settings.AI_MODEL,
+            "prompt_version": self.prompt_version,
+            "size": len(self.local),
+            "hits": self.hits,
+            "redis_hits": self.redis_hits,
+            "misses": self.misses,
+            "hit_rate": round((self.hits + self.redis_hits) / lookups, 4) if lookups else 0.0
+        }
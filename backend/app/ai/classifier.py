@@ -1,28 +1,20 @@
-import openai
 from typing import Dict, Optional
 from app.core.config import settings
+from app.ai import minhash
+from app.ai.cache import AIResultCache
+from app.ai.llm import chat_json
+from app.core.metrics import LLM_FALLBACKS
+from app.ai.rules import RuleMatch, match_rules
 from app.models.appeal import AppealCategory, AppealPriority
 
-# Категории и их ключевые слова для классификации
-CATEGORY_KEYWORDS = {
-    AppealCategory.ROADS: ["дорога", "яма", "асфальт", "тротуар", "транспорт", "пробка", "парковка"],
-    AppealCategory.LIGHTING: ["освещение", "фонарь", "свет", "темно", "лампа"],
-    AppealCategory.IMPROVEMENT: ["благоустройство", "скамейка", "парк", "сквер", "двор", "детская площадка"],
-    AppealCategory.ECOLOGY: ["мусор", "отходы", "экология", "свалка", "загрязнение", "воздух"],
-    AppealCategory.SAFETY: ["безопасность", "опасно", "травма", "авария", "преступление"],
-    AppealCategory.HEALTHCARE: ["больница", "поликлиника", "врач", "здоровье", "медицина"],
-    AppealCategory.UTILITIES: ["коммунальные", "вода", "отопление", "электричество", "канализация"],
-    AppealCategory.SOCIAL: ["социальная помощь", "пенсия", "льготы", "инвалид", "малоимущий"],
-}
+# Версию нужно увеличивать при изменении промпта — это сбрасывает кэш ответов
+PROMPT_VERSION = 1
 
+classification_cache = AIResultCache("classification", PROMPT_VERSION)
 
 class AIClassifier:
     """Классификатор обращений с использованием AI"""
     
-    def __init__(self):
-        if settings.OPENAI_API_KEY:
-            openai.api_key = settings.OPENAI_API_KEY
-    
     async def classify_appeal(
         self,
         title: str,
@@ -40,11 +32,23 @@ class AIClassifier:
             # Fallback на правило-основанную классификацию
             return self._classify_with_rules(text)
     
+    def classify_with_rules(
+        self,
+        title: str,
+        description: str
+    ) -> Dict[str, any]:
+        """
+        Быстрая классификация по правилам, без обращения к внешним API
+        """
+        return self._classify_with_rules(f"{title}\n{description}")
+    
     async def _classify_with_gpt(self, text: str) -> Dict[str, any]:
         """Классификация с использованием GPT"""
+        cached = await classification_cache.get(text)
+        if cached is not None:
+            return self._parse_gpt_result(cached)
+        
         try:
-            client = openai.OpenAI(api_key=settings.OPENAI_API_KEY)
-            
             prompt = f"""Проанализируй следующее обращение гражданина и определи:
 1. Категорию из списка: roads, lighting, improvement, ecology, safety, healthcare, utilities, social, other
 2. Приоритет: low, medium, high, urgent
@@ -60,38 +64,38 @@ class AIClassifier:
     "confidence": 0.0-1.0
 }}"""
             
-            response = client.chat.completions.create(
-                model=settings.AI_MODEL,
-                messages=[
-                    {"role": "system", "content": "Ты помощник для классификации обращений граждан. Отвечай только валидным JSON."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=settings.AI_TEMPERATURE,
-                max_tokens=200
+            result = await chat_json(
+                "Ты помощник для классификации обращений граждан. Отвечай только валидным JSON.",
+                prompt,
+                max_tokens=200,
+                operation="classify"
             )
-            
-            import json
-            result = json.loads(response.choices[0].message.content)
-            
-            return {
-                "category": AppealCategory(result.get("category", "other")),
-                "priority": AppealPriority(result.get("priority", "medium")),
-                "summary": result.get("summary", ""),
-                "confidence": float(result.get("confidence", 0.7))
-            }
-        except Exception as e:
+            parsed = self._parse_gpt_result(result)
+        except Exception:
             # Fallback на правила
+            LLM_FALLBACKS.inc(operation="classify")
             return self._classify_with_rules(text)
+        
+        await classification_cache.set(text, result)
+        return parsed
+    
+    def _parse_gpt_result(self, result: Dict) -> Dict[str, any]:
+        """Разбор JSON-ответа модели"""
+        return {
+            "category": AppealCategory(result.get("category", "other")),
+            "priority": AppealPriority(result.get("priority", "medium")),
+            "summary": result.get("summary", ""),
+            "confidence": float(result.get("confidence", 0.7))
+        }
     
     def _classify_with_rules(self, text: str) -> Dict[str, any]:
         """Правило-основанная классификация"""
-        text_lower = text.lower()
-        
+        return self._classify_match(text, match_rules(text))
+    
+    def _classify_match(self, text: str, match: RuleMatch) -> Dict[str, any]:
+        """Категория и приоритет по найденным ключевым словам"""
         # Определение категории
-        category_scores = {}
-        for category, keywords in CATEGORY_KEYWORDS.items():
-            score = sum(1 for keyword in keywords if keyword in text_lower)
-            category_scores[category] = score
+        category_scores = match.category_scores
         
         if category_scores:
             category = max(category_scores, key=category_scores.get)
@@ -101,12 +105,9 @@ class AIClassifier:
             category = AppealCategory.OTHER
         
         # Определение приоритета
-        urgent_keywords = ["срочно", "опасно", "авария", "травма", "пожар"]
-        high_keywords = ["важно", "критично", "не работает", "сломан"]
-        
-        if any(keyword in text_lower for keyword in urgent_keywords):
+        if match.urgent:
             priority = AppealPriority.URGENT
-        elif any(keyword in text_lower for keyword in high_keywords):
+        elif match.high:
             priority = AppealPriority.HIGH
         elif len(text) < 50:
             priority = AppealPriority.LOW
@@ -125,16 +126,16 @@ class AIClassifier:
         new_text: str,
         existing_texts: list[str]
     ) -> Optional[int]:
-        """Определение дубликатов обращений"""
-        # Упрощенная проверка на дубликаты
-        # В продакшне можно использовать embeddings
-        new_text_lower = new_text.lower()
+        """
+        Определение дубликата среди переданных текстов по оценке MinHash.
+        Поиск по всей базе обращений — DuplicateService.
+        """
+        new_signature = minhash.signature(new_text)
         
+        best_idx, best_score = None, settings.DUPLICATE_THRESHOLD
         for idx, existing_text in enumerate(existing_texts):
-            existing_lower = existing_text.lower()
-            # Простая проверка на схожесть
-            if len(set(new_text_lower.split()) & set(existing_lower.split())) > 5:
-                return idx
+            score = minhash.similarity(new_signature, minhash.signature(existing_text))
+            if score >= best_score:
+                best_idx, best_score = idx, score
         
-        return None
-
+        return best_idx
@@ -0,0 +1,113 @@
+from typing import Dict
+from app.core.config import settings
+from app.ai.cache import AIResultCache
+from app.ai.llm import chat_json
+from app.core.metrics import LLM_FALLBACKS
+from app.ai.classifier import AIClassifier
+from app.ai.analyzer import AIAnalyzer
+from app.ai.rules import match_rules
+from app.models.appeal import AppealCategory, AppealPriority
+
+SENTIMENTS = ("positive", "negative", "neutral")
+
+# Версию нужно увеличивать при изменении промпта — это сбрасывает кэш ответов
+PROMPT_VERSION = 1
+
+analysis_cache = AIResultCache("analysis", PROMPT_VERSION)
+
+
+class CombinedAnalyzer:
+    """Классификация и анализ тональности обращения одним запросом к модели"""
+
+    def __init__(self):
+        self.classifier = AIClassifier()
+        self.analyzer = AIAnalyzer()
+
+    async def analyze_appeal(
+        self,
+        title: str,
+        description: str
+    ) -> Dict[str, any]:
+        """
+        Возвращает категорию, приоритет, резюме и тональность обращения
+        """
+        text = f"{title}\n{description}"
+
+        if settings.OPENAI_API_KEY:
+            return await self._analyze_with_gpt(text)
+        else:
+            return self._analyze_with_rules(text)
+
+    def analyze_with_rules(
+        self,
+        title: str,
+        description: str
+    ) -> Dict[str, any]:
+        """
+        Анализ только по правилам, без обращения к модели (массовый импорт)
+        """
+        return self._analyze_with_rules(f"{title}\n{description}")
+
+    async def _analyze_with_gpt(self, text: str) -> Dict[str, any]:
+        """Один запрос к GPT вместо двух отдельных"""
+        cached = await analysis_cache.get(text)
+        if cached is not None:
+            return self._parse_gpt_result(cached)
+
+        try:
+            prompt = f"""Проанализируй следующее обращение гражданина и определи:
+1. Категорию из списка: roads, lighting, improvement, ecology, safety, healthcare, utilities, social, other
+2. Приоритет: low, medium, high, urgent
+3. Краткое резюме проблемы (1-2 предложения)
+4. Тональность: positive, negative, neutral
+
+Обращение: {text}
+
+Ответь в формате JSON:
+{{
+    "category": "category_name",
+    "priority": "priority_level",
+    "summary": "краткое резюме",
+    "confidence": 0.0-1.0,
+    "sentiment": "positive|negative|neutral",
+    "sentiment_confidence": 0.0-1.0
+}}"""
+
+            result = await chat_json(
+                "Ты помощник для классификации обращений граждан. Отвечай только валидным JSON.",
+                prompt,
+                max_tokens=250,
+                operation="analysis"
+            )
+            parsed = self._parse_gpt_result(result)
+        except Exception:
+            # Fallback на правила
+            LLM_FALLBACKS.inc(operation="analysis")
+            return self._analyze_with_rules(text)
+
+        await analysis_cache.set(text, result)
+        return parsed
+
+    def _parse_gpt_result(self, result: Dict) -> Dict[str, any]:
+        """Разбор и проверка JSON-ответа модели"""
+        sentiment = result.get("sentiment", "neutral")
+        if sentiment not in SENTIMENTS:
+            raise ValueError(f"Unknown sentiment: {sentiment}")
+
+        return {
+            "category": AppealCategory(result.get("category", "other")),
+            "priority": AppealPriority(result.get("priority", "medium")),
+            "summary": result.get("summary", ""),
+            "confidence": float(result.get("confidence", 0.7)),
+            "sentiment": sentiment,
+            "sentiment_confidence": float(result.get("sentiment_confidence", 0.7))
+        }
+
+    def _analyze_with_rules(self, text: str) -> Dict[str, any]:
+        """Правило-основанный анализ за один проход по тексту"""
+        match = match_rules(text)
+        result = self.classifier._classify_match(text, match)
+        sentiment_result = self.analyzer._analyze_match(match)
+        result["sentiment"] = sentiment_result["sentiment"]
+        result["sentiment_confidence"] = sentiment_result["confidence"]
+        return result
@@ -0,0 +1,104 @@
+import asyncio
+import logging
+import threading
+from typing import List, Optional, Set, Tuple
+import numpy as np
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+try:
+    import torch
+    from transformers import AutoModel, AutoTokenizer
+except ImportError:  # torch/transformers не установлены — семантический поиск отключен
+    torch = None
+
+
+class EmbeddingEngine:
+    """
+    Локальные эмбеддинги текстов на CPU (transformers, mean pooling).
+    Параллельные запросы склеиваются в батчи, модель загружается при первом обращении.
+    """
+
+    def __init__(self):
+        self._model = None
+        self._tokenizer = None
+        self._load_lock = threading.Lock()
+        self._pending: List[Tuple[str, asyncio.Future]] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._batches: Set[asyncio.Task] = set()  # ссылки на задачи батчей, чтобы их не собрал GC
+
+    @property
+    def available(self) -> bool:
+        return settings.EMBEDDINGS_ENABLED and torch is not None
+
+    def _load(self):
+        with self._load_lock:
+            if self._model is None:
+                torch.set_num_threads(settings.EMBEDDING_THREADS)
+                self._tokenizer = AutoTokenizer.from_pretrained(settings.EMBEDDING_MODEL)
+                model = AutoModel.from_pretrained(settings.EMBEDDING_MODEL)
+                model.eval()
+                self._model = model
+                logger.info("Embedding model loaded: %s", settings.EMBEDDING_MODEL)
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        """Синхронное вычисление нормализованных эмбеддингов (вызывать вне event loop)"""
+        self._load()
+        result = []
+        batch_size = settings.EMBEDDING_BATCH_SIZE
+        with torch.inference_mode():
+            for i in range(0, len(texts), batch_size):
+                batch = self._tokenizer(
+                    texts[i:i + batch_size],
+                    padding=True,
+                    truncation=True,
+                    max_length=256,
+                    return_tensors="pt"
+                )
+                output = self._model(**batch).last_hidden_state
+                mask = batch["attention_mask"].unsqueeze(-1).to(output.dtype)
+                pooled = (output * mask).sum(dim=1) / mask.sum(dim=1).clamp(min=1e-9)
+                pooled = torch.nn.functional.normalize(pooled, dim=1)
+                result.append(pooled.cpu().numpy().astype(np.float32))
+        return np.vstack(result)
+
+    async def encode_async(self, texts: List[str]) -> np.ndarray:
+        """Вычисление эмбеддингов пачки текстов в отдельном потоке"""
+        return await asyncio.to_thread(self.encode, texts)
+
+    async def embed(self, text: str) -> np.ndarray:
+        """Эмбеддинг одного текста; одновременные вызовы объединяются в общий батч"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((text, future))
+        if len(self._pending) >= settings.EMBEDDING_BATCH_SIZE:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(settings.EMBEDDING_BATCH_DELAY, self._flush)
+        return await future
+
+    def _flush(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.ensure_future(self._run_batch(batch))
+            self._batches.add(task)
+            task.add_done_callback(self._batches.discard)
+
+    async def _run_batch(self, batch: List[Tuple[str, asyncio.Future]]):
+        try:
+            vectors = await self.encode_async([text for text, _ in batch])
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, future), vector in zip(batch, vectors):
+            if not future.done():
+                future.set_result(vector)
+
+
+embedding_engine = EmbeddingEngine()
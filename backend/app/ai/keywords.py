@@ -0,0 +1,144 @@
+import re
+from collections import deque
+from typing import Dict, Hashable, Iterable, List, Set, Tuple
+
+_WORD = re.compile(r"[0-9a-zа-я]+")
+
+# Падежные окончания существительных и прилагательных, от длинных к коротким
+_ENDINGS = sorted(
+    [
+        "иями", "ями", "ами", "ией", "иям", "ием", "иях",
+        "ого", "его", "ому", "ему", "ими", "ыми",
+        "ая", "яя", "ое", "ее", "ие", "ые", "ый", "ий", "ой", "ей",
+        "ом", "ем", "ам", "ям", "ах", "ях", "ов", "ев",
+        "им", "ым", "их", "ых", "ию", "ия", "ии", "ую", "юю",
+        "а", "я", "о", "е", "ы", "и", "у", "ю", "ь", "й",
+    ],
+    key=len,
+    reverse=True
+)
+_MIN_STEM = 2
+
+# Окончания глаголов 3-го лица: "не работает" / "не работают"
+_VERB_ENDINGS = ["ает", "яет", "ают", "яют", "ет", "ют", "ут", "ит", "ат", "ят"]
+_MIN_VERB_STEM = 4
+
+# Сколько букв основы слова в тексте может выходить за основу ключевого слова
+# ("сломанн|ый" -> "сломан", "темнот|а" -> "темн")
+_MAX_EXTRA = 2
+_MIN_PREFIX_STEM = 3
+
+# Размер кэша "словоформа -> основы": словарь обращений ограничен, стемминг дорогой
+_TOKEN_CACHE_SIZE = 200_000
+_RESET = ("",)
+
+
+def stem(word: str) -> str:
+    """Упрощенный стемминг: отбрасывание падежного или глагольного окончания"""
+    for ending in _VERB_ENDINGS:
+        if word.endswith(ending) and len(word) - len(ending) >= _MIN_VERB_STEM:
+            return word[:-len(ending)]
+    for ending in _ENDINGS:
+        if word.endswith(ending) and len(word) - len(ending) >= _MIN_STEM:
+            return word[:-len(ending)]
+    return word
+
+
+def tokenize(text: str) -> List[str]:
+    """Разбиение текста на основы слов"""
+    return [stem(word) for word in _WORD.findall(text.lower().replace("ё", "е"))]
+
+
+class KeywordMatcher:
+    """
+    Автомат Ахо-Корасик над последовательностью основ слов.
+    Находит все ключевые слова и фразы из всех групп за один проход по тексту;
+    совпадения учитываются только по границам слов и не зависят от падежа.
+    """
+
+    def __init__(self, groups: Dict[Hashable, Iterable[str]]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[Tuple[Hashable, str]]] = [[]]
+        self._vocabulary: Set[str] = set()
+        self._token_cache: Dict[str, Tuple[str, ...]] = {}
+
+        for group, keywords in groups.items():
+            for keyword in keywords:
+                tokens = tokenize(keyword)
+                self._vocabulary.update(tokens)
+                self._add(tokens, (group, keyword))
+        self._build_failure_links()
+
+    def _canonical(self, token: str) -> str:
+        """Приведение основы слова из текста к основе ключевого слова, если она является ее началом"""
+        if token in self._vocabulary:
+            return token
+        for length in range(len(token) - 1, max(len(token) - _MAX_EXTRA, _MIN_PREFIX_STEM) - 1, -1):
+            prefix = token[:length]
+            if prefix in self._vocabulary:
+                return prefix
+        return token
+
+    def _add(self, tokens: List[str], value: Tuple[Hashable, str]):
+        node = 0
+        for token in tokens:
+            next_node = self._goto[node].get(token)
+            if next_node is None:
+                next_node = len(self._goto)
+                self._goto[node][token] = next_node
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+            node = next_node
+        self._output[node].append(value)
+
+    def _build_failure_links(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for token, child in self._goto[node].items():
+                queue.append(child)
+                fail = self._fail[node]
+                while fail and token not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[child] = self._goto[fail].get(token, 0)
+                self._output[child] = self._output[child] + self._output[self._fail[child]]
+
+    def _chunk_tokens(self, chunk: str) -> Tuple[str, ...]:
+        """Основы ключевых слов во фрагменте текста между пробелами; "" — слово вне словаря"""
+        tokens = []
+        for word in _WORD.findall(chunk.replace("ё", "е")):
+            token = self._canonical(stem(word))
+            tokens.append(token if token in self._vocabulary else "")
+        if not any(tokens):
+            return _RESET
+        return tuple(tokens)
+
+    def find(self, text: str) -> Dict[Hashable, Set[str]]:
+        """Найденные ключевые слова, сгруппированные по группам"""
+        found: Dict[Hashable, Set[str]] = {}
+        node = 0
+        goto, fail, output = self._goto, self._fail, self._output
+        cache = self._token_cache
+        for chunk in text.lower().split():
+            tokens = cache.get(chunk)
+            if tokens is None:
+                tokens = self._chunk_tokens(chunk)
+                if len(cache) >= _TOKEN_CACHE_SIZE:
+                    cache.clear()
+                cache[chunk] = tokens
+            if tokens is _RESET:
+                node = 0
+                continue
+            for token in tokens:
+                # Слово вне словаря ключевых фраз сбрасывает автомат в корень
+                if not token:
+                    node = 0
+                    continue
+                while node and token not in goto[node]:
+                    node = fail[node]
+                node = goto[node].get(token, 0)
+                for group, keyword in output[node]:
+                    found.setdefault(group, set()).add(keyword)
+        return found
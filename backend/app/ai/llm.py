@@ -0,0 +1,79 @@
+import json
+import time
+from typing import Dict, Optional
+import httpx
+import openai
+from app.core.config import settings
+from app.core.metrics import LLM_REQUESTS, LLM_LATENCY
+
+_client: Optional[openai.AsyncOpenAI] = None
+
+
+def init_llm_client(http_client: Optional[httpx.AsyncClient] = None) -> Optional[openai.AsyncOpenAI]:
+    """Создание общего AsyncOpenAI клиента с пулом соединений (один на процесс)"""
+    global _client
+    if not settings.OPENAI_API_KEY:
+        return None
+    if _client is None:
+        if http_client is None:
+            http_client = httpx.AsyncClient(
+                timeout=settings.AI_TIMEOUT,
+                limits=httpx.Limits(
+                    max_connections=settings.AI_MAX_CONNECTIONS,
+                    max_keepalive_connections=settings.AI_MAX_CONNECTIONS
+                )
+            )
+        _client = openai.AsyncOpenAI(
+            api_key=settings.OPENAI_API_KEY,
+            base_url=settings.OPENAI_BASE_URL or None,
+            timeout=settings.AI_TIMEOUT,
+            max_retries=settings.AI_MAX_RETRIES,
+            http_client=http_client
+        )
+    return _client
+
+
+def get_llm_client() -> Optional[openai.AsyncOpenAI]:
+    """Общий клиент; создается лениво, если приложение стартовало без lifespan (скрипты)"""
+    return _client or init_llm_client()
+
+
+async def close_llm_client():
+    """Закрытие пула соединений клиента"""
+    global _client
+    if _client is not None:
+        await _client.close()
+        _client = None
+
+
+async def chat_json(
+    system: str,
+    prompt: str,
+    max_tokens: int,
+    temperature: Optional[float] = None,
+    operation: str = "chat"
+) -> Dict:
+    """Асинхронный запрос к модели, ответ которой — JSON-объект"""
+    client = get_llm_client()
+    if client is None:
+        raise RuntimeError("OpenAI API key is not configured")
+
+    started = time.perf_counter()
+    try:
+        response = await client.chat.completions.create(
+            model=settings.AI_MODEL,
+            messages=[
+                {"role": "system", "content": system},
+                {"role": "user", "content": prompt}
+            ],
+            temperature=settings.AI_TEMPERATURE if temperature is None else temperature,
+            max_tokens=max_tokens
+        )
+        result = json.loads(response.choices[0].message.content)
+    except Exception:
+        LLM_REQUESTS.inc(operation=operation, outcome="error")
+        raise
+    finally:
+        LLM_LATENCY.observe(time.perf_counter() - started, operation=operation)
+    LLM_REQUESTS.inc(operation=operation, outcome="success")
+    return result
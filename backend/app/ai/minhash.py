@@ -0,0 +1,60 @@
+import hashlib
+import zlib
+from typing import List, Set
+import numpy as np
+from app.ai.keywords import tokenize
+
+# 64 хеш-функции, разбитые на 16 полос по 4 строки:
+# кандидатами становятся пары с оценкой сходства Жаккара примерно от 0.5
+NUM_PERM = 64
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+
+_PRIME = np.uint64((1 << 31) - 1)
+_rng = np.random.RandomState(1)
+_A = _rng.randint(1, (1 << 31) - 1, size=NUM_PERM).astype(np.uint64)
+_B = _rng.randint(0, (1 << 31) - 1, size=NUM_PERM).astype(np.uint64)
+
+
+def shingles(text: str) -> Set[str]:
+    """Множество основ слов и пар соседних основ"""
+    tokens = tokenize(text)
+    result = set(tokens)
+    result.update(f"{a} {b}" for a, b in zip(tokens, tokens[1:]))
+    return result
+
+
+def signature(text: str) -> List[int]:
+    """MinHash-сигнатура текста; пустой список, если в тексте нет слов"""
+    items = shingles(text)
+    if not items:
+        return []
+    x = np.fromiter(
+        (zlib.crc32(item.encode("utf-8")) for item in items),
+        dtype=np.uint64,
+        count=len(items)
+    ) % _PRIME
+    hashes = (_A[:, None] * x[None, :] + _B[:, None]) % _PRIME
+    return hashes.min(axis=1).tolist()
+
+
+def similarity(a: List[int], b: List[int]) -> float:
+    """Оценка сходства Жаккара по двум сигнатурам"""
+    if not a or not b:
+        return 0.0
+    a = np.asarray(a)
+    b = np.asarray(b)
+    return float(np.count_nonzero(a == b)) / NUM_PERM
+
+
+def band_keys(sig: List[int]) -> List[int]:
+    """Ключи LSH-корзин: по одному 63-битному ключу на полосу"""
+    keys = []
+    if not sig:
+        return keys
+    for band in range(BANDS):
+        chunk = sig[band * ROWS:(band + 1) * ROWS]
+        data = band.to_bytes(1, "big") + b"".join(v.to_bytes(4, "big") for v in chunk)
+        digest = hashlib.blake2b(data, digest_size=8).digest()
+        keys.append(int.from_bytes(digest, "big") >> 1)
+    return keys
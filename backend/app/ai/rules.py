@@ -0,0 +1,63 @@
+from dataclasses import dataclass
+from typing import Dict
+from app.ai.keywords import KeywordMatcher
+from app.models.appeal import AppealCategory
+
+# Категории и их ключевые слова для классификации
+CATEGORY_KEYWORDS = {
+    AppealCategory.ROADS: ["дорога", "яма", "асфальт", "тротуар", "транспорт", "пробка", "парковка"],
+    AppealCategory.LIGHTING: ["освещение", "фонарь", "свет", "темно", "лампа"],
+    AppealCategory.IMPROVEMENT: ["благоустройство", "скамейка", "парк", "сквер", "двор", "детская площадка"],
+    AppealCategory.ECOLOGY: ["мусор", "отходы", "экология", "свалка", "загрязнение", "воздух"],
+    AppealCategory.SAFETY: ["безопасность", "опасно", "травма", "авария", "преступление"],
+    AppealCategory.HEALTHCARE: ["больница", "поликлиника", "врач", "здоровье", "медицина"],
+    AppealCategory.UTILITIES: ["коммунальные", "вода", "отопление", "электричество", "канализация"],
+    AppealCategory.SOCIAL: ["социальная помощь", "пенсия", "льготы", "инвалид", "малоимущий"],
+}
+
+# Ключевые слова приоритета
+URGENT_KEYWORDS = ["срочно", "опасно", "авария", "травма", "пожар"]
+HIGH_KEYWORDS = ["важно", "критично", "не работает", "сломан"]
+
+# Слова для анализа тональности
+NEGATIVE_WORDS = ["плохо", "ужасно", "не работает", "сломан", "проблема", "жалоба"]
+POSITIVE_WORDS = ["спасибо", "хорошо", "отлично", "благодарю"]
+
+_URGENT = "urgent"
+_HIGH = "high"
+_NEGATIVE = "negative"
+_POSITIVE = "positive"
+
+# Все списки собраны в один автомат при импорте модуля
+_matcher = KeywordMatcher({
+    **CATEGORY_KEYWORDS,
+    _URGENT: URGENT_KEYWORDS,
+    _HIGH: HIGH_KEYWORDS,
+    _NEGATIVE: NEGATIVE_WORDS,
+    _POSITIVE: POSITIVE_WORDS,
+})
+
+
+@dataclass
+class RuleMatch:
+    """Результат одного прохода правил по тексту обращения"""
+    category_scores: Dict[AppealCategory, int]
+    urgent: bool
+    high: bool
+    negative_count: int
+    positive_count: int
+
+
+def match_rules(text: str) -> RuleMatch:
+    """Подсчет ключевых слов категорий, приоритета и тональности за один проход"""
+    found = _matcher.find(text)
+    return RuleMatch(
+        category_scores={
+            category: len(found.get(category, ()))
+            for category in CATEGORY_KEYWORDS
+        },
+        urgent=_URGENT in found,
+        high=_HIGH in found,
+        negative_count=len(found.get(_NEGATIVE, ())),
+        positive_count=len(found.get(_POSITIVE, ()))
+    )
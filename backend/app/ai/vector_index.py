@@ -0,0 +1,153 @@
+import os
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+
+
+class VectorIndex:
+    """
+    Приближенный поиск ближайших соседей по косинусному сходству.
+    Векторы хранятся нормализованными в растущей матрице, кандидаты выбираются
+    по LSH на случайных гиперплоскостях; индекс пополняется по одному вектору
+    и сохраняется в .npz файл.
+    """
+
+    def __init__(
+        self,
+        dim: int,
+        n_tables: int = 8,
+        n_bits: int = 12,
+        seed: int = 7,
+        exact_threshold: int = 5000
+    ):
+        self.dim = dim
+        self.n_tables = n_tables
+        self.n_bits = n_bits
+        self.seed = seed
+        # До этого размера индекс ищет полным перебором — быстрее и точнее
+        self.exact_threshold = exact_threshold
+        self.last_row_id = 0
+
+        rng = np.random.RandomState(seed)
+        self._planes = rng.standard_normal((n_tables, n_bits, dim)).astype(np.float32)
+        self._powers = (1 << np.arange(n_bits, dtype=np.int64))
+        self._vectors = np.zeros((1024, dim), dtype=np.float32)
+        self._ids = np.zeros(1024, dtype=np.int64)
+        self._positions: Dict[int, int] = {}
+        self._size = 0
+        self._tables: List[Dict[int, List[int]]] = [{} for _ in range(n_tables)]
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __contains__(self, item_id: int) -> bool:
+        return item_id in self._positions
+
+    def _hashes(self, vectors: np.ndarray) -> np.ndarray:
+        """LSH-ключи векторов: матрица (n_tables, n)"""
+        bits = np.einsum("tbd,nd->tnb", self._planes, vectors) > 0
+        return bits.astype(np.int64) @ self._powers
+
+    def add(self, ids: List[int], vectors: np.ndarray):
+        """Добавление векторов; существующие id перезаписываются"""
+        vectors = _normalize(np.asarray(vectors, dtype=np.float32).reshape(-1, self.dim))
+        hashes = self._hashes(vectors)
+        for row, item_id in enumerate(ids):
+            item_id = int(item_id)
+            position = self._positions.get(item_id)
+            if position is None:
+                position = self._size
+                self._grow(position + 1)
+                self._size += 1
+                self._positions[item_id] = position
+                self._ids[position] = item_id
+                old_hashes = [None] * self.n_tables
+            else:
+                # Перезапись: позиция убирается из корзин прежнего вектора
+                old_hashes = self._hashes(self._vectors[position:position + 1])[:, 0]
+            for table, old, bucket in zip(self._tables, old_hashes, hashes[:, row]):
+                if old == bucket:
+                    continue
+                if old is not None:
+                    table[int(old)].remove(position)
+                    if not table[int(old)]:
+                        del table[int(old)]
+                table.setdefault(int(bucket), []).append(position)
+            self._vectors[position] = vectors[row]
+
+    def search(
+        self,
+        vector: np.ndarray,
+        k: int = 10,
+        exclude: Optional[int] = None
+    ) -> List[Tuple[int, float]]:
+        """k ближайших векторов: список (id, косинусное сходство) по убыванию сходства"""
+        if not self._size:
+            return []
+        query = _normalize(np.asarray(vector, dtype=np.float32).reshape(1, self.dim))
+
+        if self._size <= self.exact_threshold:
+            positions = np.arange(self._size)
+        else:
+            hashes = self._hashes(query)[:, 0]
+            candidates = set()
+            for table, bucket in zip(self._tables, hashes):
+                candidates.update(table.get(int(bucket), ()))
+            if len(candidates) < k:
+                positions = np.arange(self._size)
+            else:
+                positions = np.fromiter(candidates, dtype=np.int64, count=len(candidates))
+
+        scores = self._vectors[positions] @ query[0]
+        top = min(k + 1, len(positions))
+        best = np.argpartition(-scores, top - 1)[:top]
+        best = best[np.argsort(-scores[best])]
+
+        result = []
+        for idx in best:
+            item_id = int(self._ids[positions[idx]])
+            if item_id == exclude:
+                continue
+            result.append((item_id, float(scores[idx])))
+        return result[:k]
+
+    def save(self, path: str):
+        """Сохранение индекса; LSH-таблицы восстанавливаются из векторов при загрузке"""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{path}.tmp.npz"
+        np.savez(
+            tmp_path,
+            ids=self._ids[:self._size],
+            vectors=self._vectors[:self._size],
+            meta=np.array([self.dim, self.n_tables, self.n_bits, self.seed, self.last_row_id], dtype=np.int64)
+        )
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> "VectorIndex":
+        with np.load(path) as data:
+            dim, n_tables, n_bits, seed, last_row_id = (int(v) for v in data["meta"])
+            index = cls(dim, n_tables=n_tables, n_bits=n_bits, seed=seed)
+            if len(data["ids"]):
+                index.add(data["ids"].tolist(), data["vectors"])
+        index.last_row_id = last_row_id
+        return index
+
+    def _grow(self, size: int):
+        capacity = len(self._ids)
+        if size <= capacity:
+            return
+        while capacity < size:
+            capacity *= 2
+        vectors = np.zeros((capacity, self.dim), dtype=np.float32)
+        vectors[:self._size] = self._vectors[:self._size]
+        ids = np.zeros(capacity, dtype=np.int64)
+        ids[:self._size] = self._ids[:self._size]
+        self._vectors, self._ids = vectors, ids
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
@@ -1,5 +1,5 @@
 from fastapi import APIRouter
-from app.api.v1 import auth, appeals, users, departments, analytics
+from app.api.v1 import auth, appeals, users, departments, analytics, profiling, imports, exports
 
 api_router = APIRouter()
 
@@ -8,3 +8,6 @@ api_router.include_router(appeals.router, prefix="/appeals", tags=["appeals"])
 api_router.include_router(users.router, prefix="/users", tags=["users"])
 api_router.include_router(departments.router, prefix="/departments", tags=["departments"])
 api_router.include_router(analytics.router, prefix="/analytics", tags=["analytics"])
+api_router.include_router(profiling.router, prefix="/profiling", tags=["profiling"])
+api_router.include_router(imports.router, prefix="/imports", tags=["imports"])
+api_router.include_router(exports.router, prefix="/exports", tags=["exports"])
@@ -1,9 +1,16 @@
-from fastapi import APIRouter, Depends, Query
+import asyncio
+from email.utils import format_datetime, parsedate_to_datetime
+from fastapi import APIRouter, Depends, Query, Request, Response, status
+from datetime import datetime
+from typing import List, Optional
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.database import get_db
 from app.core.dependencies import get_current_admin_user
-from app.schemas.analytics import AnalyticsResponse
-from app.services.analytics_service import AnalyticsService
+from app.schemas.analytics import AnalyticsResponse, AICacheStats, AICacheInvalidateResponse, StatsRebuildResponse
+from app.ai.cache import AIResultCache
+from app.services.analytics_service import AnalyticsService, dashboard_cache
+from app.services.report_service import render_dashboard_pdf
+from app.services.stats_service import stats_service
 
 router = APIRouter()
 analytics_service = AnalyticsService()
@@ -11,11 +18,96 @@ analytics_service = AnalyticsService()
 
 @router.get("/dashboard", response_model=AnalyticsResponse)
 async def get_dashboard(
+    request: Request,
+    response: Response,
     days: int = Query(30, ge=1, le=365),
+    current_user = Depends(get_current_admin_user)
+):
+    """
+    Получение статистики для дашборда (только для администраторов).
+    Ответ кэшируется; поддерживаются условные запросы (If-None-Match, If-Modified-Since).
+    """
+    entry = await dashboard_cache.get(days)
+    headers = {
+        "ETag": entry.etag,
+        "Last-Modified": format_datetime(entry.last_modified, usegmt=True),
+        "Cache-Control": "private, no-cache"
+    }
+    
+    # If-None-Match приоритетнее If-Modified-Since (RFC 9110)
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        not_modified = _etag_matches(if_none_match, entry.etag)
+    else:
+        not_modified = _not_modified_since(request.headers.get("if-modified-since"), entry.last_modified)
+    if not_modified:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    
+    response.headers.update(headers)
+    return entry.value
+
+
+@router.get("/dashboard/report")
+async def get_dashboard_report(
+    days: int = Query(30, ge=1, le=365),
+    current_user = Depends(get_current_admin_user)
+):
+    """PDF-отчет по статистике дашборда (только для администраторов)"""
+    entry = await dashboard_cache.get(days)
+    content = await asyncio.to_thread(render_dashboard_pdf, entry.value, days)
+    filename = f"dashboard-{days}d-{entry.last_modified:%Y%m%d}.pdf"
+    return Response(
+        content=content,
+        media_type="application/pdf",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    """Слабое сравнение ETag из If-None-Match"""
+    if header.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in header.split(","))
+
+
+def _not_modified_since(header: Optional[str], last_modified: datetime) -> bool:
+    if not header:
+        return False
+    try:
+        since = parsedate_to_datetime(header)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        return False
+    return last_modified <= since
+
+
+@router.post("/dashboard/rebuild", response_model=StatsRebuildResponse)
+async def rebuild_dashboard_stats(
     current_user = Depends(get_current_admin_user),
     db: AsyncSession = Depends(get_db)
 ):
-    """Получение статистики для дашборда (только для администраторов)"""
-    stats = await analytics_service.get_dashboard_stats(db, days=days)
-    return stats
+    """Полная пересборка свертки статистики дашборда (только для администраторов)"""
+    buckets = await stats_service.rebuild(db)
+    await dashboard_cache.bump()
+    return {"buckets": buckets}
+
+
+@router.get("/ai-cache", response_model=List[AICacheStats])
+async def get_ai_cache_stats(
+    current_user = Depends(get_current_admin_user)
+):
+    """Статистика кэша ответов AI (только для администраторов)"""
+    return [cache.stats() for cache in AIResultCache.all()]
 
+
+@router.delete("/ai-cache", response_model=AICacheInvalidateResponse)
+async def invalidate_ai_cache(
+    current_user = Depends(get_current_admin_user)
+):
+    """Сброс кэша ответов AI, например после смены промпта (только для администраторов)"""
+    removed = 0
+    for cache in AIResultCache.all():
+        removed += await cache.invalidate()
+    return {"removed": removed}
@@ -1,17 +1,36 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query, UploadFile, File
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, UploadFile, File
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List, Optional
+from typing import List, Literal, Optional
 from app.core.database import get_db
-from app.core.dependencies import get_current_active_user, get_current_admin_user
-from app.models.user import User
-from app.models.appeal import AppealStatus
-from app.schemas.appeal import AppealCreate, AppealUpdate, AppealResponse, AppealListResponse
+from app.core.dependencies import get_current_active_user, get_current_admin_user, get_read_db
+from app.core.replicas import replica_router
+from app.core.principals import Principal
+from app.models.appeal import AppealStatus, AppealCategory, EnrichmentStatus
+from app.schemas.appeal import (
+    AppealCreate,
+    AppealUpdate,
+    AppealResponse,
+    AppealEnrichmentResponse,
+    SimilarAppealResponse,
+    NearbyAppealResponse,
+    AppealClusterResponse,
+    AppealListResponse
+)
 from app.services.appeal_service import AppealService
 from app.services.analytics_service import AnalyticsService
-import os
+from app.services.cluster_service import cluster_service, cluster_precision
+from app.services.enrichment_service import enrichment_service
+from app.services.export_service import AppealExport
+from app.services.geolocation_service import parse_bbox
+from app.services.similarity_service import similarity_service
+from app.services.storage_service import storage_service, FileTooLarge
+from app.services.image_service import image_service
 from app.core.config import settings
 
 router = APIRouter()
+# Запас на multipart-заголовки при проверке Content-Length загрузки
+UPLOAD_OVERHEAD = 64 * 1024
 appeal_service = AppealService()
 analytics_service = AnalyticsService()
 
@@ -19,15 +38,15 @@ analytics_service = AnalyticsService()
 @router.post("", response_model=AppealResponse, status_code=status.HTTP_201_CREATED)
 async def create_appeal(
     appeal_data: AppealCreate,
-    current_user: User = Depends(get_current_active_user),
+    current_user: Principal = Depends(get_current_active_user),
     db: AsyncSession = Depends(get_db)
 ):
     """Создание нового обращения"""
     appeal = await appeal_service.create_appeal(db, appeal_data, current_user.id)
+    await replica_router.mark_write(current_user.id)
     
     # Логирование события
-    await analytics_service.log_event(
-        db,
+    analytics_service.log_event(
         "appeal_created",
         user_id=current_user.id,
         appeal_id=appeal.id
@@ -40,42 +59,179 @@ async def create_appeal(
 async def get_appeals(
     page: int = Query(1, ge=1),
     size: int = Query(20, ge=1, le=100),
-    status: Optional[AppealStatus] = None,
+    status_filter: Optional[AppealStatus] = Query(None, alias="status"),
     category: Optional[str] = None,
-    current_user: User = Depends(get_current_active_user),
-    db: AsyncSession = Depends(get_db)
+    cursor: Optional[str] = Query(None, description="Курсор из next_cursor предыдущей страницы"),
+    count: Optional[Literal["exact", "estimated", "none"]] = Query(
+        None,
+        description="Подсчет total: exact (по умолчанию для page), estimated, none (по умолчанию для cursor)"
+    ),
+    current_user: Principal = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_read_db)
 ):
-    """Получение списка обращений"""
+    """Получение списка обращений (по номеру страницы или по курсору)"""
     skip = (page - 1) * size
+    if count is None:
+        count = "none" if cursor else "exact"
     
     # Обычные пользователи видят только свои обращения
     user_id = None if current_user.is_admin else current_user.id
     
-    appeals, total = await appeal_service.get_appeals(
-        db,
-        skip=skip,
-        limit=size,
-        status=status,
-        user_id=user_id,
-        category=category
-    )
+    try:
+        appeals, total, next_cursor = await appeal_service.get_appeals(
+            db,
+            skip=skip,
+            limit=size,
+            status=status_filter,
+            user_id=user_id,
+            category=category,
+            cursor=cursor,
+            count=count
+        )
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
     
-    pages = (total + size - 1) // size
+    pages = (total + size - 1) // size if total is not None else None
     
     return {
         "items": appeals,
         "total": total,
         "page": page,
         "size": size,
-        "pages": pages
+        "pages": pages,
+        "total_estimated": count == "estimated",
+        "next_cursor": next_cursor
     }
 
 
+@router.get("/nearby", response_model=List[NearbyAppealResponse])
+async def get_nearby_appeals(
+    lat: float = Query(..., ge=-90, le=90),
+    lon: float = Query(..., ge=-180, le=180),
+    radius_km: float = Query(1.0, gt=0, le=settings.NEARBY_MAX_RADIUS_KM),
+    limit: int = Query(100, ge=1, le=500),
+    status_filter: Optional[AppealStatus] = Query(None, alias="status"),
+    category: Optional[str] = None,
+    current_user: Principal = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Обращения в радиусе от точки, ближайшие первыми"""
+    # Обычные пользователи видят только свои обращения
+    user_id = None if current_user.is_admin else current_user.id
+    
+    found = await appeal_service.get_nearby(
+        db,
+        lat,
+        lon,
+        radius_km,
+        limit=limit,
+        status=status_filter,
+        user_id=user_id,
+        category=category
+    )
+    return [{"distance_km": distance, "appeal": appeal} for appeal, distance in found]
+
+
+@router.get("/in_bbox", response_model=List[NearbyAppealResponse])
+async def get_appeals_in_bbox(
+    bbox: str = Query(..., description="min_lon,min_lat,max_lon,max_lat"),
+    limit: int = Query(100, ge=1, le=500),
+    status_filter: Optional[AppealStatus] = Query(None, alias="status"),
+    category: Optional[str] = None,
+    current_user: Principal = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Обращения в прямоугольнике, ближайшие к его центру первыми"""
+    try:
+        area = parse_bbox(bbox)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid bbox"
+        )
+    
+    user_id = None if current_user.is_admin else current_user.id
+    
+    found = await appeal_service.get_in_bbox(
+        db,
+        area,
+        limit=limit,
+        status=status_filter,
+        user_id=user_id,
+        category=category
+    )
+    return [{"distance_km": distance, "appeal": appeal} for appeal, distance in found]
+
+
+@router.get("/clusters", response_model=AppealClusterResponse)
+async def get_appeal_clusters(
+    bbox: str = Query(..., description="min_lon,min_lat,max_lon,max_lat"),
+    zoom: int = Query(..., ge=0, le=20),
+    status_filter: Optional[AppealStatus] = Query(None, alias="status"),
+    category: Optional[AppealCategory] = None,
+    current_user: Principal = Depends(get_current_admin_user)
+):
+    """
+    Кластеры обращений для карты (только для администраторов).
+    Возвращаются для всех тайлов масштаба zoom, пересекающих bbox.
+    """
+    try:
+        clusters = await cluster_service.get_clusters(
+            parse_bbox(bbox),
+            zoom,
+            status=status_filter.value if status_filter else None,
+            category=category.value if category else None
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    
+    return {
+        "zoom": zoom,
+        "precision": cluster_precision(zoom),
+        "total": sum(cluster["count"] for cluster in clusters),
+        "clusters": clusters
+    }
+
+
+@router.get("/export")
+async def export_appeals(
+    format: Literal["csv", "xlsx", "jsonl"] = "csv",
+    status_filter: Optional[AppealStatus] = Query(None, alias="status"),
+    category: Optional[str] = None,
+    current_user: Principal = Depends(get_current_active_user)
+):
+    """
+    Выгрузка обращений с фильтрами списка (обычные пользователи — только свои).
+    Строки передаются по мере чтения; очень большие выгрузки — через POST /exports.
+    """
+    user_id = None if current_user.is_admin else current_user.id
+    try:
+        export = AppealExport(format, status=status_filter, category=category, user_id=user_id)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    
+    session_factory = await replica_router.session_factory(current_user.id)
+    return StreamingResponse(
+        export.chunks(session_factory),
+        media_type=export.media_type,
+        headers={"Content-Disposition": f'attachment; filename="{export.filename}"'}
+    )
+
+
 @router.get("/{appeal_id}", response_model=AppealResponse)
 async def get_appeal(
     appeal_id: int,
-    current_user: User = Depends(get_current_active_user),
-    db: AsyncSession = Depends(get_db)
+    current_user: Principal = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Получение обращения по ID"""
     appeal = await appeal_service.get_appeal(db, appeal_id)
@@ -96,11 +252,79 @@ async def get_appeal(
     return appeal
 
 
+@router.get("/{appeal_id}/enrichment", response_model=AppealEnrichmentResponse)
+async def get_appeal_enrichment(
+    appeal_id: int,
+    wait: int = Query(0, ge=0, le=settings.ENRICHMENT_MAX_WAIT),
+    current_user: Principal = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Статус фонового AI-обогащения обращения.
+    С параметром wait ожидает завершения до wait секунд (long polling).
+    """
+    appeal = await appeal_service.get_appeal(db, appeal_id)
+    
+    if not appeal:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Appeal not found"
+        )
+    
+    if not current_user.is_admin and appeal.user_id != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions"
+        )
+    
+    if wait and appeal.enrichment_status == EnrichmentStatus.PENDING:
+        # Соединение возвращается в пул на время ожидания
+        await db.commit()
+        if await enrichment_service.wait_for(appeal_id, timeout=wait):
+            await db.refresh(appeal)
+    
+    return appeal
+
+
+@router.get("/{appeal_id}/similar", response_model=List[SimilarAppealResponse])
+async def get_similar_appeals(
+    appeal_id: int,
+    k: int = Query(10, ge=1, le=50),
+    current_user: Principal = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Похожие обращения (семантический поиск или MinHash)"""
+    appeal = await appeal_service.get_appeal(db, appeal_id)
+    
+    if not appeal:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Appeal not found"
+        )
+    
+    if not current_user.is_admin and appeal.user_id != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions"
+        )
+    
+    similar = await similarity_service.find_similar(db, appeal, k=k)
+    scores = dict(similar)
+    appeals = await appeal_service.get_appeals_by_ids(db, [appeal_id for appeal_id, _ in similar])
+    
+    # Обычные пользователи видят только свои обращения
+    return [
+        {"score": scores[item.id], "appeal": item}
+        for item in appeals
+        if current_user.is_admin or item.user_id == current_user.id
+    ]
+
+
 @router.patch("/{appeal_id}", response_model=AppealResponse)
 async def update_appeal(
     appeal_id: int,
     appeal_data: AppealUpdate,
-    current_user: User = Depends(get_current_admin_user),
+    current_user: Principal = Depends(get_current_admin_user),
     db: AsyncSession = Depends(get_db)
 ):
     """Обновление обращения (только для администраторов)"""
@@ -111,10 +335,11 @@ async def update_appeal(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Appeal not found"
         )
+    await replica_router.mark_write(current_user.id)
+    await replica_router.mark_write(appeal.user_id)
     
     # Логирование события
-    await analytics_service.log_event(
-        db,
+    analytics_service.log_event(
         "appeal_updated",
         user_id=current_user.id,
         appeal_id=appeal.id,
@@ -127,8 +352,9 @@ async def update_appeal(
 @router.post("/{appeal_id}/upload", response_model=AppealResponse)
 async def upload_image(
     appeal_id: int,
+    request: Request,
     file: UploadFile = File(...),
-    current_user: User = Depends(get_current_active_user),
+    current_user: Principal = Depends(get_current_active_user),
     db: AsyncSession = Depends(get_db)
 ):
     """Загрузка изображения к обращению"""
@@ -147,28 +373,35 @@ async def upload_image(
             detail="Not enough permissions"
         )
     
-    # Проверка размера файла
-    contents = await file.read()
-    if len(contents) > settings.MAX_UPLOAD_SIZE:
+    # Заведомо большой файл отклоняется до чтения тела
+    content_length = request.headers.get("content-length", "")
+    if content_length.isdigit() and int(content_length) > settings.MAX_UPLOAD_SIZE + UPLOAD_OVERHEAD:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="File too large"
         )
     
-    # Сохранение файла
-    os.makedirs(settings.UPLOAD_DIR, exist_ok=True)
-    file_path = f"{settings.UPLOAD_DIR}/{appeal_id}_{file.filename}"
-    
-    with open(file_path, "wb") as f:
-        f.write(contents)
-    
-    # Обновление списка изображений
-    if appeal.images is None:
-        appeal.images = []
-    appeal.images.append(file_path)
+    # Потоковое сохранение с проверкой размера по мере чтения
+    try:
+        stored = await storage_service.save_upload(file)
+    except FileTooLarge:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="File too large"
+        )
     
-    await db.commit()
-    await db.refresh(appeal)
+    appeal = await appeal_service.add_image(db, appeal_id, stored.path)
+    if not appeal:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Appeal not found"
+        )
+    # Варианты изображения, удаление EXIF и координаты из него — в фоне;
+    # при переполненной очереди — сразу, иначе оригинал остался бы с метаданными
+    if not image_service.enqueue(appeal_id, stored.path):
+        await image_service.process(appeal_id, stored.path)
+        await db.refresh(appeal)
+    await replica_router.mark_write(current_user.id)
     
     return appeal
 
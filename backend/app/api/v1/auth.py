@@ -4,7 +4,8 @@ from app.core.database import get_db
 from app.schemas.user import LoginRequest, Token, UserCreate, UserResponse
 from app.services.user_service import UserService
 from app.core.dependencies import get_current_active_user
-from app.models.user import User
+from app.core.principals import Principal
+from app.core.security import PasswordHasherBusy
 
 router = APIRouter()
 user_service = UserService()
@@ -24,6 +25,8 @@ async def register(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=str(e)
         )
+    except PasswordHasherBusy:
+        raise _busy_exception()
 
 
 @router.post("/login", response_model=Token)
@@ -32,11 +35,14 @@ async def login(
     db: AsyncSession = Depends(get_db)
 ):
     """Вход в систему"""
-    user = await user_service.authenticate_user(
-        db,
-        login_data.email,
-        login_data.password
-    )
+    try:
+        user = await user_service.authenticate_user(
+            db,
+            login_data.email,
+            login_data.password
+        )
+    except PasswordHasherBusy:
+        raise _busy_exception()
     
     if not user:
         raise HTTPException(
@@ -56,8 +62,22 @@ async def login(
 
 @router.get("/me", response_model=UserResponse)
 async def get_current_user_info(
-    current_user: User = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db)
 ):
     """Получение информации о текущем пользователе"""
-    return current_user
+    user = await user_service.get_user_by_id(db, current_user.id)
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User not found"
+        )
+    return user
 
+
+def _busy_exception() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Too many authentication requests, try again later",
+        headers={"Retry-After": "1"}
+    )
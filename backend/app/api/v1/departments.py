@@ -2,7 +2,8 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 from app.core.database import get_db
-from app.core.dependencies import get_current_admin_user
+from app.core.dependencies import get_current_admin_user, get_read_db
+from app.core.replicas import replica_router
 from app.models.department import Department
 from app.schemas.department import DepartmentCreate, DepartmentResponse
 from sqlalchemy import select
@@ -12,7 +13,7 @@ router = APIRouter()
 
 @router.get("", response_model=List[DepartmentResponse])
 async def get_departments(
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Получение списка департаментов"""
     result = await db.execute(select(Department).where(Department.is_active.is_(True)))
@@ -31,13 +32,14 @@ async def create_department(
     db.add(department)
     await db.commit()
     await db.refresh(department)
+    await replica_router.mark_write(current_user.id)
     return department
 
 
 @router.get("/{department_id}", response_model=DepartmentResponse)
 async def get_department(
     department_id: int,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Получение департамента по ID"""
     result = await db.execute(
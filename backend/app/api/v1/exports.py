@@ -0,0 +1,104 @@
+import os
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import FileResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List
+from app.core.database import get_db
+from app.core.dependencies import get_current_admin_user
+from app.core.jobs import job_runner
+from app.core.principals import Principal
+from app.models.export_job import ExportJob, ExportStatus
+from app.schemas.export_job import ExportCreate, ExportJobResponse
+from app.services.export_service import export_service, MEDIA_TYPES
+
+router = APIRouter()
+
+
+async def _get_job(db: AsyncSession, job_id: int) -> ExportJob:
+    job = await export_service.get_job(db, job_id)
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Export job not found"
+        )
+    return job
+
+
+@router.post("", response_model=ExportJobResponse, status_code=status.HTTP_202_ACCEPTED)
+async def create_export(
+    export_data: ExportCreate,
+    current_user: Principal = Depends(get_current_admin_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Фоновая выгрузка обращений (csv, xlsx, jsonl) или PDF-отчета дашборда
+    (только для администраторов). Готовность — GET /exports/{job_id}.
+    """
+    try:
+        job = await export_service.create_job(
+            db,
+            user_id=current_user.id,
+            kind=export_data.kind,
+            fmt=export_data.format,
+            status=export_data.status,
+            category=export_data.category,
+            days=export_data.days
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+    job_runner.spawn(f"export:{job.id}", export_service.run(job.id))
+    return job
+
+
+@router.get("", response_model=List[ExportJobResponse])
+async def list_exports(
+    current_user: Principal = Depends(get_current_admin_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Последние фоновые выгрузки"""
+    await export_service.fail_stale(db)
+    return await export_service.list_jobs(db)
+
+
+@router.get("/{job_id}", response_model=ExportJobResponse)
+async def get_export(
+    job_id: int,
+    current_user: Principal = Depends(get_current_admin_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Прогресс и готовность выгрузки"""
+    await export_service.fail_stale(db)
+    return await _get_job(db, job_id)
+
+
+@router.get("/{job_id}/download")
+async def download_export(
+    job_id: int,
+    current_user: Principal = Depends(get_current_admin_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Скачивание готового файла выгрузки"""
+    await export_service.purge_expired(db)
+    await export_service.fail_stale(db)
+    job = await _get_job(db, job_id)
+    if job.status != ExportStatus.COMPLETED:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Export is {job.status.value}"
+        )
+    if not job.download_ready:
+        raise HTTPException(
+            status_code=status.HTTP_410_GONE,
+            detail="Export file has expired"
+        )
+    if not os.path.exists(job.path):
+        # EXPORT_DIR не общий для узлов: файл на узле, который выполнил выгрузку
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Export file is not available on this node"
+        )
+    return FileResponse(job.path, media_type=MEDIA_TYPES[job.format], filename=job.filename)
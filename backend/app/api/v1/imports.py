@@ -0,0 +1,145 @@
+from fastapi import APIRouter, Depends, HTTPException, status, Request, UploadFile, File, Form
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Literal, Optional
+from app.core.config import settings
+from app.core.database import get_db
+from app.core.dependencies import get_current_admin_user
+from app.core.jobs import job_runner
+from app.core.principals import Principal
+from app.models.import_job import ImportJob
+from app.schemas.import_job import ImportJobResponse
+from app.services.import_service import import_service, detect_format
+from app.services.storage_service import StorageService, FileTooLarge
+
+router = APIRouter()
+# Запас на multipart-заголовки и поля формы при проверке Content-Length
+UPLOAD_OVERHEAD = 64 * 1024
+import_storage = StorageService(root=settings.IMPORT_DIR)
+
+
+async def _start(job_id: int) -> ImportJob:
+    """Захват задачи и запуск импорта в фоне; 409, если задача уже выполняется или завершена"""
+    try:
+        job = await import_service.claim(job_id)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(e)
+        )
+    job_runner.spawn(f"import:{job_id}", import_service.process(job))
+    return job
+
+
+@router.post("", response_model=ImportJobResponse, status_code=status.HTTP_202_ACCEPTED)
+async def create_import(
+    request: Request,
+    file: UploadFile = File(...),
+    format: Optional[Literal["csv", "jsonl"]] = Form(None),
+    classify: Literal["rules", "llm"] = Form("rules"),
+    geocode: Literal["offline", "full"] = Form("offline"),
+    encoding: str = Form("utf-8"),
+    batch_size: int = Form(settings.IMPORT_BATCH_SIZE, ge=1, le=10000),
+    current_user: Principal = Depends(get_current_admin_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Массовый импорт обращений из CSV или JSONL (только для администраторов).
+    Файл сохраняется, импорт идет в фоне; прогресс — GET /imports/{job_id}.
+    """
+    fmt = format or detect_format(file.filename)
+    if fmt is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Unknown file format, pass format=csv or format=jsonl"
+        )
+
+    content_length = request.headers.get("content-length", "")
+    if content_length.isdigit() and int(content_length) > settings.IMPORT_MAX_SIZE + UPLOAD_OVERHEAD:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="File too large"
+        )
+    try:
+        stored = await import_storage.save_upload(file, max_size=settings.IMPORT_MAX_SIZE)
+    except FileTooLarge:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="File too large"
+        )
+
+    try:
+        job = await import_service.create_job(
+            db,
+            stored.path,
+            user_id=current_user.id,
+            fmt=fmt,
+            filename=file.filename,
+            classify=classify,
+            geocode=geocode,
+            encoding=encoding,
+            batch_size=batch_size
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+    return await _start(job.id)
+
+
+@router.get("", response_model=List[ImportJobResponse])
+async def list_imports(
+    current_user: Principal = Depends(get_current_admin_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Последние задачи импорта"""
+    return await import_service.list_jobs(db)
+
+
+@router.get("/{job_id}", response_model=ImportJobResponse)
+async def get_import(
+    job_id: int,
+    current_user: Principal = Depends(get_current_admin_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Прогресс и ошибки задачи импорта"""
+    job = await import_service.get_job(db, job_id)
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Import job not found"
+        )
+    return job
+
+
+@router.post("/{job_id}/resume", response_model=ImportJobResponse, status_code=status.HTTP_202_ACCEPTED)
+async def resume_import(
+    job_id: int,
+    current_user: Principal = Depends(get_current_admin_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Продолжение прерванной или отмененной задачи с первой незаписанной строки"""
+    job = await import_service.get_job(db, job_id)
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Import job not found"
+        )
+    return await _start(job_id)
+
+
+@router.post("/{job_id}/cancel", response_model=ImportJobResponse)
+async def cancel_import(
+    job_id: int,
+    current_user: Principal = Depends(get_current_admin_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Остановка задачи после текущего пакета; записанные строки остаются"""
+    job = await import_service.request_cancel(db, job_id)
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Import job not found"
+        )
+    return job
@@ -0,0 +1,43 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from app.core.dependencies import get_current_admin_user
+from app.core.profiling import profiler
+from app.schemas.profiling import ProfilingStatus, ProfilingUpdate, ProfilingClearResponse, SlowRequestProfile
+
+router = APIRouter()
+
+
+@router.get("", response_model=ProfilingStatus)
+async def get_profiling(current_user = Depends(get_current_admin_user)):
+    """Настройки профилировщика и сохраненные медленные запросы этого процесса"""
+    return {**profiler.status(), "requests": profiler.records()}
+
+
+@router.patch("", response_model=ProfilingStatus)
+async def update_profiling(
+    update: ProfilingUpdate,
+    current_user = Depends(get_current_admin_user)
+):
+    """Включение и настройка профилировщика без перезапуска (только в этом процессе)"""
+    profiler.configure(**update.model_dump(exclude_unset=True))
+    return {**profiler.status(), "requests": profiler.records()}
+
+
+@router.delete("", response_model=ProfilingClearResponse)
+async def clear_profiling(current_user = Depends(get_current_admin_user)):
+    """Очистка буфера медленных запросов"""
+    return {"removed": profiler.clear()}
+
+
+@router.get("/{profile_id}", response_model=SlowRequestProfile)
+async def get_profile(
+    profile_id: int,
+    current_user = Depends(get_current_admin_user)
+):
+    """SQL-запросы и стеки медленного запроса"""
+    record = profiler.get(profile_id)
+    if record is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Profile not found"
+        )
+    return record
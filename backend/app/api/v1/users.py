@@ -3,6 +3,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 from app.core.database import get_db
 from app.core.dependencies import get_current_admin_user
+from app.core.principals import Principal
 from app.models.user import User
 from app.schemas.user import UserResponse, UserUpdate
 from app.services.user_service import UserService
@@ -14,7 +15,7 @@ user_service = UserService()
 
 @router.get("", response_model=List[UserResponse])
 async def get_users(
-    current_user: User = Depends(get_current_admin_user),
+    current_user: Principal = Depends(get_current_admin_user),
     db: AsyncSession = Depends(get_db)
 ):
     """Получение списка пользователей (только для администраторов)"""
@@ -26,7 +27,7 @@ async def get_users(
 @router.get("/{user_id}", response_model=UserResponse)
 async def get_user(
     user_id: int,
-    current_user: User = Depends(get_current_admin_user),
+    current_user: Principal = Depends(get_current_admin_user),
     db: AsyncSession = Depends(get_db)
 ):
     """Получение пользователя по ID (только для администраторов)"""
@@ -40,3 +41,28 @@ async def get_user(
     
     return user
 
+
+
+@router.patch("/{user_id}", response_model=UserResponse)
+async def update_user(
+    user_id: int,
+    user_data: UserUpdate,
+    current_user: Principal = Depends(get_current_admin_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Обновление пользователя: роль, права, активность (только для администраторов)"""
+    try:
+        user = await user_service.update_user(db, user_id, user_data)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User not found"
+        )
+    
+    return user
@@ -0,0 +1,75 @@
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class WorkerPool:
+    """Пул фоновых asyncio-воркеров с ограниченной очередью задач"""
+
+    def __init__(
+        self,
+        name: str,
+        handler: Callable[[Any], Awaitable[None]],
+        workers: int = 2,
+        queue_size: int = 1000
+    ):
+        self.name = name
+        self.handler = handler
+        self.workers = workers
+        self.queue_size = queue_size
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks)
+
+    def qsize(self) -> int:
+        return self._queue.qsize() if self._queue else 0
+
+    def start(self):
+        """Запуск воркеров (вызывается из lifespan)"""
+        if self._tasks:
+            return
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._tasks = [
+            asyncio.create_task(self._worker(), name=f"{self.name}-{i}")
+            for i in range(self.workers)
+        ]
+
+    async def stop(self, timeout: float = 10.0):
+        """Остановка воркеров с дообработкой очереди"""
+        if not self._tasks:
+            return
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout=timeout)
+        except asyncio.TimeoutError:
+            logger.warning("%s: %d tasks left unprocessed", self.name, self._queue.qsize())
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._queue = None
+
+    def submit(self, item: Any) -> bool:
+        """Постановка задачи в очередь без ожидания. False, если очередь недоступна"""
+        if self._queue is None:
+            return False
+        try:
+            self._queue.put_nowait(item)
+            return True
+        except asyncio.QueueFull:
+            logger.warning("%s: queue is full, task dropped", self.name)
+            return False
+
+    async def _worker(self):
+        while True:
+            item = await self._queue.get()
+            try:
+                await self.handler(item)
+            except Exception:
+                logger.exception("%s: task failed", self.name)
+            finally:
+                self._queue.task_done()
@@ -0,0 +1,203 @@
+import asyncio
+import hashlib
+import json
+import logging
+import math
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class TTLCache:
+    """In-process LRU кэш с ограничением размера и временем жизни записей"""
+
+    def __init__(self, max_size: int = 1000, ttl: Optional[float] = None):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple[Any, Optional[float]]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.get(key, _MISSING) is not _MISSING
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        item = self._data.get(key)
+        if item is None:
+            return default
+        value, expires_at = item
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self._data[key]
+            return default
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = time.monotonic() + ttl if ttl else None
+        self._data[key] = (value, expires_at)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_size:
+            self._data.popitem(last=False)
+
+    def delete(self, key: Hashable):
+        self._data.pop(key, None)
+
+    def clear(self):
+        self._data.clear()
+
+
+@dataclass
+class CachedResponse:
+    """Закэшированный ответ с валидаторами для условных запросов"""
+    value: Any
+    version: Hashable  # версия кэша или (общая, раздела) для кэша с разделами
+    etag: str
+    last_modified: datetime
+    computed_at: float
+
+
+class SWRCache:
+    """
+    Кэш ответов со stale-while-revalidate и single-flight.
+    Свежая запись отдается до ttl секунд; устаревшая (по времени или по версии
+    после записи в БД) — еще stale_ttl секунд, пока ее пересчитывает один фоновый
+    запрос. Версия хранится в процессе или в Redis, если кэш общий для воркеров.
+    С partition у ключей есть разделы со своими версиями: bump(partitions)
+    помечает устаревшими только записи этих разделов.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        loader: Callable[[Hashable], Awaitable[Any]],
+        ttl: float,
+        stale_ttl: float,
+        redis_getter: Optional[Callable[[], Any]] = None,
+        max_size: Optional[int] = None,
+        partition: Optional[Callable[[Hashable], str]] = None
+    ):
+        self.name = name
+        self.loader = loader
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.redis_getter = redis_getter
+        self.max_size = max_size
+        self.partition = partition
+        self._version = 0
+        self._partition_versions: Dict[str, int] = {}
+        self._entries: "OrderedDict[Hashable, CachedResponse]" = OrderedDict()
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+
+    @property
+    def _redis_key(self) -> str:
+        return f"swr:{self.name}:version"
+
+    def _partition_redis_key(self, partition: str) -> str:
+        return f"swr:{self.name}:version:{partition}"
+
+    async def version(self, key: Optional[Hashable] = None):
+        """Версия записи: общая или, для кэша с разделами, (общая, версия раздела ключа)"""
+        partition = self.partition(key) if self.partition and key is not None else None
+        redis = self.redis_getter() if self.redis_getter else None
+        if redis is not None:
+            try:
+                if partition is None:
+                    return int(await redis.get(self._redis_key) or 0)
+                common, own = await redis.mget(self._redis_key, self._partition_redis_key(partition))
+                return int(common or 0), int(own or 0)
+            except Exception as e:
+                logger.warning("Redis version read failed for %s: %s", self.name, e)
+        if partition is None:
+            return self._version
+        return self._version, self._partition_versions.get(partition, 0)
+
+    async def bump(self, partitions: Optional[Iterable[str]] = None):
+        """Пометка устаревшими всех записей или только записей разделов partitions после изменения данных"""
+        if partitions is not None:
+            await self._bump_partitions(set(partitions))
+            return
+        self._version += 1
+        redis = self.redis_getter() if self.redis_getter else None
+        if redis is not None:
+            try:
+                await redis.incr(self._redis_key)
+            except Exception as e:
+                logger.warning("Redis version bump failed for %s: %s", self.name, e)
+
+    async def _bump_partitions(self, partitions: set):
+        for partition in partitions:
+            self._partition_versions[partition] = self._partition_versions.get(partition, 0) + 1
+        if self.max_size is not None and len(self._partition_versions) > self.max_size:
+            # Слишком много разделов: все записи процесса устаревают разом
+            self._partition_versions.clear()
+            self._version += 1
+        redis = self.redis_getter() if self.redis_getter else None
+        if redis is not None:
+            # Ключ раздела живет не дольше записей: запись старше ttl + stale_ttl не отдается
+            expire = math.ceil(self.ttl + self.stale_ttl)
+            try:
+                async with redis.pipeline(transaction=False) as pipe:
+                    for partition in partitions:
+                        pipe.incr(self._partition_redis_key(partition))
+                        pipe.expire(self._partition_redis_key(partition), expire)
+                    await pipe.execute()
+            except Exception as e:
+                logger.warning("Redis version bump failed for %s: %s", self.name, e)
+
+    async def get(self, key: Hashable) -> CachedResponse:
+        version = await self.version(key)
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            age = time.monotonic() - entry.computed_at
+            if entry.version == version and age < self.ttl:
+                return entry
+            if age < self.ttl + self.stale_ttl:
+                self._refresh(key, version)
+                return entry
+        return await asyncio.shield(self._refresh(key, version))
+
+    def _refresh(self, key: Hashable, version: Hashable) -> asyncio.Task:
+        """Единственный на ключ пересчет значения"""
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._load(key, version))
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._finish(key, done))
+        return task
+
+    def _finish(self, key: Hashable, task: asyncio.Task):
+        self._inflight.pop(key, None)
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning("Refresh of %s[%s] failed: %s", self.name, key, task.exception())
+
+    async def _load(self, key: Hashable, version: Hashable) -> CachedResponse:
+        value = await self.loader(key)
+        payload = json.dumps(value, sort_keys=True, default=str).encode("utf-8")
+        etag = f'W/"{hashlib.sha1(payload).hexdigest()[:20]}"'
+
+        previous = self._entries.get(key)
+        if previous is not None and previous.etag == etag:
+            last_modified = previous.last_modified
+        else:
+            last_modified = datetime.now(timezone.utc).replace(microsecond=0)
+
+        entry = CachedResponse(value, version, etag, last_modified, time.monotonic())
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        if self.max_size is not None:
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+        return entry
+
+    def clear(self):
+        self._entries.clear()
+
+
+_MISSING = object()
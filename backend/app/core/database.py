@@ -1,18 +1,159 @@
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from sqlalchemy import event, exc
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
 from sqlalchemy.orm import declarative_base
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from app.core.config import settings
+from app.core.metrics import registry, gauge_lines
+
+# Границы гистограммы ожидания соединения из пула, секунды
+WAIT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class PoolStats:
+    """Счетчики пула соединений: ожидание выдачи, таймауты, занятые соединения"""
+
+    def __init__(self):
+        self.wait_buckets = [0] * (len(WAIT_BUCKETS) + 1)
+        self.wait_count = 0
+        self.wait_sum = 0.0
+        self.wait_max = 0.0
+        self.timeouts = 0
+        self.checkouts = 0
+        self.max_in_use = 0
+        self.in_use = 0
+
+    def observe_wait(self, seconds: float):
+        self.wait_buckets[bisect_left(WAIT_BUCKETS, seconds)] += 1
+        self.wait_count += 1
+        self.wait_sum += seconds
+        self.wait_max = max(self.wait_max, seconds)
+
+    def snapshot(self) -> dict:
+        pool = engine.sync_engine.pool
+        cumulative = 0
+        buckets = {}
+        for bound, count in zip(WAIT_BUCKETS + (float("inf"),), self.wait_buckets):
+            cumulative += count
+            buckets["+Inf" if bound == float("inf") else str(bound)] = cumulative
+        return {
+            "pool_class": type(pool).__name__,
+            "size": pool.size() if hasattr(pool, "size") else None,
+            "max_overflow": settings.DB_MAX_OVERFLOW,
+            "checked_in": pool.checkedin() if hasattr(pool, "checkedin") else None,
+            "in_use": self.in_use,
+            "max_in_use": self.max_in_use,
+            "overflow": pool.overflow() if hasattr(pool, "overflow") else None,
+            "checkouts": self.checkouts,
+            "timeouts": self.timeouts,
+            "wait_count": self.wait_count,
+            "wait_avg": self.wait_sum / self.wait_count if self.wait_count else 0.0,
+            "wait_max": self.wait_max,
+            "wait_buckets": buckets
+        }
+
+
+pool_stats = PoolStats()
+
+
+def _pool_metrics() -> list:
+    """Состояние пула и гистограмма ожидания соединения для /metrics"""
+    snapshot = pool_stats.snapshot()
+    lines = []
+    lines += gauge_lines("db_pool_size", "Configured pool size", snapshot["size"])
+    lines += gauge_lines("db_pool_in_use", "Connections checked out", snapshot["in_use"])
+    lines += gauge_lines("db_pool_max_in_use", "Peak connections checked out", snapshot["max_in_use"])
+    lines += gauge_lines("db_pool_checked_in", "Idle connections in the pool", snapshot["checked_in"])
+    lines += gauge_lines("db_pool_overflow", "Connections above pool size", snapshot["overflow"])
+    for name, documentation, value in (
+        ("db_pool_checkouts_total", "Connection checkouts", snapshot["checkouts"]),
+        ("db_pool_timeouts_total", "Checkouts that timed out waiting", snapshot["timeouts"])
+    ):
+        lines += [f"# HELP {name} {documentation}", f"# TYPE {name} counter", f"{name} {value}"]
+    lines += [
+        "# HELP db_pool_wait_seconds Time waiting for a pooled connection",
+        "# TYPE db_pool_wait_seconds histogram"
+    ]
+    lines += [f'db_pool_wait_seconds_bucket{{le="{bound}"}} {count}' for bound, count in snapshot["wait_buckets"].items()]
+    lines.append(f"db_pool_wait_seconds_count {pool_stats.wait_count}")
+    lines.append(f"db_pool_wait_seconds_sum {pool_stats.wait_sum}")
+    return lines
+
+
+registry.register_collector(_pool_metrics)
+
+_in_checkout: ContextVar[bool] = ContextVar("db_pool_checkout", default=False)
+
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """Пул asyncpg с замером времени ожидания свободного соединения"""
+
+    def _do_get(self):
+        # QueuePool._do_get вызывает себя повторно — замеряем только внешний вызов
+        if _in_checkout.get():
+            return super()._do_get()
+        token = _in_checkout.set(True)
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            pool_stats.timeouts += 1
+            raise
+        finally:
+            pool_stats.observe_wait(time.perf_counter() - started)
+            _in_checkout.reset(token)
+
+
+def async_url(url: str) -> str:
+    if url.startswith("postgresql://"):
+        url = url.replace("postgresql://", "postgresql+asyncpg://", 1)
+    return url
+
+
+def engine_options(url: str, instrumented: bool = True) -> dict:
+    """Настройки пула; SQLite (тесты, локальный запуск) работает с пулом по умолчанию"""
+    if url.startswith("sqlite"):
+        return {}
+    return {
+        "poolclass": InstrumentedPool if instrumented else AsyncAdaptedQueuePool,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        "connect_args": {
+            # Кэш prepared statements драйвера и кэш SQLAlchemy поверх него
+            "statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+            "prepared_statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE
+        }
+    }
+
 
 # Создаем async engine
-database_url = settings.DATABASE_URL
-if database_url.startswith("postgresql://"):
-    database_url = database_url.replace("postgresql://", "postgresql+asyncpg://", 1)
+database_url = async_url(settings.DATABASE_URL)
 
 engine = create_async_engine(
     database_url,
     echo=False,
-    future=True
+    future=True,
+    **engine_options(database_url)
 )
 
+
+@event.listens_for(engine.sync_engine, "checkout")
+def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+    pool_stats.checkouts += 1
+    pool_stats.in_use += 1
+    pool_stats.max_in_use = max(pool_stats.max_in_use, pool_stats.in_use)
+
+
+@event.listens_for(engine.sync_engine, "checkin")
+def _on_checkin(dbapi_connection, connection_record):
+    pool_stats.in_use = max(pool_stats.in_use - 1, 0)
+
+
 # Создаем session factory
 AsyncSessionLocal = async_sessionmaker(
     engine,
@@ -31,4 +172,3 @@ async def get_db():
             yield session
         finally:
             await session.close()
-
@@ -1,10 +1,11 @@
-from fastapi import Depends, HTTPException, status
+from typing import Optional
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.database import get_db
+from app.core.principals import Principal, principal_cache
+from app.core.replicas import replica_router
 from app.core.security import decode_access_token
-from app.models.user import User
-from sqlalchemy import select
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login")
 
@@ -12,8 +13,8 @@ oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login")
 async def get_current_user(
     token: str = Depends(oauth2_scheme),
     db: AsyncSession = Depends(get_db)
-) -> User:
-    """Получение текущего пользователя из токена"""
+) -> Principal:
+    """Получение текущего пользователя из токена (через кэш principal)"""
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -24,12 +25,11 @@ async def get_current_user(
     if payload is None:
         raise credentials_exception
     
-    user_id: int = payload.get("sub")
+    user_id = _subject(payload)
     if user_id is None:
         raise credentials_exception
     
-    result = await db.execute(select(User).where(User.id == user_id))
-    user = result.scalar_one_or_none()
+    user = await principal_cache.get(db, user_id)
     
     if user is None:
         raise credentials_exception
@@ -38,8 +38,8 @@ async def get_current_user(
 
 
 async def get_current_active_user(
-    current_user: User = Depends(get_current_user)
-) -> User:
+    current_user: Principal = Depends(get_current_user)
+) -> Principal:
     """Проверка активности пользователя"""
     if not current_user.is_active:
         raise HTTPException(status_code=400, detail="Inactive user")
@@ -47,8 +47,8 @@ async def get_current_active_user(
 
 
 async def get_current_admin_user(
-    current_user: User = Depends(get_current_active_user)
-) -> User:
+    current_user: Principal = Depends(get_current_active_user)
+) -> Principal:
     """Проверка прав администратора"""
     if not current_user.is_admin:
         raise HTTPException(
@@ -57,3 +57,34 @@ async def get_current_admin_user(
         )
     return current_user
 
+
+def _subject(payload: dict) -> Optional[int]:
+    try:
+        return int(payload["sub"])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def _token_user_id(request: Request) -> Optional[str]:
+    """ID пользователя из Bearer-токена без обращения к БД (None, если токена нет)"""
+    authorization = request.headers.get("authorization", "")
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    payload = decode_access_token(token)
+    if payload is None or payload.get("sub") is None:
+        return None
+    return str(payload["sub"])
+
+
+async def get_read_db(request: Request):
+    """
+    Dependency для сессии чтения: реплика, если она не отстает,
+    иначе primary. Пользователь, который недавно писал, читает с primary.
+    """
+    factory = await replica_router.session_factory(_token_user_id(request))
+    async with factory() as session:
+        try:
+            yield session
+        finally:
+            await session.close()
@@ -0,0 +1,117 @@
+import math
+from typing import List, Tuple
+
+_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+_DECODE = {char: index for index, char in enumerate(_BASE32)}
+
+
+def encode(latitude: float, longitude: float, precision: int = 8) -> str:
+    """Geohash точки заданной длины"""
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    chars = []
+    bits = 0
+    bit_count = 0
+    even = True  # четные биты кодируют долготу
+    while len(chars) < precision:
+        if even:
+            mid = (lon_range[0] + lon_range[1]) / 2
+            if longitude >= mid:
+                bits = (bits << 1) | 1
+                lon_range[0] = mid
+            else:
+                bits <<= 1
+                lon_range[1] = mid
+        else:
+            mid = (lat_range[0] + lat_range[1]) / 2
+            if latitude >= mid:
+                bits = (bits << 1) | 1
+                lat_range[0] = mid
+            else:
+                bits <<= 1
+                lat_range[1] = mid
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(_BASE32[bits])
+            bits = 0
+            bit_count = 0
+    return "".join(chars)
+
+
+def bounds(geohash: str) -> Tuple[float, float, float, float]:
+    """Границы ячейки: (min_lat, min_lon, max_lat, max_lon)"""
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    even = True
+    for char in geohash:
+        value = _DECODE[char]
+        for shift in range(4, -1, -1):
+            bit = (value >> shift) & 1
+            target = lon_range if even else lat_range
+            mid = (target[0] + target[1]) / 2
+            if bit:
+                target[0] = mid
+            else:
+                target[1] = mid
+            even = not even
+    return lat_range[0], lon_range[0], lat_range[1], lon_range[1]
+
+
+def decode(geohash: str) -> Tuple[float, float]:
+    """Центр ячейки: (lat, lon)"""
+    min_lat, min_lon, max_lat, max_lon = bounds(geohash)
+    return (min_lat + max_lat) / 2, (min_lon + max_lon) / 2
+
+
+def cell_size(precision: int) -> Tuple[float, float]:
+    """Размер ячейки заданной длины в градусах: (высота, ширина)"""
+    lon_bits = (5 * precision + 1) // 2
+    lat_bits = 5 * precision // 2
+    return 180.0 / (1 << lat_bits), 360.0 / (1 << lon_bits)
+
+
+def neighbors(geohash: str) -> List[str]:
+    """Восемь соседних ячеек той же длины"""
+    lat, lon = decode(geohash)
+    height, width = cell_size(len(geohash))
+    result = []
+    for d_lat in (-1, 0, 1):
+        for d_lon in (-1, 0, 1):
+            if d_lat == 0 and d_lon == 0:
+                continue
+            n_lat = lat + d_lat * height
+            if not -90.0 <= n_lat <= 90.0:
+                continue
+            n_lon = (lon + d_lon * width + 180.0) % 360.0 - 180.0
+            result.append(encode(n_lat, n_lon, len(geohash)))
+    return result
+
+
+def cover(
+    min_lat: float,
+    min_lon: float,
+    max_lat: float,
+    max_lon: float,
+    max_precision: int = 9,
+    max_cells: int = 16
+) -> List[str]:
+    """
+    Префиксы geohash, покрывающие прямоугольник: самая длинная длина
+    (не больше max_precision), при которой ячеек не больше max_cells
+    """
+    max_lat = min(max_lat, 90.0 - 1e-9)
+    max_lon = min(max_lon, 180.0 - 1e-9)
+    for precision in range(max_precision, 0, -1):
+        height, width = cell_size(precision)
+        row0 = math.floor((min_lat + 90.0) / height)
+        col0 = math.floor((min_lon + 180.0) / width)
+        rows = math.floor((max_lat + 90.0) / height) - row0 + 1
+        cols = math.floor((max_lon + 180.0) / width) - col0 + 1
+        if rows * cols <= max_cells:
+            break
+    return sorted({
+        encode((row0 + r + 0.5) * height - 90.0, (col0 + c + 0.5) * width - 180.0, precision)
+        for r in range(rows)
+        for c in range(cols)
+    })
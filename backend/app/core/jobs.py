@@ -0,0 +1,54 @@
+import asyncio
+import logging
+from typing import Coroutine, Dict
+
+logger = logging.getLogger(__name__)
+
+
+class JobRunner:
+    """
+    Длительные фоновые задачи процесса (импорт, экспорт), запущенные из запросов.
+    Хранит ссылки на задачи, не дает запустить одну задачу дважды
+    и отменяет оставшиеся при остановке приложения.
+    """
+
+    def __init__(self):
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+    def running(self, key: str) -> bool:
+        task = self._tasks.get(key)
+        return task is not None and not task.done()
+
+    def spawn(self, key: str, coro: Coroutine) -> bool:
+        """Запуск задачи; False, если задача с таким ключом уже выполняется"""
+        if self.running(key):
+            coro.close()
+            return False
+        task = asyncio.create_task(coro, name=key)
+        self._tasks[key] = task
+        task.add_done_callback(lambda done: self._done(key, done))
+        return True
+
+    def _done(self, key: str, task: asyncio.Task):
+        if self._tasks.get(key) is task:
+            del self._tasks[key]
+        if not task.cancelled() and task.exception() is not None:
+            logger.error("Job %s failed: %s", key, task.exception())
+
+    def cancel(self, key: str) -> bool:
+        task = self._tasks.get(key)
+        if task is None or task.done():
+            return False
+        task.cancel()
+        return True
+
+    async def stop(self):
+        """Отмена выполняющихся задач (вызывается из lifespan)"""
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._tasks.clear()
+
+
+job_runner = JobRunner()
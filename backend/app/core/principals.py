@@ -0,0 +1,102 @@
+import json
+import logging
+from dataclasses import dataclass, asdict
+from typing import Optional
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.redis import get_redis
+from app.models.user import User, UserRole
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class Principal:
+    """Аутентифицированный пользователь: только поля, нужные для проверки прав"""
+    id: int
+    email: str
+    role: UserRole
+    is_active: bool
+    is_admin: bool
+
+    @classmethod
+    def from_user(cls, user: User) -> "Principal":
+        return cls(
+            id=user.id,
+            email=user.email,
+            role=user.role,
+            is_active=bool(user.is_active),
+            is_admin=bool(user.is_admin)
+        )
+
+
+class PrincipalCache:
+    """
+    Кэш Principal по ID пользователя: короткий TTL в процессе
+    и, опционально, более долгий в Redis. Сбрасывается при изменении пользователя.
+    """
+
+    def __init__(self):
+        self._local = TTLCache(max_size=settings.USER_CACHE_MAX_SIZE, ttl=settings.USER_CACHE_TTL)
+
+    def _redis(self):
+        return get_redis() if settings.USER_CACHE_REDIS else None
+
+    @staticmethod
+    def _key(user_id: int) -> str:
+        return f"principal:{user_id}"
+
+    async def get(self, db: AsyncSession, user_id: int) -> Optional[Principal]:
+        """Principal из кэша или из БД (None, если пользователя нет)"""
+        principal = self._local.get(user_id)
+        if principal is not None:
+            return principal
+
+        redis = self._redis()
+        if redis is not None:
+            try:
+                raw = await redis.get(self._key(user_id))
+                if raw:
+                    data = json.loads(raw)
+                    principal = Principal(**{**data, "role": UserRole(data["role"])})
+                    self._local.set(user_id, principal)
+                    return principal
+            except Exception as e:
+                logger.warning("Redis principal lookup failed: %s", e)
+
+        result = await db.execute(select(User).where(User.id == user_id))
+        user = result.scalar_one_or_none()
+        if user is None:
+            return None
+        principal = Principal.from_user(user)
+        await self.set(principal)
+        return principal
+
+    async def set(self, principal: Principal):
+        self._local.set(principal.id, principal)
+        redis = self._redis()
+        if redis is not None:
+            try:
+                data = {**asdict(principal), "role": principal.role.value}
+                await redis.set(
+                    self._key(principal.id),
+                    json.dumps(data),
+                    ex=settings.USER_CACHE_REDIS_TTL
+                )
+            except Exception as e:
+                logger.warning("Redis principal store failed: %s", e)
+
+    async def invalidate(self, user_id: int):
+        """Сброс записи после изменения прав, роли или активности пользователя"""
+        self._local.delete(user_id)
+        redis = self._redis()
+        if redis is not None:
+            try:
+                await redis.delete(self._key(user_id))
+            except Exception as e:
+                logger.warning("Redis principal invalidation failed: %s", e)
+
+
+principal_cache = PrincipalCache()
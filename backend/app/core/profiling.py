@@ -0,0 +1,291 @@
+import asyncio
+import itertools
+import logging
+import random
+import sys
+import threading
+import time
+from collections import Counter, deque
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_current: ContextVar[Optional["RequestProfile"]] = ContextVar("request_profile", default=None)
+
+# Запросы, которые не профилируются (мониторинг и сам профилировщик)
+EXCLUDED_PREFIXES = ("/metrics", "/health", "/api/v1/profiling")
+MAX_STATEMENT_LENGTH = 2000
+MAX_STACK_DEPTH = 64
+
+
+class RequestProfile:
+    """Данные одного запроса: SQL-запросы с длительностью и выборки стеков"""
+
+    __slots__ = (
+        "method", "path", "started_at", "started", "task", "thread_id",
+        "statements", "statements_dropped", "stacks", "samples", "finished"
+    )
+
+    def __init__(self, method: str, path: str):
+        self.method = method
+        self.path = path
+        self.started_at = datetime.now(timezone.utc)
+        self.started = time.perf_counter()
+        self.task = asyncio.current_task()
+        self.thread_id = threading.get_ident()
+        self.statements: List[Dict] = []
+        self.statements_dropped = 0
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self.finished = False
+
+
+def _frame_name(frame) -> str:
+    module = frame.f_globals.get("__name__", "?")
+    return f"{module}:{frame.f_code.co_qualname}"
+
+
+def _thread_stack(frame) -> List[str]:
+    """Стек потока цикла событий, от внешнего вызова к внутреннему"""
+    names = []
+    while frame is not None and len(names) < MAX_STACK_DEPTH:
+        names.append(_frame_name(frame))
+        frame = frame.f_back
+    return names[::-1]
+
+
+def _task_stack(task: asyncio.Task) -> List[str]:
+    """Стек приостановленной корутины задачи (где она ждет: БД, HTTP, to_thread)"""
+    names = []
+    coro = task.get_coro()
+    while coro is not None and len(names) < MAX_STACK_DEPTH:
+        frame = getattr(coro, "cr_frame", None) or getattr(coro, "gi_frame", None)
+        if frame is None:
+            break
+        names.append(_frame_name(frame))
+        coro = getattr(coro, "cr_await", None) or getattr(coro, "gi_yieldfrom", None)
+    return names
+
+
+class Profiler:
+    """
+    Профилировщик медленных запросов. Пока он включен, отдельный поток раз
+    в PROFILING_SAMPLE_INTERVAL секунд снимает стеки выполняющихся запросов
+    (работающий — стек потока, ожидающие — стек корутины), а события SQLAlchemy
+    записывают SQL с длительностью. Запросы дольше порога попадают в кольцевой
+    буфер. Выключенный профилировщик — только проверка флага в middleware.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.threshold_ms = settings.PROFILING_THRESHOLD_MS
+        self.sample_interval = settings.PROFILING_SAMPLE_INTERVAL
+        self.sample_rate = settings.PROFILING_SAMPLE_RATE
+        self.max_statements = settings.PROFILING_MAX_STATEMENTS
+        self.max_stacks = settings.PROFILING_MAX_STACKS
+        self._records: deque = deque(maxlen=settings.PROFILING_BUFFER_SIZE)
+        self._ids = itertools.count(1)
+        self._active: Dict[int, RequestProfile] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def enable(self):
+        if self.enabled:
+            return
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+        event.listen(Engine, "handle_error", _handle_error)
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._sample_loop, name="profiler", daemon=True)
+        self._thread.start()
+        self.enabled = True
+
+    def disable(self):
+        if not self.enabled:
+            return
+        self.enabled = False
+        event.remove(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.remove(Engine, "after_cursor_execute", _after_cursor_execute)
+        event.remove(Engine, "handle_error", _handle_error)
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+        with self._lock:
+            self._active.clear()
+
+    def begin(self, method: str, path: str) -> Optional[RequestProfile]:
+        """Начало профилирования запроса; None, если запрос не выбран"""
+        if not self.enabled or path.startswith(EXCLUDED_PREFIXES):
+            return None
+        if self.sample_rate < 1.0 and random.random() >= self.sample_rate:
+            return None
+        profile = RequestProfile(method, path)
+        with self._lock:
+            self._active[id(profile)] = profile
+        _current.set(profile)
+        return profile
+
+    def end(self, profile: RequestProfile, status_code: int) -> Optional[Dict]:
+        """Завершение профилирования; запрос дольше порога сохраняется в буфер"""
+        duration_ms = (time.perf_counter() - profile.started) * 1000
+        with self._lock:
+            self._active.pop(id(profile), None)
+            profile.finished = True
+        if duration_ms < self.threshold_ms:
+            return None
+
+        record = {
+            "id": next(self._ids),
+            "method": profile.method,
+            "path": profile.path,
+            "status_code": status_code,
+            "started_at": profile.started_at,
+            "duration_ms": round(duration_ms, 2),
+            "sql_count": len(profile.statements) + profile.statements_dropped,
+            "sql_ms": round(sum(statement["duration_ms"] for statement in profile.statements), 2),
+            "statements": profile.statements,
+            "statements_dropped": profile.statements_dropped,
+            "samples": profile.samples,
+            "stacks": [
+                {"stack": stack, "count": count}
+                for stack, count in profile.stacks.most_common(self.max_stacks)
+            ]
+        }
+        self._records.append(record)
+        return record
+
+    def _sample_loop(self):
+        while not self._stop.wait(self.sample_interval):
+            with self._lock:
+                active = list(self._active.values())
+            if not active:
+                continue
+            frames = sys._current_frames()
+            for profile in active:
+                try:
+                    loop = profile.task.get_loop()
+                    if asyncio.current_task(loop) is profile.task:
+                        stack = _thread_stack(frames.get(profile.thread_id))
+                    else:
+                        stack = ["(await)"] + _task_stack(profile.task)
+                except Exception:
+                    # Стек изменился во время обхода — выборка пропускается
+                    continue
+                with self._lock:
+                    if not profile.finished:
+                        profile.stacks[";".join(stack)] += 1
+                        profile.samples += 1
+
+    def configure(
+        self,
+        enabled: Optional[bool] = None,
+        threshold_ms: Optional[float] = None,
+        sample_rate: Optional[float] = None
+    ):
+        if threshold_ms is not None:
+            self.threshold_ms = threshold_ms
+        if sample_rate is not None:
+            self.sample_rate = sample_rate
+        if enabled is True:
+            self.enable()
+        elif enabled is False:
+            self.disable()
+
+    def status(self) -> Dict:
+        return {
+            "enabled": self.enabled,
+            "threshold_ms": self.threshold_ms,
+            "sample_interval_ms": self.sample_interval * 1000,
+            "sample_rate": self.sample_rate,
+            "buffer_size": self._records.maxlen,
+            "captured": len(self._records)
+        }
+
+    def records(self) -> List[Dict]:
+        """Сохраненные запросы, последние первыми"""
+        return list(reversed(self._records))
+
+    def get(self, profile_id: int) -> Optional[Dict]:
+        for record in self._records:
+            if record["id"] == profile_id:
+                return record
+        return None
+
+    def clear(self) -> int:
+        removed = len(self._records)
+        self._records.clear()
+        return removed
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current.get() is not None:
+        conn.info.setdefault("profiling_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    profile = _current.get()
+    if profile is None:
+        return
+    started = conn.info.get("profiling_started")
+    if not started:
+        return
+    duration_ms = (time.perf_counter() - started.pop()) * 1000
+    if profile.finished:
+        return  # фоновая задача, запущенная запросом, пережила его
+    if len(profile.statements) >= profiler.max_statements:
+        profile.statements_dropped += 1
+        return
+    # Параметры не сохраняются: в них могут быть персональные данные
+    profile.statements.append({
+        "statement": statement[:MAX_STATEMENT_LENGTH],
+        "duration_ms": round(duration_ms, 3),
+        "executemany": executemany
+    })
+
+
+def _handle_error(context):
+    # after_cursor_execute не вызывается для упавшего запроса: время его начала снимается здесь
+    connection = context.connection
+    if connection is None or context.execution_context is None:
+        return  # ошибка подключения, а не выполнения запроса
+    started = connection.info.get("profiling_started")
+    if started:
+        started.pop()
+
+profiler = Profiler()
+
+
+class ProfilingMiddleware:
+    """ASGI middleware профилировщика; при выключенном профилировщике запрос проходит без изменений"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if not profiler.enabled or scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        profile = profiler.begin(scope["method"], scope["path"])
+        if profile is None:
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current.set(None)
+            profiler.end(profile, status_code)
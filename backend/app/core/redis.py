@@ -0,0 +1,30 @@
+from app.core.config import settings
+
+try:
+    from redis import asyncio as aioredis
+except ImportError:  # redis не установлен — работаем без второго уровня кэша
+    aioredis = None
+
+_client = None
+
+
+def get_redis():
+    """Общий async-клиент Redis (REDIS_URL) или None, если Redis недоступен"""
+    global _client
+    if aioredis is None or not settings.REDIS_URL:
+        return None
+    if _client is None:
+        _client = aioredis.from_url(
+            settings.REDIS_URL,
+            decode_responses=True,
+            socket_timeout=1.0,
+            socket_connect_timeout=1.0
+        )
+    return _client
+
+
+async def close_redis():
+    global _client
+    if _client is not None:
+        await _client.close()
+        _client = None
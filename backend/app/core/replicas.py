@@ -0,0 +1,154 @@
+import asyncio
+import logging
+import math
+from typing import List, Optional
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal, async_url, engine_options
+from app.core.redis import get_redis
+
+logger = logging.getLogger(__name__)
+
+# Отставание реплики в секундах; 0, если реплика догнала primary или это не реплика
+LAG_QUERY = text("""
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+""")
+
+
+class Replica:
+    """Реплика для чтения: свой engine, фабрика сессий и последнее измеренное отставание"""
+
+    def __init__(self, url: str):
+        self.url = async_url(url)
+        self.engine = create_async_engine(self.url, **engine_options(self.url, instrumented=False))
+        self.sessionmaker = async_sessionmaker(self.engine, class_=AsyncSession, expire_on_commit=False)
+        self.lag: Optional[float] = None  # None — еще не проверена или недоступна
+        self.error: Optional[str] = None
+
+    @property
+    def host(self) -> str:
+        return self.engine.url.host or self.url
+
+
+class ReplicaRouter:
+    """
+    Выбор сессии для чтения: реплики по кругу, если их отставание в пределах
+    DB_REPLICA_MAX_LAG; primary — если реплик нет, все отстают или пользователь
+    недавно записывал (read-your-writes).
+    """
+
+    def __init__(self, urls: List[str]):
+        self.replicas = [Replica(url) for url in urls]
+        self._writes = TTLCache(max_size=100000, ttl=settings.READ_YOUR_WRITES_WINDOW)
+        self._next = 0
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.replicas)
+
+    async def start(self):
+        """Первая проверка отставания и запуск периодического мониторинга"""
+        if not self.enabled:
+            return
+        await self.check()
+        self._task = asyncio.create_task(self._monitor())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        for replica in self.replicas:
+            await replica.engine.dispose()
+
+    async def _monitor(self):
+        while True:
+            await asyncio.sleep(settings.DB_REPLICA_CHECK_INTERVAL)
+            await self.check()
+
+    async def check(self):
+        await asyncio.gather(*(self._check(replica) for replica in self.replicas))
+
+    async def _check(self, replica: Replica):
+        try:
+            async with replica.engine.connect() as conn:
+                result = await asyncio.wait_for(conn.execute(LAG_QUERY), timeout=2.0)
+                replica.lag = float(result.scalar() or 0.0)
+            replica.error = None
+        except Exception as e:
+            if replica.error is None:
+                logger.warning("Read replica %s is unavailable: %s", replica.host, e)
+            replica.lag = None
+            replica.error = str(e)
+
+    def healthy(self) -> List[Replica]:
+        return [
+            replica for replica in self.replicas
+            if replica.lag is not None and replica.lag <= settings.DB_REPLICA_MAX_LAG
+        ]
+
+    async def mark_write(self, user_id: Optional[int]):
+        """Отметка записи пользователя: его чтения временно идут на primary"""
+        if not self.enabled or user_id is None:
+            return
+        self._writes.set(str(user_id), True)
+        redis = get_redis() if settings.READ_YOUR_WRITES_REDIS else None
+        if redis is not None:
+            try:
+                await redis.set(
+                    f"ryw:{user_id}",
+                    1,
+                    ex=max(1, math.ceil(settings.READ_YOUR_WRITES_WINDOW))
+                )
+            except Exception as e:
+                logger.warning("Redis read-your-writes mark failed: %s", e)
+
+    async def recently_wrote(self, user_id: Optional[int]) -> bool:
+        if user_id is None:
+            return False
+        if self._writes.get(str(user_id)):
+            return True
+        redis = get_redis() if settings.READ_YOUR_WRITES_REDIS else None
+        if redis is not None:
+            try:
+                return bool(await redis.exists(f"ryw:{user_id}"))
+            except Exception as e:
+                logger.warning("Redis read-your-writes check failed: %s", e)
+                return True  # не знаем — безопаснее читать с primary
+        return False
+
+    async def session_factory(self, user_id: Optional[int] = None):
+        """Фабрика сессий для чтения"""
+        if not self.enabled or await self.recently_wrote(user_id):
+            return AsyncSessionLocal
+        candidates = self.healthy()
+        if not candidates:
+            return AsyncSessionLocal
+        self._next = (self._next + 1) % len(candidates)
+        return candidates[self._next].sessionmaker
+
+    def status(self) -> List[dict]:
+        return [
+            {
+                "host": replica.host,
+                "lag": replica.lag,
+                "healthy": replica in self.healthy(),
+                "error": replica.error
+            }
+            for replica in self.replicas
+        ]
+
+
+replica_router = ReplicaRouter(
+    [url.strip() for url in settings.DATABASE_READ_URLS.split(",") if url.strip()]
+)
@@ -2,7 +2,11 @@ from app.models.user import User
 from app.models.appeal import Appeal, AppealStatus, AppealCategory
 from app.models.department import Department
 from app.models.comment import Comment
-from app.models.analytics import AnalyticsEvent
+from app.models.analytics import AnalyticsEvent, AppealStatsDaily
+from app.models.duplicate import AppealLSHBucket
+from app.models.embedding import AppealEmbedding
+from app.models.import_job import ImportJob, ImportStatus
+from app.models.export_job import ExportJob, ExportStatus
 
 __all__ = [
     "User",
@@ -11,6 +15,13 @@ __all__ = [
     "AppealCategory",
     "Department",
     "Comment",
-    "AnalyticsEvent"
+    "AnalyticsEvent",
+    "AppealStatsDaily",
+    "AppealLSHBucket",
+    "AppealEmbedding",
+    "ImportJob",
+    "ImportStatus",
+    "ExportJob",
+    "ExportStatus"
 ]
 
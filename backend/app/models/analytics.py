@@ -1,6 +1,7 @@
-from sqlalchemy import Column, Integer, String, DateTime, JSON, Float
+from sqlalchemy import Column, Integer, String, DateTime, Date, JSON, Float, Enum, UniqueConstraint
 from sqlalchemy.sql import func
 from app.core.database import Base
+from app.models.appeal import AppealStatus, AppealCategory, AppealPriority
 
 
 class AnalyticsEvent(Base):
@@ -10,6 +11,33 @@ class AnalyticsEvent(Base):
     event_type = Column(String, nullable=False)  # appeal_created, appeal_resolved, etc.
     user_id = Column(Integer, nullable=True)
     appeal_id = Column(Integer, nullable=True)
-    metadata = Column(JSON, nullable=True)
+    # Имя "metadata" зарезервировано в Declarative API, колонка сохраняет прежнее имя
+    event_metadata = Column("metadata", JSON, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
+
+
+class AppealStatsDaily(Base):
+    """
+    Свертка обращений по дню создания и измерениям дашборда.
+    Поддерживается инкрементально при создании и изменении обращений.
+    Отсутствующие район и тональность хранятся как пустая строка.
+    """
+    __tablename__ = "appeal_stats_daily"
+    __table_args__ = (
+        UniqueConstraint(
+            "day", "status", "category", "priority", "district", "sentiment",
+            name="uq_appeal_stats_daily_bucket"
+        ),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    day = Column(Date, nullable=False, index=True)
+    status = Column(Enum(AppealStatus), nullable=False)
+    category = Column(Enum(AppealCategory), nullable=False)
+    priority = Column(Enum(AppealPriority), nullable=False)
+    district = Column(String, nullable=False, default="")
+    sentiment = Column(String, nullable=False, default="")
+    count = Column(Integer, nullable=False, default=0)
+    resolved_with_time = Column(Integer, nullable=False, default=0)  # решенные с resolved_at
+    resolution_hours_sum = Column(Float, nullable=False, default=0.0)
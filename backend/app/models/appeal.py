@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Float, Enum, JSON
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Float, Enum, JSON, Boolean, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 import enum
@@ -32,6 +32,12 @@ class AppealPriority(str, enum.Enum):
     URGENT = "urgent"
 
 
+class EnrichmentStatus(str, enum.Enum):
+    PENDING = "pending"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+
 class Appeal(Base):
     __tablename__ = "appeals"
 
@@ -47,9 +53,11 @@ class Appeal(Base):
     longitude = Column(Float, nullable=True)
     address = Column(String, nullable=True)
     district = Column(String, nullable=True)
+    geohash = Column(String(12), nullable=True)  # поиск по области: префиксы geohash (B-tree)
     
     # Медиа
     images = Column(JSON, default=list)  # Список путей к изображениям
+    image_variants = Column(JSON, nullable=True)  # путь изображения -> {вариант: путь}
     audio = Column(String, nullable=True)  # Путь к аудио файлу
     
     # AI анализ
@@ -58,6 +66,15 @@ class Appeal(Base):
     ai_confidence = Column(Float, nullable=True)
     is_duplicate = Column(Boolean, default=False)
     duplicate_of = Column(Integer, ForeignKey("appeals.id"), nullable=True)
+    minhash_signature = Column(JSON, nullable=True)  # MinHash-сигнатура текста для поиска дубликатов
+    enrichment_status = Column(
+        Enum(EnrichmentStatus),
+        default=EnrichmentStatus.PENDING,
+        nullable=False
+    )
+    enriched_at = Column(DateTime(timezone=True), nullable=True)
+    enrichment_claimed_at = Column(DateTime(timezone=True), nullable=True)  # взято в обработку воркером
+    category_from_user = Column(Boolean, default=False, nullable=False)  # категорию указал автор: обогащение ее не меняет
     
     # Связи
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -73,3 +90,18 @@ class Appeal(Base):
     department = relationship("Department", backref="appeals")
     comments = relationship("Comment", back_populates="appeal", cascade="all, delete-orphan")
 
+
+# Индексы под выборки списка: фильтр + сортировка (created_at DESC, id DESC), включая курсор
+Index("ix_appeals_created_at_id", Appeal.created_at.desc(), Appeal.id.desc())
+Index("ix_appeals_user_id_created_at", Appeal.user_id, Appeal.created_at.desc(), Appeal.id.desc())
+Index("ix_appeals_status_created_at", Appeal.status, Appeal.created_at.desc(), Appeal.id.desc())
+Index("ix_appeals_category_created_at", Appeal.category, Appeal.created_at.desc(), Appeal.id.desc())
+# Поиск обращений рядом с точкой и в прямоугольнике
+Index("ix_appeals_geohash", Appeal.geohash)
+# Очередь обогащения при старте: только необработанные обращения
+Index(
+    "ix_appeals_enrichment_pending",
+    Appeal.id,
+    postgresql_where=Appeal.enrichment_status == EnrichmentStatus.PENDING
+)
+
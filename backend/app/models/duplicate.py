@@ -0,0 +1,15 @@
+from sqlalchemy import Column, Integer, BigInteger, ForeignKey
+from app.core.database import Base
+
+
+class AppealLSHBucket(Base):
+    """LSH-корзина MinHash-сигнатуры обращения (индекс поиска дубликатов)"""
+    __tablename__ = "appeal_lsh_buckets"
+
+    bucket = Column(BigInteger, primary_key=True)
+    appeal_id = Column(
+        Integer,
+        ForeignKey("appeals.id", ondelete="CASCADE"),
+        primary_key=True,
+        index=True
+    )
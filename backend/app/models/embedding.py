@@ -0,0 +1,19 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, LargeBinary
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+
+class AppealEmbedding(Base):
+    """Эмбеддинг текста обращения (float32-вектор) для семантического поиска"""
+    __tablename__ = "appeal_embeddings"
+
+    id = Column(Integer, primary_key=True, index=True)
+    appeal_id = Column(
+        Integer,
+        ForeignKey("appeals.id", ondelete="CASCADE"),
+        nullable=False,
+        unique=True
+    )
+    model = Column(String, nullable=False)
+    vector = Column(LargeBinary, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
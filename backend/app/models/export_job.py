@@ -0,0 +1,39 @@
+from sqlalchemy import Column, Integer, BigInteger, String, Text, DateTime, ForeignKey, Enum, JSON
+from sqlalchemy.sql import func
+import enum
+from app.core.database import Base
+
+
+class ExportStatus(str, enum.Enum):
+    PENDING = "pending"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"  # в том числе прерванные остановкой процесса
+
+
+class ExportJob(Base):
+    """Фоновая выгрузка обращений или PDF-отчета; готовый файл хранится EXPORT_RETENTION секунд"""
+    __tablename__ = "export_jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    kind = Column(String, nullable=False)  # appeals, dashboard
+    format = Column(String, nullable=False)  # csv, xlsx, jsonl, pdf
+    params = Column(JSON, nullable=False, default=dict)  # фильтры выгрузки или days отчета
+    status = Column(Enum(ExportStatus), default=ExportStatus.PENDING, nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+
+    rows_done = Column(Integer, nullable=False, default=0)
+    size = Column(BigInteger, nullable=False, default=0)  # байт записано в файл
+    path = Column(String, nullable=True)  # файл на сервере
+    filename = Column(String, nullable=True)  # имя файла при скачивании
+    error = Column(Text, nullable=True)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+    expires_at = Column(DateTime(timezone=True), nullable=True)  # после этого файл удаляется
+
+    @property
+    def download_ready(self) -> bool:
+        """Файл сформирован и еще не удален по сроку хранения"""
+        return self.status == ExportStatus.COMPLETED and self.path is not None
@@ -0,0 +1,49 @@
+from sqlalchemy import Column, Integer, BigInteger, String, Text, DateTime, ForeignKey, Enum, JSON, Boolean
+from sqlalchemy.sql import func
+import enum
+from app.core.database import Base
+
+
+class ImportStatus(str, enum.Enum):
+    PENDING = "pending"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"  # в том числе прерванные остановкой процесса
+    CANCELLED = "cancelled"
+
+
+class ImportJob(Base):
+    """
+    Задача массового импорта обращений. Счетчики обновляются в одной транзакции
+    с каждым записанным пакетом, поэтому rows_done — точка продолжения после сбоя.
+    """
+    __tablename__ = "import_jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    source = Column(String, nullable=False)  # путь к файлу на сервере
+    filename = Column(String, nullable=True)  # исходное имя файла
+    format = Column(String, nullable=False)  # csv, jsonl
+    options = Column(JSON, nullable=False, default=dict)  # classify, geocode, encoding, batch_size
+    status = Column(Enum(ImportStatus), default=ImportStatus.PENDING, nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)  # автор импортированных обращений
+
+    rows_done = Column(Integer, nullable=False, default=0)  # обработанные строки файла (и записанные, и ошибочные)
+    inserted = Column(Integer, nullable=False, default=0)
+    failed = Column(Integer, nullable=False, default=0)
+    bytes_done = Column(BigInteger, nullable=False, default=0)
+    bytes_total = Column(BigInteger, nullable=False, default=0)
+    errors = Column(JSON, nullable=False, default=list)  # первые ошибки строк: [{"line", "error"}]
+    error = Column(Text, nullable=True)  # причина остановки задачи
+    cancel_requested = Column(Boolean, nullable=False, default=False)
+    owner = Column(String, nullable=True)  # токен захвата (claim): пакеты пишет только его владелец
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), nullable=True)  # последний пакет или продление захвата
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+
+    @property
+    def progress(self) -> float:
+        """Доля прочитанного файла, 0..1"""
+        if not self.bytes_total:
+            return 1.0 if self.status == ImportStatus.COMPLETED else 0.0
+        return min(1.0, self.bytes_done / self.bytes_total)
@@ -3,11 +3,25 @@ from app.schemas.appeal import (
     AppealCreate,
     AppealUpdate,
     AppealResponse,
+    AppealEnrichmentResponse,
+    SimilarAppealResponse,
+    NearbyAppealResponse,
+    AppealCluster,
+    AppealClusterResponse,
     AppealListResponse
 )
 from app.schemas.department import DepartmentCreate, DepartmentResponse
 from app.schemas.comment import CommentCreate, CommentResponse
-from app.schemas.analytics import AnalyticsResponse
+from app.schemas.analytics import AnalyticsResponse, AICacheStats, AICacheInvalidateResponse, StatsRebuildResponse
+from app.schemas.profiling import (
+    ProfilingStatus,
+    ProfilingUpdate,
+    ProfilingClearResponse,
+    SlowRequestSummary,
+    SlowRequestProfile
+)
+from app.schemas.import_job import ImportJobResponse, ImportRowError
+from app.schemas.export_job import ExportCreate, ExportJobResponse
 
 __all__ = [
     "UserCreate",
@@ -18,11 +32,28 @@ __all__ = [
     "AppealCreate",
     "AppealUpdate",
     "AppealResponse",
+    "AppealEnrichmentResponse",
+    "SimilarAppealResponse",
+    "NearbyAppealResponse",
+    "AppealCluster",
+    "AppealClusterResponse",
     "AppealListResponse",
     "DepartmentCreate",
     "DepartmentResponse",
     "CommentCreate",
     "CommentResponse",
-    "AnalyticsResponse"
+    "AnalyticsResponse",
+    "AICacheStats",
+    "AICacheInvalidateResponse",
+    "StatsRebuildResponse",
+    "ProfilingStatus",
+    "ProfilingUpdate",
+    "ProfilingClearResponse",
+    "SlowRequestSummary",
+    "SlowRequestProfile",
+    "ImportJobResponse",
+    "ImportRowError",
+    "ExportCreate",
+    "ExportJobResponse"
 ]
 
@@ -14,3 +14,22 @@ class AnalyticsResponse(BaseModel):
     top_districts: List[Dict[str, Any]]
     sentiment_distribution: Dict[str, int]
 
+
+
+class AICacheStats(BaseModel):
+    namespace: str
+    model: str
+    prompt_version: int
+    size: int
+    hits: int
+    redis_hits: int
+    misses: int
+    hit_rate: float
+
+
+class AICacheInvalidateResponse(BaseModel):
+    removed: int
+
+
+class StatsRebuildResponse(BaseModel):
+    buckets: int
@@ -1,7 +1,7 @@
 from pydantic import BaseModel, Field
 from datetime import datetime
-from typing import List, Optional
-from app.models.appeal import AppealStatus, AppealCategory, AppealPriority
+from typing import Dict, List, Optional
+from app.models.appeal import AppealStatus, AppealCategory, AppealPriority, EnrichmentStatus
 
 
 class AppealBase(BaseModel):
@@ -32,10 +32,15 @@ class AppealResponse(AppealBase):
     priority: AppealPriority
     district: Optional[str] = None
     images: List[str] = []
+    image_variants: Optional[Dict[str, Dict[str, str]]] = None  # путь изображения -> {thumb, preview, web}
     audio: Optional[str] = None
     ai_summary: Optional[str] = None
     ai_sentiment: Optional[str] = None
     ai_confidence: Optional[float] = None
+    is_duplicate: Optional[bool] = False
+    duplicate_of: Optional[int] = None
+    enrichment_status: Optional[EnrichmentStatus] = None
+    enriched_at: Optional[datetime] = None
     user_id: int
     department_id: Optional[int] = None
     created_at: datetime
@@ -46,10 +51,52 @@ class AppealResponse(AppealBase):
         from_attributes = True
 
 
+class AppealEnrichmentResponse(BaseModel):
+    id: int
+    enrichment_status: EnrichmentStatus
+    enriched_at: Optional[datetime] = None
+    category: AppealCategory
+    priority: AppealPriority
+    district: Optional[str] = None
+    address: Optional[str] = None
+    ai_summary: Optional[str] = None
+    ai_sentiment: Optional[str] = None
+
+    class Config:
+        from_attributes = True
+
+
+class SimilarAppealResponse(BaseModel):
+    score: float
+    appeal: AppealResponse
+
+
+class NearbyAppealResponse(BaseModel):
+    distance_km: float  # от точки запроса (для bbox — от центра прямоугольника)
+    appeal: AppealResponse
+
+
+class AppealCluster(BaseModel):
+    geohash: str  # ячейка кластера
+    count: int
+    latitude: float  # центр обращений ячейки
+    longitude: float
+    appeal_id: Optional[int] = None  # только для ячейки с одним обращением
+
+
+class AppealClusterResponse(BaseModel):
+    zoom: int
+    precision: int  # длина geohash ячеек
+    total: int  # обращений во всех кластерах
+    clusters: List[AppealCluster]
+
+
 class AppealListResponse(BaseModel):
     items: List[AppealResponse]
-    total: int
+    total: Optional[int] = None  # None при count=none
     page: int
     size: int
-    pages: int
+    pages: Optional[int] = None
+    total_estimated: bool = False  # total — оценка планировщика
+    next_cursor: Optional[str] = None  # курсор следующей страницы, None на последней
 
@@ -0,0 +1,33 @@
+from pydantic import BaseModel, Field
+from datetime import datetime
+from typing import Any, Dict, Literal, Optional
+from app.models.appeal import AppealStatus
+from app.models.export_job import ExportStatus
+
+
+class ExportCreate(BaseModel):
+    kind: Literal["appeals", "dashboard"] = "appeals"
+    format: Optional[Literal["csv", "xlsx", "jsonl", "pdf"]] = None  # по умолчанию csv или pdf для dashboard
+    status: Optional[AppealStatus] = None  # фильтры выгрузки обращений
+    category: Optional[str] = None
+    days: int = Field(30, ge=1, le=365)  # период отчета dashboard
+
+
+class ExportJobResponse(BaseModel):
+    id: int
+    kind: str
+    format: str
+    params: Dict[str, Any]
+    status: ExportStatus
+    rows_done: int
+    size: int
+    filename: Optional[str] = None
+    error: Optional[str] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    expires_at: Optional[datetime] = None
+    download_ready: bool
+
+    class Config:
+        from_attributes = True
@@ -0,0 +1,31 @@
+from pydantic import BaseModel
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from app.models.import_job import ImportStatus
+
+
+class ImportRowError(BaseModel):
+    line: int
+    error: str
+
+
+class ImportJobResponse(BaseModel):
+    id: int
+    filename: Optional[str] = None
+    format: str
+    options: Dict[str, Any]
+    status: ImportStatus
+    rows_done: int
+    inserted: int
+    failed: int
+    bytes_done: int
+    bytes_total: int
+    progress: float
+    errors: List[ImportRowError] = []
+    error: Optional[str] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
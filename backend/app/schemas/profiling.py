@@ -0,0 +1,52 @@
+from pydantic import BaseModel, Field
+from typing import List, Optional
+from datetime import datetime
+
+
+class ProfiledStatement(BaseModel):
+    statement: str
+    duration_ms: float
+    executemany: bool
+
+
+class ProfiledStack(BaseModel):
+    stack: str  # кадры через ";" от внешнего к внутреннему; "(await)" — запрос ждал ввода-вывода
+    count: int
+
+
+class SlowRequestSummary(BaseModel):
+    id: int
+    method: str
+    path: str
+    status_code: int
+    started_at: datetime
+    duration_ms: float
+    sql_count: int
+    sql_ms: float
+    samples: int
+
+
+class SlowRequestProfile(SlowRequestSummary):
+    statements: List[ProfiledStatement]
+    statements_dropped: int
+    stacks: List[ProfiledStack]
+
+
+class ProfilingStatus(BaseModel):
+    enabled: bool
+    threshold_ms: float
+    sample_interval_ms: float
+    sample_rate: float
+    buffer_size: int
+    captured: int
+    requests: List[SlowRequestSummary] = []
+
+
+class ProfilingUpdate(BaseModel):
+    enabled: Optional[bool] = None
+    threshold_ms: Optional[float] = Field(None, ge=0)
+    sample_rate: Optional[float] = Field(None, gt=0, le=1)
+
+
+class ProfilingClearResponse(BaseModel):
+    removed: int
@@ -18,6 +18,8 @@ class UserUpdate(BaseModel):
     full_name: str | None = None
     phone: str | None = None
     is_active: bool | None = None
+    role: UserRole | None = None
+    is_admin: bool | None = None
 
 
 class UserResponse(UserBase):
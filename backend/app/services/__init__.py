@@ -2,11 +2,25 @@ from app.services.appeal_service import AppealService
 from app.services.user_service import UserService
 from app.services.analytics_service import AnalyticsService
 from app.services.geolocation_service import GeolocationService
+from app.services.enrichment_service import EnrichmentService
+from app.services.duplicate_service import DuplicateService
+from app.services.similarity_service import SimilarityService
+from app.services.stats_service import StatsService
+from app.services.cluster_service import ClusterService
+from app.services.storage_service import StorageService
+from app.services.image_service import ImageService
 
 __all__ = [
     "AppealService",
     "UserService",
     "AnalyticsService",
-    "GeolocationService"
+    "GeolocationService",
+    "EnrichmentService",
+    "DuplicateService",
+    "SimilarityService",
+    "StatsService",
+    "ClusterService",
+    "StorageService",
+    "ImageService"
 ]
 
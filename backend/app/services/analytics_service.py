@@ -1,9 +1,15 @@
+from collections import Counter
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, and_
-from typing import Dict, List
+from sqlalchemy import select, func, case
+from typing import Dict
 from datetime import datetime, timedelta
-from app.models.appeal import Appeal, AppealStatus
-from app.models.analytics import AnalyticsEvent
+from app.core.cache import SWRCache
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core.redis import get_redis
+from app.models.appeal import AppealStatus
+from app.models.analytics import AppealStatsDaily
+from app.services.event_sink import event_sink
 
 
 class AnalyticsService:
@@ -14,135 +20,116 @@ class AnalyticsService:
         db: AsyncSession,
         days: int = 30
     ) -> Dict:
-        """Получение статистики для дашборда"""
-        cutoff_date = datetime.utcnow() - timedelta(days=days)
-        
-        # Общее количество обращений
-        total_result = await db.execute(
-            select(func.count(Appeal.id))
-        )
-        total_appeals = total_result.scalar() or 0
-        
-        # Обращения по статусу
-        status_result = await db.execute(
-            select(Appeal.status, func.count(Appeal.id))
-            .where(Appeal.created_at >= cutoff_date)
-            .group_by(Appeal.status)
-        )
-        appeals_by_status = {status.value: count for status, count in status_result.all()}
-        
-        # Обращения по категории
-        category_result = await db.execute(
-            select(Appeal.category, func.count(Appeal.id))
-            .where(Appeal.created_at >= cutoff_date)
-            .group_by(Appeal.category)
-        )
-        appeals_by_category = {cat.value: count for cat, count in category_result.all()}
-        
-        # Обращения по приоритету
-        priority_result = await db.execute(
-            select(Appeal.priority, func.count(Appeal.id))
-            .where(Appeal.created_at >= cutoff_date)
-            .group_by(Appeal.priority)
-        )
-        appeals_by_priority = {pri.value: count for pri, count in priority_result.all()}
-        
-        # Среднее время решения
-        resolved_result = await db.execute(
-            select(
-                func.avg(
-                    func.extract('epoch', Appeal.resolved_at - Appeal.created_at) / 3600
-                )
-            ).where(
-                and_(
-                    Appeal.status == AppealStatus.RESOLVED,
-                    Appeal.resolved_at.isnot(None)
-                )
-            )
-        )
-        avg_resolution_time = resolved_result.scalar() or 0.0
-        
-        # Процент решенных
-        resolved_count_result = await db.execute(
-            select(func.count(Appeal.id))
-            .where(Appeal.status == AppealStatus.RESOLVED)
-        )
-        resolved_count = resolved_count_result.scalar() or 0
-        resolution_rate = (resolved_count / total_appeals * 100) if total_appeals > 0 else 0.0
-        
-        # Топ районов
-        district_result = await db.execute(
-            select(Appeal.district, func.count(Appeal.id))
-            .where(
-                and_(
-                    Appeal.district.isnot(None),
-                    Appeal.created_at >= cutoff_date
-                )
-            )
-            .group_by(Appeal.district)
-            .order_by(func.count(Appeal.id).desc())
-            .limit(10)
-        )
-        top_districts = [
-            {"district": district, "count": count}
-            for district, count in district_result.all()
+        """
+        Получение статистики для дашборда.
+        Читается из свертки appeal_stats_daily одним запросом: корзины за период
+        возвращаются подробно, более ранние схлопываются до статуса.
+        """
+        cutoff_day = (datetime.utcnow() - timedelta(days=days)).date()
+        in_window = AppealStatsDaily.day >= cutoff_day
+
+        def windowed(column):
+            return case((in_window, column), else_=None)
+
+        dimensions = [
+            windowed(AppealStatsDaily.day),
+            AppealStatsDaily.status,
+            windowed(AppealStatsDaily.category),
+            windowed(AppealStatsDaily.priority),
+            windowed(AppealStatsDaily.district),
+            windowed(AppealStatsDaily.sentiment)
         ]
-        
-        # Распределение тональности
-        sentiment_result = await db.execute(
-            select(Appeal.ai_sentiment, func.count(Appeal.id))
-            .where(
-                and_(
-                    Appeal.ai_sentiment.isnot(None),
-                    Appeal.created_at >= cutoff_date
-                )
-            )
-            .group_by(Appeal.ai_sentiment)
-        )
-        sentiment_distribution = {sent: count for sent, count in sentiment_result.all()}
-        
-        # Timeline обращений
-        timeline_result = await db.execute(
+        result = await db.execute(
             select(
-                func.date(Appeal.created_at).label('date'),
-                func.count(Appeal.id).label('count')
-            )
-            .where(Appeal.created_at >= cutoff_date)
-            .group_by(func.date(Appeal.created_at))
-            .order_by(func.date(Appeal.created_at))
+                *dimensions,
+                func.sum(AppealStatsDaily.count),
+                func.sum(AppealStatsDaily.resolved_with_time),
+                func.sum(AppealStatsDaily.resolution_hours_sum)
+            ).group_by(*dimensions)
         )
-        appeals_timeline = [
-            {"date": str(date), "count": count}
-            for date, count in timeline_result.all()
-        ]
+
+        total_appeals = 0
+        resolved_count = 0
+        resolved_with_time = 0
+        resolution_hours = 0.0
+        appeals_by_status = Counter()
+        appeals_by_category = Counter()
+        appeals_by_priority = Counter()
+        districts = Counter()
+        sentiment_distribution = Counter()
+        timeline = Counter()
+
+        for day, status, category, priority, district, sentiment, count, with_time, hours in result.all():
+            if not count:
+                continue
+            total_appeals += count
+            if status == AppealStatus.RESOLVED:
+                resolved_count += count
+                resolved_with_time += with_time or 0
+                resolution_hours += hours or 0.0
+            if day is None:
+                continue
+            appeals_by_status[status.value] += count
+            appeals_by_category[category.value] += count
+            appeals_by_priority[priority.value] += count
+            if district:
+                districts[district] += count
+            if sentiment:
+                sentiment_distribution[sentiment] += count
+            timeline[str(day)] += count
+
+        avg_resolution_time = resolution_hours / resolved_with_time if resolved_with_time else 0.0
+        resolution_rate = (resolved_count / total_appeals * 100) if total_appeals > 0 else 0.0
         
         return {
             "total_appeals": total_appeals,
-            "appeals_by_status": appeals_by_status,
-            "appeals_by_category": appeals_by_category,
-            "appeals_by_priority": appeals_by_priority,
+            "appeals_by_status": dict(appeals_by_status),
+            "appeals_by_category": dict(appeals_by_category),
+            "appeals_by_priority": dict(appeals_by_priority),
             "average_resolution_time": round(avg_resolution_time, 2),
             "resolution_rate": round(resolution_rate, 2),
-            "appeals_timeline": appeals_timeline,
-            "top_districts": top_districts,
-            "sentiment_distribution": sentiment_distribution
+            "appeals_timeline": [
+                {"date": date, "count": count}
+                for date, count in sorted(timeline.items())
+            ],
+            "top_districts": [
+                {"district": district, "count": count}
+                for district, count in districts.most_common(10)
+            ],
+            "sentiment_distribution": dict(sentiment_distribution)
         }
     
-    async def log_event(
+    def log_event(
         self,
-        db: AsyncSession,
         event_type: str,
         user_id: int = None,
         appeal_id: int = None,
         metadata: Dict = None
     ):
-        """Логирование события аналитики"""
-        event = AnalyticsEvent(
-            event_type=event_type,
+        """Логирование события аналитики (запись в БД пакетами в фоне)"""
+        event_sink.emit(
+            event_type,
             user_id=user_id,
             appeal_id=appeal_id,
-            metadata=metadata or {}
+            metadata=metadata
         )
-        db.add(event)
-        await db.commit()
 
+
+async def _load_dashboard(days: int) -> Dict:
+    """
+    Пересчет статистики дашборда в отдельной сессии (для фонового обновления кэша).
+    Читается с primary: после bump() отстающая реплика вернула бы данные до записи,
+    и они закэшировались бы под новой версией. Свертка небольшая, запрос дешевый.
+    """
+    async with AsyncSessionLocal() as db:
+        return await AnalyticsService().get_dashboard_stats(db, days=days)
+
+
+# Ответы /analytics/dashboard по значению days; версия повышается при записи обращений
+dashboard_cache = SWRCache(
+    "dashboard",
+    _load_dashboard,
+    ttl=settings.DASHBOARD_CACHE_TTL,
+    stale_ttl=settings.DASHBOARD_CACHE_STALE,
+    redis_getter=lambda: get_redis() if settings.DASHBOARD_CACHE_REDIS else None
+)
@@ -1,12 +1,24 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, and_
-from typing import List, Optional
+from sqlalchemy import select, func, text, tuple_, and_, or_
+from typing import List, Optional, Tuple
 from datetime import datetime
-from app.models.appeal import Appeal, AppealStatus
+import asyncio
+import base64
+import json
+import math
+from weakref import WeakValueDictionary
+import numpy as np
+from app.core import geohash
+from app.core.config import settings
+from app.core.metrics import APPEAL_STAGE_LATENCY
+from app.models.appeal import Appeal, AppealStatus, EnrichmentStatus
 from app.schemas.appeal import AppealCreate, AppealUpdate
 from app.ai.classifier import AIClassifier
-from app.ai.analyzer import AIAnalyzer
-from app.services.geolocation_service import GeolocationService
+from app.services.enrichment_service import enrichment_service
+from app.services.geolocation_service import haversine_km, radius_bbox, split_antimeridian
+from app.services.stats_service import stats_service
+from app.services.analytics_service import dashboard_cache
+from app.services.cluster_service import cluster_service
 
 
 class AppealService:
@@ -14,8 +26,6 @@ class AppealService:
     
     def __init__(self):
         self.classifier = AIClassifier()
-        self.analyzer = AIAnalyzer()
-        self.geolocation = GeolocationService()
     
     async def create_appeal(
         self,
@@ -23,61 +33,45 @@ class AppealService:
         appeal_data: AppealCreate,
         user_id: int
     ) -> Appeal:
-        """Создание нового обращения"""
-        # AI классификация
-        ai_result = await self.classifier.classify_appeal(
-            appeal_data.title,
-            appeal_data.description
-        )
-        
-        # Анализ тональности
-        sentiment_result = await self.analyzer.analyze_sentiment(
-            f"{appeal_data.title}\n{appeal_data.description}"
-        )
-        
-        # Определение района
-        district = None
-        if appeal_data.latitude and appeal_data.longitude:
-            district = await self.geolocation.get_district(
-                appeal_data.latitude,
-                appeal_data.longitude
-            )
-        
-        # Получение адреса
-        address = appeal_data.address
-        if not address and appeal_data.latitude and appeal_data.longitude:
-            address = await self.geolocation.get_address_from_coordinates(
-                appeal_data.latitude,
-                appeal_data.longitude
+        """
+        Создание нового обращения.
+        Сохраняется сразу с категорией и приоритетом по правилам,
+        AI-анализ и геокодинг выполняются в фоне (EnrichmentService).
+        """
+        with APPEAL_STAGE_LATENCY.time(pipeline="create", stage="classify_rules"):
+            defaults = self.classifier.classify_with_rules(
+                appeal_data.title,
+                appeal_data.description
             )
         
-        # Проверка на дубликаты
-        existing_appeals = await self._get_recent_appeals(db, user_id)
-        duplicate_check = await self.classifier.detect_duplicate(
-            f"{appeal_data.title}\n{appeal_data.description}",
-            [f"{a.title}\n{a.description}" for a in existing_appeals]
-        )
-        
         appeal = Appeal(
             title=appeal_data.title,
             description=appeal_data.description,
-            category=appeal_data.category or ai_result["category"],
-            priority=ai_result["priority"],
+            category=appeal_data.category or defaults["category"],
+            priority=defaults["priority"],
             latitude=appeal_data.latitude,
             longitude=appeal_data.longitude,
-            address=address,
-            district=district,
+            address=appeal_data.address,
             images=appeal_data.images,
+            geohash=encode_geohash(appeal_data.latitude, appeal_data.longitude),
             user_id=user_id,
-            ai_summary=ai_result["summary"],
-            ai_sentiment=sentiment_result["sentiment"],
-            ai_confidence=ai_result["confidence"],
-            is_duplicate=duplicate_check is not None
+            ai_confidence=defaults["confidence"],
+            category_from_user=appeal_data.category is not None,
+            enrichment_status=EnrichmentStatus.PENDING
         )
         
-        db.add(appeal)
-        await db.commit()
-        await db.refresh(appeal)
+        with APPEAL_STAGE_LATENCY.time(pipeline="create", stage="db_commit"):
+            db.add(appeal)
+            await db.flush()
+            await db.refresh(appeal)
+            await stats_service.move(db, None, stats_service.snapshot(appeal))
+            await db.commit()
+        with APPEAL_STAGE_LATENCY.time(pipeline="create", stage="cache_bump"):
+            await dashboard_cache.bump()
+            await cluster_service.invalidate((appeal.latitude, appeal.longitude))
+        
+        with APPEAL_STAGE_LATENCY.time(pipeline="create", stage="enqueue"):
+            enrichment_service.enqueue(appeal.id, keep_category=appeal.category_from_user)
         
         return appeal
     
@@ -92,6 +86,20 @@ class AppealService:
         )
         return result.scalar_one_or_none()
     
+    async def get_appeals_by_ids(
+        self,
+        db: AsyncSession,
+        appeal_ids: List[int]
+    ) -> List[Appeal]:
+        """Получение обращений по списку ID с сохранением порядка"""
+        if not appeal_ids:
+            return []
+        result = await db.execute(
+            select(Appeal).where(Appeal.id.in_(appeal_ids))
+        )
+        appeals = {appeal.id: appeal for appeal in result.scalars().all()}
+        return [appeals[appeal_id] for appeal_id in appeal_ids if appeal_id in appeals]
+    
     async def get_appeals(
         self,
         db: AsyncSession,
@@ -99,29 +107,198 @@ class AppealService:
         limit: int = 20,
         status: Optional[AppealStatus] = None,
         user_id: Optional[int] = None,
-        category: Optional[str] = None
-    ) -> tuple[List[Appeal], int]:
-        """Получение списка обращений с пагинацией"""
-        query = select(Appeal)
-        
-        if status:
-            query = query.where(Appeal.status == status)
-        if user_id:
-            query = query.where(Appeal.user_id == user_id)
-        if category:
-            query = query.where(Appeal.category == category)
+        category: Optional[str] = None,
+        cursor: Optional[str] = None,
+        count: str = "exact"
+    ) -> Tuple[List[Appeal], Optional[int], Optional[str]]:
+        """
+        Получение списка обращений с пагинацией.
+        С cursor выборка продолжается после указанного (created_at, id) без OFFSET.
+        count: exact — точное число, estimated — оценка планировщика, none — без подсчета.
+        Возвращает (обращения, всего, курсор следующей страницы).
+        """
+        query = filter_appeals(select(Appeal), status=status, user_id=user_id, category=category)
         
         # Подсчет общего количества
-        count_query = select(func.count()).select_from(query.subquery())
-        total_result = await db.execute(count_query)
-        total = total_result.scalar()
+        total = None
+        if count == "exact":
+            total = await self._count_exact(db, query)
+        elif count == "estimated":
+            total = await self._count_estimated(db, query)
+        
+        # Получение данных: на одну строку больше, чтобы понять, есть ли следующая страница
+        query = query.order_by(Appeal.created_at.desc(), Appeal.id.desc())
+        if cursor:
+            created_at, last_id = decode_cursor(cursor)
+            query = query.where(tuple_(Appeal.created_at, Appeal.id) < (created_at, last_id))
+        else:
+            query = query.offset(skip)
+        result = await db.execute(query.limit(limit + 1))
+        appeals = list(result.scalars().all())
         
-        # Получение данных с пагинацией
-        query = query.order_by(Appeal.created_at.desc()).offset(skip).limit(limit)
-        result = await db.execute(query)
-        appeals = result.scalars().all()
+        next_cursor = None
+        if len(appeals) > limit:
+            appeals = appeals[:limit]
+            next_cursor = encode_cursor(appeals[-1])
         
-        return list(appeals), total
+        return appeals, total, next_cursor
+    
+    async def _count_exact(self, db: AsyncSession, query) -> int:
+        result = await db.execute(select(func.count()).select_from(query.subquery()))
+        return result.scalar()
+    
+    async def _count_estimated(self, db: AsyncSession, query) -> int:
+        """Оценка количества строк по статистике планировщика (PostgreSQL)"""
+        if db.get_bind().dialect.name != "postgresql":
+            return await self._count_exact(db, query)
+        compiled = query.compile(
+            dialect=db.get_bind().dialect,
+            compile_kwargs={"literal_binds": True}
+        )
+        result = await db.execute(text(f"EXPLAIN (FORMAT JSON) {compiled}"))
+        plan = result.scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]["Plan"]["Plan Rows"])
+    
+    async def get_nearby(
+        self,
+        db: AsyncSession,
+        latitude: float,
+        longitude: float,
+        radius_km: float,
+        limit: int = 100,
+        status: Optional[AppealStatus] = None,
+        user_id: Optional[int] = None,
+        category: Optional[str] = None
+    ) -> List[Tuple[Appeal, float]]:
+        """Обращения в радиусе от точки: (обращение, расстояние в км) по возрастанию расстояния"""
+        return await self._find_in_area(
+            db,
+            radius_bbox(latitude, longitude, radius_km),
+            (latitude, longitude),
+            radius_km,
+            limit,
+            status=status,
+            user_id=user_id,
+            category=category
+        )
+    
+    async def get_in_bbox(
+        self,
+        db: AsyncSession,
+        bbox: Tuple[float, float, float, float],
+        limit: int = 100,
+        status: Optional[AppealStatus] = None,
+        user_id: Optional[int] = None,
+        category: Optional[str] = None
+    ) -> List[Tuple[Appeal, float]]:
+        """Обращения в прямоугольнике (min_lat, min_lon, max_lat, max_lon) по расстоянию от его центра"""
+        min_lat, min_lon, max_lat, max_lon = bbox
+        center = ((min_lat + max_lat) / 2, (min_lon + max_lon) / 2)
+        return await self._find_in_area(
+            db,
+            bbox,
+            center,
+            None,
+            limit,
+            status=status,
+            user_id=user_id,
+            category=category
+        )
+    
+    async def _find_in_area(
+        self,
+        db: AsyncSession,
+        bbox: Tuple[float, float, float, float],
+        center: Tuple[float, float],
+        radius_km: Optional[float],
+        limit: int,
+        status: Optional[AppealStatus] = None,
+        user_id: Optional[int] = None,
+        category: Optional[str] = None
+    ) -> List[Tuple[Appeal, float]]:
+        """
+        Кандидаты выбираются по диапазонам префиксов geohash (индекс ix_appeals_geohash)
+        и прямоугольнику (прямоугольник через антимеридиан делится на два), не больше
+        GEO_QUERY_MAX_CANDIDATES ближайших; расстояния считаются векторно, полные строки
+        загружаются только для limit ближайших.
+        """
+        rows = []
+        for (min_lat, min_lon, max_lat, max_lon), shift in split_antimeridian(bbox):
+            prefixes = geohash.cover(
+                min_lat,
+                min_lon,
+                max_lat,
+                max_lon,
+                max_precision=settings.GEOHASH_PRECISION,
+                max_cells=settings.GEO_QUERY_MAX_CELLS
+            )
+            # Приближенное расстояние (равнопромежуточная проекция) только для отбора кандидатов
+            d_lat = Appeal.latitude - center[0]
+            d_lon = Appeal.longitude - (center[1] + shift)
+            scale = math.cos(math.radians(center[0])) ** 2
+            query = select(Appeal.id, Appeal.latitude, Appeal.longitude).where(
+                # "{" следует за последним символом алфавита geohash
+                or_(*(and_(Appeal.geohash >= prefix, Appeal.geohash < prefix + "{") for prefix in prefixes)),
+                Appeal.latitude.between(min_lat, max_lat),
+                Appeal.longitude.between(min_lon, max_lon)
+            )
+            if status:
+                query = query.where(Appeal.status == status)
+            if user_id:
+                query = query.where(Appeal.user_id == user_id)
+            if category:
+                query = query.where(Appeal.category == category)
+            query = query.order_by(d_lat * d_lat + d_lon * d_lon * scale, Appeal.id).limit(
+                max(limit, settings.GEO_QUERY_MAX_CANDIDATES)
+            )
+            rows.extend((await db.execute(query)).all())
+        
+        if not rows:
+            return []
+        
+        points = np.array([(row.latitude, row.longitude) for row in rows], dtype=np.float64)
+        distances = haversine_km(center[0], center[1], points[:, 0], points[:, 1])
+        candidates = np.arange(len(rows))
+        if radius_km is not None:
+            candidates = candidates[distances <= radius_km]
+        nearest = candidates[np.argsort(distances[candidates], kind="stable")[:limit]]
+        
+        appeals = await self.get_appeals_by_ids(db, [rows[i].id for i in nearest])
+        distance_by_id = {rows[i].id: float(distances[i]) for i in nearest}
+        return [(appeal, distance_by_id[appeal.id]) for appeal in appeals]
+    
+    async def add_image(
+        self,
+        db: AsyncSession,
+        appeal_id: int,
+        path: str
+    ) -> Optional[Appeal]:
+        """
+        Добавление изображения к обращению.
+        Строка блокируется (SELECT ... FOR UPDATE), чтобы одновременные загрузки
+        не перезаписали список друг друга; в процессе дополнительно берется
+        блокировка по обращению (SQLite не поддерживает FOR UPDATE).
+        Список присваивается заново, иначе изменение JSON не попадет в UPDATE.
+        """
+        async with image_lock(appeal_id):
+            result = await db.execute(
+                select(Appeal)
+                .where(Appeal.id == appeal_id)
+                .with_for_update()
+                .execution_options(populate_existing=True)
+            )
+            appeal = result.scalar_one_or_none()
+            if not appeal:
+                return None
+            
+            images = list(appeal.images or [])
+            if path not in images:
+                appeal.images = images + [path]
+            await db.commit()
+        await db.refresh(appeal)
+        return appeal
     
     async def update_appeal(
         self,
@@ -130,10 +307,19 @@ class AppealService:
         appeal_data: AppealUpdate
     ) -> Optional[Appeal]:
         """Обновление обращения"""
-        appeal = await self.get_appeal(db, appeal_id)
+        # Обогащение и GPS из фото меняют строку параллельно: снимок для счетчиков —
+        # из заблокированной строки, а не из прочитанной ранее в этой сессии
+        result = await db.execute(
+            select(Appeal)
+            .where(Appeal.id == appeal_id)
+            .with_for_update()
+            .execution_options(populate_existing=True)
+        )
+        appeal = result.scalar_one_or_none()
         if not appeal:
             return None
         
+        before = stats_service.snapshot(appeal)
         update_data = appeal_data.model_dump(exclude_unset=True)
         
         if "status" in update_data:
@@ -150,28 +336,58 @@ class AppealService:
         if "description" in update_data:
             appeal.description = update_data["description"]
         
+        await stats_service.move(db, before, stats_service.snapshot(appeal))
         await db.commit()
+        await dashboard_cache.bump()
+        await cluster_service.invalidate((appeal.latitude, appeal.longitude))  # кластеры с фильтром по статусу
         await db.refresh(appeal)
         
         return appeal
-    
-    async def _get_recent_appeals(
-        self,
-        db: AsyncSession,
-        user_id: int,
-        days: int = 30
-    ) -> List[Appeal]:
-        """Получение недавних обращений пользователя"""
-        from datetime import timedelta
-        cutoff_date = datetime.utcnow() - timedelta(days=days)
-        
-        result = await db.execute(
-            select(Appeal).where(
-                and_(
-                    Appeal.user_id == user_id,
-                    Appeal.created_at >= cutoff_date
-                )
-            ).limit(10)
-        )
-        return list(result.scalars().all())
 
+
+# Блокировки изменения images/image_variants по обращению внутри процесса
+_image_locks: "WeakValueDictionary[int, asyncio.Lock]" = WeakValueDictionary()
+
+
+def image_lock(appeal_id: int) -> asyncio.Lock:
+    """Общая для процесса блокировка изменения изображений обращения"""
+    return _image_locks.setdefault(appeal_id, asyncio.Lock())
+
+
+def filter_appeals(
+    query,
+    status: Optional[AppealStatus] = None,
+    user_id: Optional[int] = None,
+    category: Optional[str] = None
+):
+    """Фильтры списка обращений (общие для /appeals и экспорта)"""
+    if status:
+        query = query.where(Appeal.status == status)
+    if user_id:
+        query = query.where(Appeal.user_id == user_id)
+    if category:
+        query = query.where(Appeal.category == category)
+    return query
+
+
+def encode_geohash(latitude: Optional[float], longitude: Optional[float]) -> Optional[str]:
+    """Geohash координат обращения (None без координат)"""
+    if latitude is None or longitude is None:
+        return None
+    return geohash.encode(latitude, longitude, settings.GEOHASH_PRECISION)
+
+
+def encode_cursor(appeal: Appeal) -> str:
+    """Курсор страницы: позиция (created_at, id) последнего обращения"""
+    raw = json.dumps([appeal.created_at.isoformat(), appeal.id])
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Разбор курсора; ValueError, если курсор поврежден"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, appeal_id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(created_at), int(appeal_id)
+    except Exception as e:
+        raise ValueError("Invalid cursor") from e
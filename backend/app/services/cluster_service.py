@@ -0,0 +1,219 @@
+import asyncio
+import math
+from typing import Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import select, func, and_, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core import geohash
+from app.core.cache import SWRCache
+from app.core.config import settings
+from app.core.redis import get_redis
+from app.core.database import AsyncSessionLocal
+from app.models.appeal import Appeal, AppealStatus
+
+# Граница проекции Web Mercator (тайлы карты)
+MAX_MERCATOR_LAT = 85.05112878
+# Ячеек кластеризации на сторону тайла: 2 ** TILE_CELL_BITS
+TILE_CELL_BITS = 3
+MAX_ZOOM = 20
+
+
+def cluster_precision(zoom: int) -> int:
+    """Длина geohash ячейки кластера для масштаба карты (ячейка ~1/8 тайла)"""
+    lon_bits = zoom + TILE_CELL_BITS
+    precision = max(1, math.ceil(2 * lon_bits / 5))
+    return min(precision, settings.GEOHASH_PRECISION)
+
+
+def _tile_x(longitude: float, zoom: int) -> int:
+    n = 1 << zoom
+    return min(n - 1, max(0, math.floor((longitude + 180.0) / 360.0 * n)))
+
+
+def _tile_y(latitude: float, zoom: int) -> int:
+    n = 1 << zoom
+    lat = math.radians(max(-MAX_MERCATOR_LAT, min(MAX_MERCATOR_LAT, latitude)))
+    y = (1.0 - math.asinh(math.tan(lat)) / math.pi) / 2.0 * n
+    return min(n - 1, max(0, math.floor(y)))
+
+
+def tile_bounds(zoom: int, x: int, y: int) -> Tuple[float, float, float, float]:
+    """Границы тайла XYZ: (min_lat, min_lon, max_lat, max_lon)"""
+    n = 1 << zoom
+
+    def lat(tile_y: int) -> float:
+        return math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * tile_y / n))))
+
+    return lat(y + 1), x / n * 360.0 - 180.0, lat(y), (x + 1) / n * 360.0 - 180.0
+
+
+def tile_partition(zoom: int, x: int, y: int) -> str:
+    """Раздел кэша кластеров: тайл со всеми фильтрами"""
+    return f"{zoom}/{x}/{y}"
+
+
+def point_partitions(latitude: float, longitude: float) -> List[str]:
+    """Тайлы всех масштабов, в которые попадает точка"""
+    return [
+        tile_partition(zoom, _tile_x(longitude, zoom), _tile_y(latitude, zoom))
+        for zoom in range(MAX_ZOOM + 1)
+    ]
+
+
+def merge_clusters(clusters: Iterable[Dict]) -> List[Dict]:
+    """
+    Объединение кластеров одной ячейки: ячейка geohash не совпадает с тайлом,
+    и у ячейки на границе тайлов в каждом тайле своя часть обращений
+    """
+    merged: Dict[str, Dict] = {}
+    for cluster in clusters:
+        same = merged.get(cluster["geohash"])
+        if same is None:
+            merged[cluster["geohash"]] = dict(cluster)
+            continue
+        count = same["count"] + cluster["count"]
+        same["latitude"] = (same["latitude"] * same["count"] + cluster["latitude"] * cluster["count"]) / count
+        same["longitude"] = (same["longitude"] * same["count"] + cluster["longitude"] * cluster["count"]) / count
+        same["count"] = count
+        same["appeal_id"] = None
+    return list(merged.values())
+
+
+def tiles_for_bbox(
+    bbox: Tuple[float, float, float, float],
+    zoom: int,
+    max_tiles: Optional[int] = None
+) -> List[Tuple[int, int]]:
+    """
+    Тайлы XYZ, покрывающие прямоугольник (min_lat, min_lon, max_lat, max_lon).
+    ValueError, если тайлов больше max_tiles.
+    """
+    min_lat, min_lon, max_lat, max_lon = bbox
+    x0, x1 = _tile_x(min_lon, zoom), _tile_x(max_lon, zoom)
+    y0, y1 = _tile_y(max_lat, zoom), _tile_y(min_lat, zoom)
+    if max_tiles is not None and (x1 - x0 + 1) * (y1 - y0 + 1) > max_tiles:
+        raise ValueError("Bounding box too large for zoom")
+    return [(x, y) for x in range(x0, x1 + 1) for y in range(y0, y1 + 1)]
+
+
+class ClusterService:
+    """
+    Кластеры обращений для карты: количество и центр обращений в ячейках
+    geohash. Считаются по тайлам XYZ, каждый тайл кэшируется отдельно
+    для своего масштаба и фильтров; запись обращения помечает устаревшими
+    только тайлы, в которые оно попадает (invalidate).
+    """
+
+    async def get_tile(
+        self,
+        db: AsyncSession,
+        zoom: int,
+        x: int,
+        y: int,
+        status: Optional[str] = None,
+        category: Optional[str] = None
+    ) -> List[Dict]:
+        """Кластеры одного тайла"""
+        precision = cluster_precision(zoom)
+        min_lat, min_lon, max_lat, max_lon = tile_bounds(zoom, x, y)
+        prefixes = geohash.cover(
+            min_lat,
+            min_lon,
+            max_lat,
+            max_lon,
+            max_precision=precision,
+            max_cells=settings.GEO_QUERY_MAX_CELLS
+        )
+        cell = func.substr(Appeal.geohash, 1, precision).label("cell")
+        query = (
+            select(
+                cell,
+                func.count(Appeal.id).label("count"),
+                func.avg(Appeal.latitude).label("latitude"),
+                func.avg(Appeal.longitude).label("longitude"),
+                func.min(Appeal.id).label("appeal_id")
+            )
+            .where(
+                # "{" следует за последним символом алфавита geohash
+                or_(*(and_(Appeal.geohash >= prefix, Appeal.geohash < prefix + "{") for prefix in prefixes)),
+                # границы тайла: [min, max) по обеим осям, чтобы точка попала в один тайл
+                Appeal.latitude >= min_lat,
+                Appeal.latitude < max_lat,
+                Appeal.longitude >= min_lon,
+                Appeal.longitude < max_lon
+            )
+            .group_by(cell)
+        )
+        if status:
+            query = query.where(Appeal.status == AppealStatus(status))
+        if category:
+            query = query.where(Appeal.category == category)
+
+        result = await db.execute(query)
+        return [
+            {
+                "geohash": row.cell,
+                "count": row.count,
+                "latitude": float(row.latitude),
+                "longitude": float(row.longitude),
+                # одиночное обращение можно показать маркером и открыть по ID
+                "appeal_id": row.appeal_id if row.count == 1 else None
+            }
+            for row in result.all()
+        ]
+
+    async def get_clusters(
+        self,
+        bbox: Tuple[float, float, float, float],
+        zoom: int,
+        status: Optional[str] = None,
+        category: Optional[str] = None
+    ) -> List[Dict]:
+        """
+        Кластеры тайлов, покрывающих прямоугольник.
+        ValueError, если тайлов больше CLUSTER_MAX_TILES.
+        """
+        tiles = tiles_for_bbox(bbox, zoom, max_tiles=settings.CLUSTER_MAX_TILES)
+        entries = await asyncio.gather(*(
+            cluster_cache.get((zoom, x, y, status, category)) for x, y in tiles
+        ))
+        return merge_clusters(cluster for entry in entries for cluster in entry.value)
+
+    async def invalidate(self, *points: Tuple[Optional[float], Optional[float]]):
+        """Пометка устаревшими тайлов всех масштабов, в которые попадают точки (lat, lon)"""
+        partitions = {
+            partition
+            for latitude, longitude in points
+            if latitude is not None and longitude is not None
+            for partition in point_partitions(latitude, longitude)
+        }
+        if partitions:
+            await cluster_cache.bump(partitions)
+
+
+# Пересчеты тайлов одновременно занимают не больше CLUSTER_LOAD_CONCURRENCY соединений пула
+_tile_loads = asyncio.Semaphore(settings.CLUSTER_LOAD_CONCURRENCY)
+
+
+async def _load_tile(key: Tuple[int, int, int, Optional[str], Optional[str]]) -> List[Dict]:
+    """
+    Пересчет тайла в отдельной сессии (для фонового обновления кэша).
+    Читается с primary: после invalidate отстающая реплика вернула бы тайл до записи.
+    """
+    zoom, x, y, status, category = key
+    async with _tile_loads:
+        async with AsyncSessionLocal() as db:
+            return await cluster_service.get_tile(db, zoom, x, y, status=status, category=category)
+
+
+cluster_service = ClusterService()
+
+# Тайлы кластеров по (zoom, x, y, status, category); версия тайла повышается при записи его обращений
+cluster_cache = SWRCache(
+    "clusters",
+    _load_tile,
+    ttl=settings.CLUSTER_CACHE_TTL,
+    stale_ttl=settings.CLUSTER_CACHE_STALE,
+    redis_getter=lambda: get_redis() if settings.CLUSTER_CACHE_REDIS else None,
+    max_size=settings.CLUSTER_CACHE_MAX_SIZE,
+    partition=lambda key: tile_partition(*key[:3])
+)
@@ -0,0 +1,112 @@
+import json
+import logging
+import math
+import os
+from typing import Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Кольцо полигона: список (lon, lat); полигон — внешнее кольцо и дыры
+Ring = List[Tuple[float, float]]
+
+
+class _District:
+    __slots__ = ("name", "polygons", "bbox")
+
+    def __init__(self, name: str, polygons: List[List[Ring]]):
+        self.name = name
+        self.polygons = polygons
+        lons = [lon for polygon in polygons for lon, _ in polygon[0]]
+        lats = [lat for polygon in polygons for _, lat in polygon[0]]
+        self.bbox = (min(lons), min(lats), max(lons), max(lats))
+
+    def contains(self, lon: float, lat: float) -> bool:
+        min_lon, min_lat, max_lon, max_lat = self.bbox
+        if not (min_lon <= lon <= max_lon and min_lat <= lat <= max_lat):
+            return False
+        for outer, *holes in self.polygons:
+            if _in_ring(lon, lat, outer) and not any(_in_ring(lon, lat, hole) for hole in holes):
+                return True
+        return False
+
+
+def _in_ring(x: float, y: float, ring: Sequence[Tuple[float, float]]) -> bool:
+    """Проверка точки методом трассировки луча"""
+    inside = False
+    j = len(ring) - 1
+    for i in range(len(ring)):
+        xi, yi = ring[i]
+        xj, yj = ring[j]
+        if (yi > y) != (yj > y) and x < (xj - xi) * (y - yi) / (yj - yi) + xi:
+            inside = not inside
+        j = i
+    return inside
+
+
+class DistrictResolver:
+    """
+    Определение района по координатам без обращения к сети.
+    Границы районов загружаются из GeoJSON (Polygon/MultiPolygon),
+    кандидаты выбираются по равномерной сетке ячеек.
+    """
+
+    def __init__(self, districts: List[_District], cell_size: float = 0.01):
+        self.districts = districts
+        self.cell_size = cell_size
+        self._grid: Dict[Tuple[int, int], List[int]] = {}
+        for index, district in enumerate(districts):
+            min_lon, min_lat, max_lon, max_lat = district.bbox
+            for cx in range(self._cell(min_lon), self._cell(max_lon) + 1):
+                for cy in range(self._cell(min_lat), self._cell(max_lat) + 1):
+                    self._grid.setdefault((cx, cy), []).append(index)
+
+    def _cell(self, value: float) -> int:
+        return math.floor(value / self.cell_size)
+
+    def __len__(self) -> int:
+        return len(self.districts)
+
+    def resolve(self, latitude: float, longitude: float) -> Optional[str]:
+        """Название района, содержащего точку, или None"""
+        for index in self._grid.get((self._cell(longitude), self._cell(latitude)), ()):
+            district = self.districts[index]
+            if district.contains(longitude, latitude):
+                return district.name
+        return None
+
+    @classmethod
+    def from_geojson(cls, data: dict, name_property: str = "name", cell_size: float = 0.01) -> "DistrictResolver":
+        districts = []
+        for feature in data.get("features", []):
+            geometry = feature.get("geometry") or {}
+            name = (feature.get("properties") or {}).get(name_property)
+            if not name:
+                continue
+            if geometry.get("type") == "Polygon":
+                polygons = [geometry["coordinates"]]
+            elif geometry.get("type") == "MultiPolygon":
+                polygons = geometry["coordinates"]
+            else:
+                continue
+            polygons = [
+                [[(float(point[0]), float(point[1])) for point in ring] for ring in polygon]
+                for polygon in polygons
+                if polygon and polygon[0]
+            ]
+            if polygons:
+                districts.append(_District(str(name), polygons))
+        return cls(districts, cell_size=cell_size)
+
+    @classmethod
+    def load(cls, path: str, name_property: str = "name") -> Optional["DistrictResolver"]:
+        """Загрузка границ из файла; None, если файл не задан или не читается"""
+        if not path or not os.path.exists(path):
+            return None
+        try:
+            with open(path, encoding="utf-8") as f:
+                resolver = cls.from_geojson(json.load(f), name_property=name_property)
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.warning("Could not load district boundaries from %s: %s", path, e)
+            return None
+        logger.info("Loaded %s district boundaries from %s", len(resolver), path)
+        return resolver
@@ -0,0 +1,99 @@
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import List, Optional, Tuple
+from sqlalchemy import select, delete
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.ai import minhash
+from app.core.config import settings
+from app.models.appeal import Appeal
+from app.models.duplicate import AppealLSHBucket
+
+
+class DuplicateService:
+    """Поиск дубликатов обращений по всему городу через MinHash + LSH"""
+
+    async def find_duplicate(
+        self,
+        db: AsyncSession,
+        signature: List[int],
+        exclude_id: Optional[int] = None
+    ) -> Optional[Tuple[int, float]]:
+        """
+        Поиск наиболее похожего обращения.
+        Возвращает (id исходного обращения, оценка сходства) или None.
+        """
+        cutoff_date = datetime.utcnow() - timedelta(days=settings.DUPLICATE_WINDOW_DAYS)
+        candidates = await self._score_candidates(
+            db,
+            signature,
+            exclude_id,
+            settings.DUPLICATE_MAX_CANDIDATES,
+            since=cutoff_date
+        )
+        if not candidates or candidates[0][2] < settings.DUPLICATE_THRESHOLD:
+            return None
+        appeal_id, duplicate_of, score = candidates[0]
+        # Дубликат дубликата указывает на исходное обращение
+        return duplicate_of or appeal_id, score
+
+    async def find_similar(
+        self,
+        db: AsyncSession,
+        signature: List[int],
+        k: int = 10,
+        exclude_id: Optional[int] = None
+    ) -> List[Tuple[int, float]]:
+        """Похожие обращения по оценке MinHash: список (id, сходство)"""
+        candidates = await self._score_candidates(db, signature, exclude_id, max(k * 5, k))
+        return [(appeal_id, score) for appeal_id, _, score in candidates[:k] if score > 0]
+
+    async def _score_candidates(
+        self,
+        db: AsyncSession,
+        signature: List[int],
+        exclude_id: Optional[int],
+        limit: int,
+        since: Optional[datetime] = None
+    ) -> List[Tuple[int, Optional[int], float]]:
+        """Кандидаты из LSH-корзин с оценкой сходства, по убыванию"""
+        keys = minhash.band_keys(signature)
+        if not keys:
+            return []
+
+        # Кандидаты — обращения, совпавшие хотя бы в одной полосе; больше совпадений — выше
+        result = await db.execute(
+            select(AppealLSHBucket.appeal_id).where(AppealLSHBucket.bucket.in_(keys))
+        )
+        collisions = Counter(result.scalars().all())
+        collisions.pop(exclude_id, None)
+        if not collisions:
+            return []
+
+        candidate_ids = [appeal_id for appeal_id, _ in collisions.most_common(limit)]
+        query = select(Appeal.id, Appeal.duplicate_of, Appeal.minhash_signature).where(
+            Appeal.id.in_(candidate_ids)
+        )
+        if since is not None:
+            query = query.where(Appeal.created_at >= since)
+        result = await db.execute(query)
+
+        scored = [
+            (appeal_id, duplicate_of, minhash.similarity(signature, candidate_signature or []))
+            for appeal_id, duplicate_of, candidate_signature in result.all()
+        ]
+        scored.sort(key=lambda item: item[2], reverse=True)
+        return scored
+
+    async def index_appeal(
+        self,
+        db: AsyncSession,
+        appeal: Appeal,
+        signature: List[int]
+    ):
+        """Сохранение сигнатуры и LSH-корзин обращения (в текущей транзакции)"""
+        await db.execute(
+            delete(AppealLSHBucket).where(AppealLSHBucket.appeal_id == appeal.id)
+        )
+        appeal.minhash_signature = signature
+        for key in set(minhash.band_keys(signature)):
+            db.add(AppealLSHBucket(bucket=key, appeal_id=appeal.id))
@@ -0,0 +1,274 @@
+import asyncio
+import logging
+from collections import deque
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Set, Tuple
+from sqlalchemy import select, update, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.background import WorkerPool
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core.metrics import APPEAL_STAGE_LATENCY
+from app.models.appeal import Appeal, EnrichmentStatus
+from app.ai import minhash
+from app.ai.combined import CombinedAnalyzer
+from app.services.duplicate_service import DuplicateService
+from app.services.geolocation_service import GeolocationService
+from app.services.similarity_service import similarity_service
+from app.services.stats_service import stats_service
+from app.services.analytics_service import dashboard_cache
+from app.services.cluster_service import cluster_service
+
+logger = logging.getLogger(__name__)
+
+
+def _stage(name: str):
+    """Таймер этапа фонового обогащения"""
+    return APPEAL_STAGE_LATENCY.time(pipeline="enrich", stage=name)
+
+
+async def _timed(name: str, coro):
+    with _stage(name):
+        return await coro
+
+
+class EnrichmentService:
+    """
+    Фоновое обогащение обращений: AI-классификация, тональность, геокодинг, дубликаты.
+    Перед обработкой воркер забирает обращение (enrichment_claimed_at), поэтому одно
+    обращение из очередей нескольких процессов обрабатывается один раз. Обращения,
+    не попавшие в очередь (переполнение, перезапуск), периодически ставятся заново.
+    """
+
+    def __init__(self):
+        self.combined = CombinedAnalyzer()
+        self.geolocation = GeolocationService()
+        self.duplicates = DuplicateService()
+        self.similarity = similarity_service
+        self.pool = WorkerPool(
+            "enrichment",
+            self._process,
+            workers=settings.ENRICHMENT_WORKERS,
+            queue_size=settings.ENRICHMENT_QUEUE_SIZE
+        )
+        self._waiters: Dict[int, List[asyncio.Event]] = {}
+        self._queued: Set[int] = set()
+        self._recently_finished = deque(maxlen=1000)
+        self._sweeper: Optional[asyncio.Task] = None
+
+    async def start(self):
+        """Запуск воркеров и периодической постановки незавершенных обращений"""
+        self.pool.start()
+        if self._sweeper is None:
+            self._sweeper = asyncio.create_task(self._sweep_loop(), name="enrichment-sweeper")
+
+    async def stop(self):
+        if self._sweeper is not None:
+            self._sweeper.cancel()
+            await asyncio.gather(self._sweeper, return_exceptions=True)
+            self._sweeper = None
+        await self.pool.stop()
+
+    def enqueue(self, appeal_id: int, keep_category: bool = False) -> bool:
+        """Постановка обращения в очередь обогащения; при переполнении его подберет sweep_pending"""
+        if not self.pool.submit((appeal_id, keep_category)):
+            return False
+        self._queued.add(appeal_id)
+        return True
+
+    async def _sweep_loop(self):
+        while True:
+            try:
+                await self.sweep_pending()
+            except Exception as e:
+                logger.warning("Could not requeue pending appeals: %s", e)
+            await asyncio.sleep(settings.ENRICHMENT_SWEEP_INTERVAL)
+
+    async def sweep_pending(self) -> int:
+        """Постановка в очередь необработанных обращений, которые никто не забрал или чей воркер упал"""
+        room = settings.ENRICHMENT_QUEUE_SIZE - self.pool.qsize()
+        if room <= 0:
+            return 0
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                select(Appeal.id, Appeal.category_from_user)
+                .where(Appeal.enrichment_status == EnrichmentStatus.PENDING, self._claimable())
+                .order_by(Appeal.id)
+                .limit(room + len(self._queued))
+            )
+            appeals = [(appeal_id, keep) for appeal_id, keep in result.all() if appeal_id not in self._queued]
+        queued = 0
+        for appeal_id, keep_category in appeals[:room]:
+            if not self.enqueue(appeal_id, keep_category=keep_category):
+                break
+            queued += 1
+        return queued
+
+    @staticmethod
+    def _claimable():
+        stale = datetime.now(timezone.utc) - timedelta(seconds=settings.ENRICHMENT_CLAIM_TTL)
+        return or_(Appeal.enrichment_claimed_at.is_(None), Appeal.enrichment_claimed_at < stale)
+
+    async def _claim(self, db: AsyncSession, appeal_id: int) -> bool:
+        """Атомарный захват обращения воркером; False — уже обработано или обрабатывается другим"""
+        result = await db.execute(
+            update(Appeal)
+            .where(
+                Appeal.id == appeal_id,
+                Appeal.enrichment_status == EnrichmentStatus.PENDING,
+                self._claimable()
+            )
+            # updated_at — время изменения обращения, захват его не меняет
+            .values(enrichment_claimed_at=datetime.now(timezone.utc), updated_at=Appeal.updated_at)
+            .execution_options(synchronize_session=False)
+        )
+        await db.commit()
+        return result.rowcount == 1
+
+    async def wait_for(self, appeal_id: int, timeout: float) -> bool:
+        """
+        Ожидание завершения обогащения: сигнал воркера этого процесса или статус
+        в БД (обращение обработал другой процесс или узел), проверяемый каждые
+        ENRICHMENT_POLL_INTERVAL секунд короткой сессией
+        """
+        if appeal_id in self._recently_finished:
+            return True
+        event = asyncio.Event()
+        waiters = self._waiters.setdefault(appeal_id, [])
+        waiters.append(event)
+        deadline = asyncio.get_running_loop().time() + timeout
+        try:
+            while True:
+                remaining = deadline - asyncio.get_running_loop().time()
+                if remaining <= 0:
+                    return False
+                try:
+                    await asyncio.wait_for(
+                        event.wait(),
+                        timeout=min(remaining, settings.ENRICHMENT_POLL_INTERVAL)
+                    )
+                    return True
+                except asyncio.TimeoutError:
+                    pass
+                if await self._finished(appeal_id):
+                    return True
+        finally:
+            if not event.is_set():
+                waiters.remove(event)
+                if not waiters:
+                    self._waiters.pop(appeal_id, None)
+
+    @staticmethod
+    async def _finished(appeal_id: int) -> bool:
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(select(Appeal.enrichment_status).where(Appeal.id == appeal_id))
+            return result.scalar_one_or_none() not in (None, EnrichmentStatus.PENDING)
+
+    async def _process(self, item):
+        appeal_id, keep_category = item
+        claimed = False
+        try:
+            async with AsyncSessionLocal() as db:
+                claimed = await self._claim(db, appeal_id)
+                if not claimed:
+                    return
+                result = await db.execute(select(Appeal).where(Appeal.id == appeal_id))
+                appeal = result.scalar_one_or_none()
+                if appeal is None:
+                    return
+                try:
+                    await self.enrich_appeal(db, appeal, keep_category)
+                except Exception:
+                    logger.exception("Enrichment failed for appeal %s", appeal_id)
+                    await db.rollback()
+                    appeal.enrichment_status = EnrichmentStatus.FAILED
+                    await db.commit()
+        finally:
+            self._queued.discard(appeal_id)
+            if claimed:
+                self._recently_finished.append(appeal_id)
+                for event in self._waiters.pop(appeal_id, []):
+                    event.set()
+
+    async def enrich_appeal(
+        self,
+        db: AsyncSession,
+        appeal: Appeal,
+        keep_category: bool = False
+    ) -> Appeal:
+        """Заполнение AI-полей, района и адреса обращения"""
+        text = f"{appeal.title}\n{appeal.description}"
+
+        # AI-анализ (один запрос к модели) и геокодинг выполняются параллельно
+        ai_result, location = await asyncio.gather(
+            _timed("analysis", self.combined.analyze_appeal(appeal.title, appeal.description)),
+            _timed("location", self._resolve_location(appeal))
+        )
+
+        # Проверка на дубликаты по всему городу (MinHash + LSH)
+        with _stage("duplicates"):
+            signature = minhash.signature(text)
+            duplicate = await self.duplicates.find_duplicate(db, signature, exclude_id=appeal.id)
+            await self.duplicates.index_appeal(db, appeal, signature)
+
+        # Семантические дубликаты по локальным эмбеддингам (если включены)
+        vector = None
+        if self.similarity.available:
+            try:
+                with _stage("embedding"):
+                    vector = await self.similarity.embed_appeal(db, appeal)
+                    if duplicate is None:
+                        duplicate = await self.similarity.find_duplicate(db, vector, exclude_id=appeal.id)
+            except Exception as e:
+                logger.warning("Embedding failed for appeal %s: %s", appeal.id, e)
+
+        with _stage("db_commit"):
+            # За время запросов к модели обращение могли изменить (статус, категория):
+            # снимок для счетчиков берется из заблокированной строки в той же транзакции
+            result = await db.execute(
+                select(Appeal)
+                .where(Appeal.id == appeal.id)
+                .with_for_update()
+                .execution_options(populate_existing=True)
+            )
+            if result.scalar_one_or_none() is None:
+                await db.rollback()
+                return appeal
+            before = stats_service.snapshot(appeal)
+            category = appeal.category
+
+            appeal.district, appeal.address = location
+            if not keep_category:
+                appeal.category = ai_result["category"]
+            appeal.priority = ai_result["priority"]
+            appeal.ai_summary = ai_result["summary"]
+            appeal.ai_confidence = ai_result["confidence"]
+            appeal.ai_sentiment = ai_result["sentiment"]
+            appeal.is_duplicate = duplicate is not None
+            appeal.duplicate_of = duplicate[0] if duplicate else None
+            appeal.enrichment_status = EnrichmentStatus.COMPLETED
+            appeal.enriched_at = datetime.utcnow()
+
+            await stats_service.move(db, before, stats_service.snapshot(appeal))
+            await db.commit()
+        await dashboard_cache.bump()
+        if appeal.category != category:
+            await cluster_service.invalidate((appeal.latitude, appeal.longitude))  # кластеры с фильтром по категории
+        if vector is not None:
+            self.similarity.add_to_index(appeal.id, vector)
+        return appeal
+
+    async def _resolve_location(self, appeal: Appeal) -> Tuple[Optional[str], Optional[str]]:
+        """Определение района и адреса по координатам"""
+        if not (appeal.latitude and appeal.longitude):
+            return appeal.district, appeal.address
+
+        district, address = await self.geolocation.resolve_location(
+            appeal.latitude,
+            appeal.longitude,
+            need_address=not appeal.address
+        )
+        return district, appeal.address or address
+
+
+enrichment_service = EnrichmentService()
@@ -0,0 +1,231 @@
+import asyncio
+import glob
+import json
+import logging
+import os
+from collections import deque
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+from sqlalchemy import insert
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.analytics import AnalyticsEvent
+
+logger = logging.getLogger(__name__)
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class AnalyticsEventSink:
+    """
+    Буфер событий аналитики: запись в запросе — только добавление в очередь,
+    в БД события попадают пакетами (многострочный INSERT) по размеру пакета
+    или по таймеру. Буфер ограничен; при переполнении новые события
+    отбрасываются (drop) или буфер сбрасывается в файл (spill) и дочитывается позже.
+    Каждый процесс пишет в свой файл (<spill_path>.<pid>.jsonl); при старте и после
+    того, как буфер снова записан в БД, файл забирается переименованием, так что
+    воркеры не читают и не дописывают его одновременно.
+    """
+
+    def __init__(
+        self,
+        max_size: Optional[int] = None,
+        batch_size: Optional[int] = None,
+        flush_interval: Optional[float] = None,
+        overflow: Optional[str] = None,
+        spill_path: Optional[str] = None
+    ):
+        self.max_size = max_size or settings.ANALYTICS_BUFFER_SIZE
+        self.batch_size = batch_size or settings.ANALYTICS_BATCH_SIZE
+        self.flush_interval = flush_interval or settings.ANALYTICS_FLUSH_INTERVAL
+        self.overflow = overflow or settings.ANALYTICS_OVERFLOW
+        self.spill_path = spill_path or settings.ANALYTICS_SPILL_PATH
+        self._buffer: deque = deque()
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._spilling: Optional[asyncio.Task] = None
+        self.flushed = 0
+        self.dropped = 0
+        self.spilled = 0
+        self._spill_backlog = 0  # событий в файле процесса, еще не прочитанных обратно
+
+    def emit(
+        self,
+        event_type: str,
+        user_id: Optional[int] = None,
+        appeal_id: Optional[int] = None,
+        metadata: Optional[Dict] = None
+    ):
+        """Постановка события в буфер без ожидания"""
+        if len(self._buffer) >= self.max_size and not self._overflow():
+            self.dropped += 1
+            return
+        self._buffer.append({
+            "event_type": event_type,
+            "user_id": user_id,
+            "appeal_id": appeal_id,
+            "event_metadata": metadata or {},
+            # время события, а не записи пакета
+            "created_at": datetime.now(timezone.utc)
+        })
+        if len(self._buffer) >= self.batch_size:
+            self._wakeup.set()
+
+    def _overflow(self) -> bool:
+        """Освобождение буфера при переполнении; False — событие отбрасывается"""
+        if self.overflow != "spill" or self._spilling is not None:
+            return False
+        events = list(self._buffer)
+        self._buffer.clear()
+        self._spilling = asyncio.ensure_future(asyncio.to_thread(self._spill, events))
+        self._spilling.add_done_callback(self._spill_done)
+        return True
+
+    def _spill_done(self, task: asyncio.Task):
+        self._spilling = None
+        if not task.cancelled() and task.exception() is not None:
+            logger.error("Could not spill analytics events: %s", task.exception())
+
+    def _spill_file(self, tag) -> str:
+        root, ext = os.path.splitext(self.spill_path)
+        return f"{root}.{tag}{ext}"
+
+    def _spill(self, events: List[Dict]):
+        path = self._spill_file(os.getpid())
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "a", encoding="utf-8") as f:
+            for event in events:
+                f.write(json.dumps({**event, "created_at": event["created_at"].isoformat()}) + "\n")
+        self.spilled += len(events)
+        self._spill_backlog += len(events)
+
+    def _replay_files(self) -> List[str]:
+        """Файлы сброса этого и завершившихся процессов; файлы работающих воркеров не трогаются"""
+        root, ext = os.path.splitext(self.spill_path)
+        files = [self.spill_path] if os.path.exists(self.spill_path) else []
+        for path in sorted(glob.glob(f"{glob.escape(root)}.*{ext}")):
+            tag = path[len(root) + 1:len(path) - len(ext)].removeprefix("replay-")
+            if tag.isdigit() and (int(tag) == os.getpid() or not _pid_alive(int(tag))):
+                files.append(path)
+        return files
+
+    def _load_spilled(self) -> List[Dict]:
+        """Чтение сброшенных событий, сколько помещается в буфер; остальные переносятся в файл процесса"""
+        lines = []
+        for path in self._replay_files():
+            # Атомарное переименование: файл достается только одному воркеру
+            claimed = self._spill_file(f"replay-{os.getpid()}")
+            if path != claimed:
+                try:
+                    os.replace(path, claimed)
+                except FileNotFoundError:
+                    continue
+            with open(claimed, encoding="utf-8") as f:
+                lines.extend(f.readlines())
+            os.remove(claimed)
+
+        room = max(0, self.max_size - len(self._buffer))
+        events = []
+        for line in lines[:room]:
+            try:
+                event = json.loads(line)
+                event["created_at"] = datetime.fromisoformat(event["created_at"])
+                events.append(event)
+            except (ValueError, KeyError):
+                logger.warning("Skipping corrupted spilled analytics event")
+        if lines[room:]:
+            with open(self._spill_file(os.getpid()), "a", encoding="utf-8") as f:
+                f.writelines(lines[room:])
+        self._spill_backlog = len(lines[room:])
+        return events
+
+    async def _replay(self):
+        try:
+            self._buffer.extend(await asyncio.to_thread(self._load_spilled))
+        except OSError as e:
+            logger.warning("Could not read spilled analytics events: %s", e)
+
+    async def start(self):
+        if self._task is not None:
+            return
+        if self.overflow == "spill":
+            await self._replay()
+        self._task = asyncio.create_task(self._run(), name="analytics-events")
+
+    async def stop(self):
+        """Остановка с записью всего буфера (вызывается из lifespan)"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._spilling is not None:
+            await asyncio.gather(self._spilling, return_exceptions=True)
+        while self._buffer:
+            if not await self.flush():
+                break
+        if self._buffer:
+            if self.overflow == "spill":
+                events = list(self._buffer)
+                self._buffer.clear()
+                await asyncio.to_thread(self._spill, events)
+            else:
+                logger.warning("%d analytics events lost on shutdown", len(self._buffer))
+                self.dropped += len(self._buffer)
+                self._buffer.clear()
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            written = True
+            while self._buffer:
+                written = await self.flush()
+                if not written or len(self._buffer) < self.batch_size:
+                    break
+            if written and self._spill_backlog and not self._buffer and self._spilling is None:
+                # БД снова принимает пакеты: сброшенное дочитывается без перезапуска
+                await self._replay()
+                self._wakeup.set()
+
+    async def flush(self) -> bool:
+        """Запись одного пакета; при ошибке события возвращаются в начало буфера"""
+        batch = [self._buffer.popleft() for _ in range(min(self.batch_size, len(self._buffer)))]
+        if not batch:
+            return True
+        try:
+            async with AsyncSessionLocal() as db:
+                await db.execute(insert(AnalyticsEvent), batch)
+                await db.commit()
+        except Exception as e:
+            logger.warning("Could not write %d analytics events: %s", len(batch), e)
+            room = max(0, self.max_size - len(self._buffer))
+            self.dropped += max(0, len(batch) - room)
+            self._buffer.extendleft(reversed(batch[:room]))
+            return False
+        self.flushed += len(batch)
+        return True
+
+    def stats(self) -> Dict:
+        return {
+            "buffered": len(self._buffer),
+            "flushed": self.flushed,
+            "dropped": self.dropped,
+            "spilled": self.spilled
+        }
+
+
+event_sink = AnalyticsEventSink()
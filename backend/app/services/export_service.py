@@ -0,0 +1,398 @@
+import asyncio
+import csv
+import enum
+import io
+import json
+import logging
+import os
+import tempfile
+import time
+from datetime import date, datetime, timedelta, timezone
+from typing import AsyncIterator, List, Optional, Sequence
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.cell.cell import ILLEGAL_CHARACTERS_RE
+from sqlalchemy import select, update, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core.replicas import replica_router
+from app.models.appeal import Appeal, AppealCategory, AppealStatus
+from app.models.export_job import ExportJob, ExportStatus
+from app.services.analytics_service import dashboard_cache
+from app.services.appeal_service import filter_appeals
+from app.services.report_service import render_dashboard_pdf
+
+logger = logging.getLogger(__name__)
+
+EXPORT_FORMATS = ("csv", "xlsx", "jsonl")
+MEDIA_TYPES = {
+    "csv": "text/csv",  # charset=utf-8 добавляет Starlette
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    "jsonl": "application/x-ndjson",
+    "pdf": "application/pdf",
+}
+# Колонки совпадают с колонками импорта (import_service.parse_row)
+EXPORT_COLUMNS = [
+    Appeal.id,
+    Appeal.title,
+    Appeal.description,
+    Appeal.category,
+    Appeal.priority,
+    Appeal.status,
+    Appeal.latitude,
+    Appeal.longitude,
+    Appeal.address,
+    Appeal.district,
+    Appeal.created_at,
+    Appeal.resolved_at,
+    Appeal.ai_sentiment,
+    Appeal.ai_summary,
+]
+HEADER = [column.key for column in EXPORT_COLUMNS]
+# Текст, который Excel выполнит как формулу
+FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+CHUNK_SIZE = 256 * 1024
+PROGRESS_INTERVAL = 2.0  # seconds между обновлениями rows_done фоновой выгрузки
+HEARTBEAT_INTERVAL = 30.0  # seconds между отметками живой задачи (XLSX долго не отдает частей)
+
+
+def _plain(value):
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def _csv_value(value):
+    value = _plain(value)
+    if value is None:
+        return ""
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def _xlsx_value(sheet, value):
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, datetime):
+        # Excel не хранит часовой пояс: время выгружается в UTC
+        if value.tzinfo is not None:
+            value = value.astimezone(timezone.utc).replace(tzinfo=None)
+        return value
+    if isinstance(value, str):
+        cell = WriteOnlyCell(sheet, ILLEGAL_CHARACTERS_RE.sub("", value))
+        cell.data_type = "s"  # строка, а не формула, даже если начинается с «=»
+        return cell
+    return value
+
+
+def validate_category(category: Optional[str]):
+    if category is not None and category not in {item.value for item in AppealCategory}:
+        raise ValueError(f"Unknown category: {category}")
+
+
+class AppealExport:
+    """
+    Выгрузка обращений с фильтрами списка /appeals. Строки читаются серверным
+    курсором по EXPORT_FETCH_SIZE и сразу кодируются, поэтому память не растет
+    с объемом выгрузки; XLSX собирается во временном файле (write-only режим
+    openpyxl, строки inline) и отдается частями.
+    """
+
+    def __init__(
+        self,
+        fmt: str,
+        status: Optional[AppealStatus] = None,
+        category: Optional[str] = None,
+        user_id: Optional[int] = None
+    ):
+        if fmt not in EXPORT_FORMATS:
+            raise ValueError(f"Unsupported export format: {fmt}")
+        validate_category(category)
+        self.format = fmt
+        self.status = status
+        self.category = category
+        self.user_id = user_id
+        self.filename = f"appeals-{datetime.now(timezone.utc):%Y%m%d-%H%M%S}.{fmt}"
+        self.rows = 0
+
+    @property
+    def media_type(self) -> str:
+        return MEDIA_TYPES[self.format]
+
+    def query(self):
+        query = filter_appeals(
+            select(*EXPORT_COLUMNS),
+            status=self.status,
+            user_id=self.user_id,
+            category=self.category
+        )
+        return (
+            query.order_by(Appeal.created_at.desc(), Appeal.id.desc())
+            .execution_options(yield_per=settings.EXPORT_FETCH_SIZE)
+        )
+
+    async def _batches(self, db: AsyncSession) -> AsyncIterator[Sequence]:
+        result = await db.stream(self.query())
+        async for rows in result.partitions():
+            self.rows += len(rows)
+            yield rows
+
+    async def chunks(self, session_factory=AsyncSessionLocal) -> AsyncIterator[bytes]:
+        """Содержимое файла выгрузки по частям"""
+        async with session_factory() as db:
+            if self.format == "csv":
+                encode = self._csv_chunks
+            elif self.format == "jsonl":
+                encode = self._jsonl_chunks
+            else:
+                encode = self._xlsx_chunks
+            async for chunk in encode(self._batches(db)):
+                yield chunk
+
+    async def _csv_chunks(self, batches) -> AsyncIterator[bytes]:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        buffer.write("\ufeff")  # BOM: Excel иначе открывает UTF-8 как cp1251
+        writer.writerow(HEADER)
+        async for rows in batches:
+            writer.writerows([_csv_value(value) for value in row] for row in rows)
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue().encode("utf-8")
+
+    async def _jsonl_chunks(self, batches) -> AsyncIterator[bytes]:
+        async for rows in batches:
+            yield "".join(
+                json.dumps(dict(zip(HEADER, map(_plain, row))), ensure_ascii=False) + "\n"
+                for row in rows
+            ).encode("utf-8")
+
+    async def _xlsx_chunks(self, batches) -> AsyncIterator[bytes]:
+        os.makedirs(settings.EXPORT_DIR, exist_ok=True)
+        handle, path = tempfile.mkstemp(suffix=".xlsx", dir=settings.EXPORT_DIR)
+        os.close(handle)
+        try:
+            workbook = Workbook(write_only=True)
+            sheet = workbook.create_sheet("Обращения")
+            sheet.append(HEADER)
+            async for rows in batches:
+                await asyncio.to_thread(self._xlsx_rows, sheet, rows)
+            await asyncio.to_thread(workbook.save, path)
+
+            with open(path, "rb") as file:
+                while True:
+                    chunk = await asyncio.to_thread(file.read, CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    yield chunk
+        finally:
+            os.remove(path)
+
+    @staticmethod
+    def _xlsx_rows(sheet, rows: Sequence):
+        for row in rows:
+            sheet.append([_xlsx_value(sheet, value) for value in row])
+
+
+class ExportService:
+    """
+    Фоновые выгрузки для больших объемов: файл пишется в EXPORT_DIR задачей
+    процесса (job_runner), прогресс и готовность — в export_jobs, скачивание —
+    после завершения. Старые файлы удаляются при создании новых задач, задачи
+    упавших процессов (без отметки EXPORT_STALE_AFTER секунд) переводятся в FAILED.
+    Файл доступен только узлам, которые видят EXPORT_DIR.
+    """
+
+    async def create_job(
+        self,
+        db: AsyncSession,
+        user_id: int,
+        kind: str,
+        fmt: Optional[str] = None,
+        status: Optional[AppealStatus] = None,
+        category: Optional[str] = None,
+        days: int = 30
+    ) -> ExportJob:
+        if kind == "appeals":
+            fmt = fmt or "csv"
+            if fmt not in EXPORT_FORMATS:
+                raise ValueError(f"Unsupported export format: {fmt}")
+            validate_category(category)
+            params = {"status": status.value if status else None, "category": category}
+        elif kind == "dashboard":
+            fmt = fmt or "pdf"
+            if fmt != "pdf":
+                raise ValueError("Dashboard report is only available as pdf")
+            params = {"days": days}
+        else:
+            raise ValueError(f"Unknown export kind: {kind}")
+
+        await self.purge_expired(db)
+        await self.fail_stale(db)
+        job = ExportJob(
+            kind=kind,
+            format=fmt,
+            params=params,
+            status=ExportStatus.PENDING,
+            user_id=user_id,
+            rows_done=0,
+            size=0
+        )
+        db.add(job)
+        await db.commit()
+        await db.refresh(job)
+        return job
+
+    async def get_job(self, db: AsyncSession, job_id: int) -> Optional[ExportJob]:
+        result = await db.execute(select(ExportJob).where(ExportJob.id == job_id))
+        return result.scalar_one_or_none()
+
+    async def list_jobs(self, db: AsyncSession, limit: int = 50) -> List[ExportJob]:
+        result = await db.execute(select(ExportJob).order_by(ExportJob.id.desc()).limit(limit))
+        return list(result.scalars().all())
+
+    async def purge_expired(self, db: AsyncSession) -> int:
+        """Удаление файлов выгрузок с истекшим сроком хранения"""
+        now = datetime.now(timezone.utc)
+        result = await db.execute(
+            select(ExportJob).where(ExportJob.path.is_not(None), ExportJob.expires_at < now)
+        )
+        jobs = list(result.scalars().all())
+        for job in jobs:
+            try:
+                os.remove(job.path)
+            except FileNotFoundError:
+                pass
+            job.path = None
+        await db.commit()
+        return len(jobs)
+
+    async def fail_stale(self, db: AsyncSession) -> int:
+        """Перевод в FAILED задач, процесс которых упал, не завершив выгрузку"""
+        stale = datetime.now(timezone.utc) - timedelta(seconds=settings.EXPORT_STALE_AFTER)
+        conditions = [
+            ExportJob.status.in_([ExportStatus.PENDING, ExportStatus.RUNNING]),
+            func.coalesce(ExportJob.updated_at, ExportJob.created_at) < stale
+        ]
+        result = await db.execute(select(ExportJob.id, ExportJob.format).where(*conditions))
+        jobs = result.all()
+        if not jobs:
+            return 0
+        await db.execute(
+            update(ExportJob)
+            .where(ExportJob.id.in_([job_id for job_id, _ in jobs]), *conditions)
+            .values(status=ExportStatus.FAILED, error="Interrupted", updated_at=datetime.now(timezone.utc))
+            .execution_options(synchronize_session="fetch")
+        )
+        await db.commit()
+        for job_id, fmt in jobs:
+            # Недописанный файл, если задача выполнялась на этом узле
+            path = self._path(job_id, fmt)
+            if os.path.exists(path):
+                os.remove(path)
+        return len(jobs)
+
+    async def run(self, job_id: int) -> Optional[ExportJob]:
+        """Формирование файла выгрузки (задача job_runner)"""
+        async with AsyncSessionLocal() as db:
+            job = await self.get_job(db, job_id)
+            if job is None:
+                logger.warning("Export job %s not found", job_id)
+                return None
+            job.status = ExportStatus.RUNNING
+            job.updated_at = datetime.now(timezone.utc)
+            await db.commit()
+
+        os.makedirs(settings.EXPORT_DIR, exist_ok=True)
+        path = self._path(job_id, job.format)
+        heartbeat = asyncio.create_task(self._heartbeat(job_id))
+        try:
+            if job.kind == "dashboard":
+                filename = f"dashboard-{job.params['days']}d-{datetime.now(timezone.utc):%Y%m%d}.pdf"
+                entry = await dashboard_cache.get(job.params["days"])
+                content = await asyncio.to_thread(render_dashboard_pdf, entry.value, job.params["days"])
+                await asyncio.to_thread(self._write_file, path, content)
+                size, rows = len(content), 0
+            else:
+                size, rows, filename = await self._write_appeals(job, path)
+        except asyncio.CancelledError:
+            await self._fail(job_id, path, "Interrupted")
+            raise
+        except Exception as e:
+            logger.exception("Export job %s failed", job_id)
+            await self._fail(job_id, path, str(e))
+            raise
+        finally:
+            heartbeat.cancel()
+
+        now = datetime.now(timezone.utc)
+        return await self._update(
+            job_id,
+            status=ExportStatus.COMPLETED,
+            path=path,
+            filename=filename,
+            rows_done=rows,
+            size=size,
+            finished_at=now,
+            expires_at=now + timedelta(seconds=settings.EXPORT_RETENTION)
+        )
+
+    async def _write_appeals(self, job: ExportJob, path: str):
+        status = job.params.get("status")
+        export = AppealExport(
+            job.format,
+            status=AppealStatus(status) if status else None,
+            category=job.params.get("category")
+        )
+        session_factory = await replica_router.session_factory()
+        size = 0
+        reported = time.monotonic()
+        with open(path, "wb") as file:
+            async for chunk in export.chunks(session_factory):
+                await asyncio.to_thread(file.write, chunk)
+                size += len(chunk)
+                if time.monotonic() - reported >= PROGRESS_INTERVAL:
+                    reported = time.monotonic()
+                    await self._update(job.id, rows_done=export.rows, size=size)
+        return size, export.rows, export.filename
+
+    @staticmethod
+    def _path(job_id: int, fmt: str) -> str:
+        return os.path.join(settings.EXPORT_DIR, f"export-{job_id}.{fmt}")
+
+    async def _heartbeat(self, job_id: int):
+        while True:
+            await asyncio.sleep(HEARTBEAT_INTERVAL)
+            try:
+                await self._update(job_id)
+            except Exception as e:
+                logger.warning("Export job %s heartbeat failed: %s", job_id, e)
+
+    async def _fail(self, job_id: int, path: str, error: str):
+        if os.path.exists(path):
+            os.remove(path)
+        await self._update(job_id, status=ExportStatus.FAILED, error=error)
+
+    @staticmethod
+    def _write_file(path: str, content: bytes):
+        with open(path, "wb") as file:
+            file.write(content)
+
+    async def _update(self, job_id: int, **values) -> ExportJob:
+        async with AsyncSessionLocal() as db:
+            await db.execute(
+                update(ExportJob)
+                .where(ExportJob.id == job_id)
+                .values(**values, updated_at=datetime.now(timezone.utc))
+            )
+            await db.commit()
+            return await self.get_job(db, job_id)
+
+
+export_service = ExportService()
@@ -1,37 +1,224 @@
-from typing import Optional, Dict
+import asyncio
+import logging
+import math
+import time
+from typing import Optional, Dict, List, Tuple
+import numpy as np
 from geopy.geocoders import Nominatim
 from geopy.distance import geodesic
+from app.core import geohash
+from app.core.cache import TTLCache
 from app.core.config import settings
+from app.core.metrics import GEOCODER_REQUESTS, GEOCODER_LATENCY
+from app.services.district_resolver import DistrictResolver
+
+logger = logging.getLogger(__name__)
+
+EARTH_RADIUS_KM = 6371.0088
+
+# Поля адреса Nominatim, в которых может быть район (в порядке приоритета)
+DISTRICT_FIELDS = ("suburb", "city_district", "district", "neighbourhood")
+
+
+def haversine_km(
+    latitude: float,
+    longitude: float,
+    latitudes: np.ndarray,
+    longitudes: np.ndarray
+) -> np.ndarray:
+    """Расстояния по дуге большого круга от точки до массива точек, км"""
+    lat1 = np.radians(latitude)
+    lat2 = np.radians(latitudes)
+    d_lat = lat2 - lat1
+    d_lon = np.radians(longitudes) - np.radians(longitude)
+    a = np.sin(d_lat / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin(d_lon / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def radius_bbox(
+    latitude: float,
+    longitude: float,
+    radius_km: float
+) -> Tuple[float, float, float, float]:
+    """
+    Прямоугольник, описанный вокруг круга: (min_lat, min_lon, max_lat, max_lon).
+    Долгота не обрезается: у круга через антимеридиан min_lon < -180 или max_lon > 180
+    """
+    d_lat = math.degrees(radius_km / EARTH_RADIUS_KM)
+    cos_lat = max(math.cos(math.radians(latitude)), 1e-6)
+    d_lon = min(math.degrees(radius_km / EARTH_RADIUS_KM / cos_lat), 180.0)
+    return (
+        max(latitude - d_lat, -90.0),
+        longitude - d_lon,
+        min(latitude + d_lat, 90.0),
+        longitude + d_lon
+    )
+
+
+def split_antimeridian(
+    bbox: Tuple[float, float, float, float]
+) -> List[Tuple[Tuple[float, float, float, float], float]]:
+    """
+    Части прямоугольника в пределах [-180, 180] долготы и для каждой — сдвиг
+    долготы (0 или ±360), переводящий в нее точки исходного прямоугольника
+    """
+    min_lat, min_lon, max_lat, max_lon = bbox
+    if max_lon - min_lon >= 360.0:
+        return [((min_lat, -180.0, max_lat, 180.0), 0.0)]
+    parts = [((min_lat, max(min_lon, -180.0), max_lat, min(max_lon, 180.0)), 0.0)]
+    if min_lon < -180.0:
+        parts.append(((min_lat, min_lon + 360.0, max_lat, 180.0), 360.0))
+    if max_lon > 180.0:
+        parts.append(((min_lat, -180.0, max_lat, max_lon - 360.0), -360.0))
+    return parts
+
+
+def parse_bbox(value: str) -> Tuple[float, float, float, float]:
+    """
+    Разбор bbox "min_lon,min_lat,max_lon,max_lat" (порядок GeoJSON)
+    в (min_lat, min_lon, max_lat, max_lon); ValueError, если bbox некорректен
+    """
+    try:
+        min_lon, min_lat, max_lon, max_lat = (float(part) for part in value.split(","))
+    except ValueError as e:
+        raise ValueError("Invalid bbox") from e
+    if not (-90.0 <= min_lat < max_lat <= 90.0 and -180.0 <= min_lon < max_lon <= 180.0):
+        raise ValueError("Invalid bbox")
+    return min_lat, min_lon, max_lat, max_lon
+
+
+class RateLimiter:
+    """Ограничение частоты запросов: не чаще одного раза в min_interval секунд"""
+
+    def __init__(self, min_interval: float):
+        self.min_interval = min_interval
+        self._lock = asyncio.Lock()
+        self._last = 0.0
+
+    async def __aenter__(self):
+        await self._lock.acquire()
+        delay = self._last + self.min_interval - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    async def __aexit__(self, *exc_info):
+        self._last = time.monotonic()
+        self._lock.release()
+
+
+# Общие для всех экземпляров сервиса: лимит Nominatim действует на процесс
+_rate_limiter = RateLimiter(settings.GEOCODER_MIN_INTERVAL)
+_reverse_cache = TTLCache(max_size=settings.GEOCODE_CACHE_MAX_SIZE, ttl=settings.GEOCODE_CACHE_TTL)
+_reverse_inflight: Dict[str, asyncio.Task] = {}
+_district_resolver: Optional[DistrictResolver] = None
+_district_resolver_loaded = False
+
+
+def get_district_resolver() -> Optional[DistrictResolver]:
+    """Границы районов из DISTRICTS_GEOJSON (загружаются при первом обращении)"""
+    global _district_resolver, _district_resolver_loaded
+    if not _district_resolver_loaded:
+        _district_resolver = DistrictResolver.load(
+            settings.DISTRICTS_GEOJSON,
+            name_property=settings.DISTRICTS_NAME_PROPERTY
+        )
+        _district_resolver_loaded = True
+    return _district_resolver
 
 
 class GeolocationService:
     """Сервис для работы с геолокацией"""
-    
+
     def __init__(self):
-        self.geolocator = Nominatim(user_agent="glas_app")
-    
+        self.geolocator = Nominatim(
+            user_agent=settings.GEOCODER_USER_AGENT,
+            timeout=settings.GEOCODER_TIMEOUT,
+            domain=settings.GEOCODER_DOMAIN,
+            scheme=settings.GEOCODER_SCHEME
+        )
+
+    async def reverse(
+        self,
+        latitude: float,
+        longitude: float
+    ) -> Optional[Dict[str, Optional[str]]]:
+        """
+        Обратное геокодирование: {"address", "district"}.
+        Один запрос к Nominatim на ячейку geohash; одновременные запросы
+        к одной ячейке ждут общий результат. None — если сервис недоступен.
+        """
+        key = geohash.encode(latitude, longitude, settings.GEOCODE_CACHE_PRECISION)
+        cached = _reverse_cache.get(key)
+        if cached is not None:
+            GEOCODER_REQUESTS.inc(operation="reverse", outcome="cache")
+            return cached
+
+        # Запрос выполняется отдельной задачей: отмена первого вызвавшего
+        # не отменяет его для остальных, ожидающих тот же результат
+        task = _reverse_inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._reverse_shared(key, latitude, longitude))
+            _reverse_inflight[key] = task
+        return await asyncio.shield(task)
+
+    async def _reverse_shared(
+        self,
+        key: str,
+        latitude: float,
+        longitude: float
+    ) -> Optional[Dict[str, Optional[str]]]:
+        try:
+            result = await self._reverse_remote(latitude, longitude)
+            if result is not None:
+                _reverse_cache.set(key, result)
+            return result
+        finally:
+            _reverse_inflight.pop(key, None)
+
+    async def _reverse_remote(
+        self,
+        latitude: float,
+        longitude: float
+    ) -> Optional[Dict[str, Optional[str]]]:
+        try:
+            with GEOCODER_LATENCY.time(operation="reverse"):
+                async with _rate_limiter:
+                    location = await asyncio.to_thread(
+                        self.geolocator.reverse,
+                        f"{latitude}, {longitude}",
+                        language="ru"
+                    )
+        except Exception as e:
+            GEOCODER_REQUESTS.inc(operation="reverse", outcome="error")
+            logger.warning("Reverse geocoding failed: %s", e)
+            return None
+        GEOCODER_REQUESTS.inc(operation="reverse", outcome="ok")
+        if not location:
+            return {"address": None, "district": None}
+        address = location.raw.get("address", {})
+        # Попытка найти район в разных полях
+        district = next((address[field] for field in DISTRICT_FIELDS if address.get(field)), None)
+        return {"address": location.address, "district": district}
+
     async def get_address_from_coordinates(
         self,
         latitude: float,
         longitude: float
     ) -> Optional[str]:
         """Получение адреса по координатам"""
-        try:
-            location = self.geolocator.reverse(
-                f"{latitude}, {longitude}",
-                language="ru"
-            )
-            return location.address if location else None
-        except Exception:
-            return None
-    
+        result = await self.reverse(latitude, longitude)
+        return result["address"] if result else None
+
     async def get_coordinates_from_address(
         self,
         address: str
     ) -> Optional[Dict[str, float]]:
         """Получение координат по адресу"""
         try:
-            location = self.geolocator.geocode(address)
+            with GEOCODER_LATENCY.time(operation="geocode"):
+                async with _rate_limiter:
+                    location = await asyncio.to_thread(self.geolocator.geocode, address)
+            GEOCODER_REQUESTS.inc(operation="geocode", outcome="ok")
             if location:
                 return {
                     "latitude": location.latitude,
@@ -39,33 +226,39 @@ class GeolocationService:
                 }
             return None
         except Exception:
+            GEOCODER_REQUESTS.inc(operation="geocode", outcome="error")
             return None
-    
+
     async def get_district(
         self,
         latitude: float,
         longitude: float
     ) -> Optional[str]:
         """Определение района по координатам"""
-        try:
-            location = self.geolocator.reverse(
-                f"{latitude}, {longitude}",
-                language="ru"
-            )
-            if location:
-                address = location.raw.get("address", {})
-                # Попытка найти район в разных полях
-                district = (
-                    address.get("suburb") or
-                    address.get("city_district") or
-                    address.get("district") or
-                    address.get("neighbourhood")
-                )
-                return district
-            return None
-        except Exception:
-            return None
-    
+        resolver = get_district_resolver()
+        if resolver is not None:
+            return resolver.resolve(latitude, longitude)
+        result = await self.reverse(latitude, longitude)
+        return result["district"] if result else None
+
+    async def resolve_location(
+        self,
+        latitude: float,
+        longitude: float,
+        need_address: bool = True
+    ) -> Tuple[Optional[str], Optional[str]]:
+        """Район и адрес по координатам: не больше одного запроса к Nominatim"""
+        resolver = get_district_resolver()
+        district = resolver.resolve(latitude, longitude) if resolver is not None else None
+        address = None
+        if need_address or resolver is None:
+            result = await self.reverse(latitude, longitude)
+            if result:
+                address = result["address"]
+                if resolver is None:
+                    district = result["district"]
+        return district, address
+
     def calculate_distance(
         self,
         lat1: float,
@@ -0,0 +1,214 @@
+import asyncio
+import logging
+import os
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Tuple
+from PIL import Image, ImageOps, UnidentifiedImageError, features
+from sqlalchemy import select
+from app.core.background import WorkerPool
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.appeal import Appeal
+from app.services.appeal_service import encode_geohash, image_lock
+from app.services.analytics_service import dashboard_cache
+from app.services.cluster_service import cluster_service
+from app.services.geolocation_service import GeolocationService
+from app.services.stats_service import stats_service
+
+logger = logging.getLogger(__name__)
+
+# Теги EXIF: GPSInfo IFD и поля внутри него
+GPS_IFD = 0x8825
+GPS_LATITUDE_REF, GPS_LATITUDE, GPS_LONGITUDE_REF, GPS_LONGITUDE = 1, 2, 3, 4
+
+
+@dataclass
+class ProcessedImage:
+    variants: Dict[str, str] = field(default_factory=dict)  # имя варианта -> путь
+    gps: Optional[Tuple[float, float]] = None  # (lat, lon) из EXIF
+
+
+def _degrees(value, ref) -> Optional[float]:
+    """Градусы из EXIF (градусы, минуты, секунды)"""
+    try:
+        degrees, minutes, seconds = (float(part) for part in value)
+    except (TypeError, ValueError, ZeroDivisionError):
+        return None
+    result = degrees + minutes / 60 + seconds / 3600
+    if isinstance(ref, bytes):
+        ref = ref.decode("ascii", "ignore")
+    return -result if str(ref).strip().upper() in ("S", "W") else result
+
+
+def read_gps(image: Image.Image) -> Optional[Tuple[float, float]]:
+    """Координаты съемки из EXIF; None, если их нет или они некорректны"""
+    try:
+        gps = image.getexif().get_ifd(GPS_IFD)
+    except Exception:
+        return None
+    if not gps or GPS_LATITUDE not in gps or GPS_LONGITUDE not in gps:
+        return None
+    latitude = _degrees(gps[GPS_LATITUDE], gps.get(GPS_LATITUDE_REF, "N"))
+    longitude = _degrees(gps[GPS_LONGITUDE], gps.get(GPS_LONGITUDE_REF, "E"))
+    if latitude is None or longitude is None:
+        return None
+    if not (-90.0 <= latitude <= 90.0 and -180.0 <= longitude <= 180.0) or (latitude, longitude) == (0.0, 0.0):
+        return None
+    return latitude, longitude
+
+
+def image_format() -> Tuple[str, str]:
+    """Формат вариантов: (формат Pillow, расширение); JPEG, если WebP недоступен"""
+    if settings.IMAGE_FORMAT.lower() == "webp" and features.check("webp"):
+        return "WEBP", "webp"
+    return "JPEG", "jpg"
+
+
+# Форматы, в которых оригинал перезаписывается без метаданных, и параметры сохранения
+STRIP_FORMATS = {"JPEG": {"quality": 95}, "PNG": {}, "WEBP": {"quality": 95}, "TIFF": {}}
+METADATA_KEYS = ("exif", "xmp", "XML:com.adobe.xmp", "comment")
+KEEP_INFO = ("icc_profile", "transparency", "dpi")
+
+
+def has_metadata(image: Image.Image) -> bool:
+    return len(image.getexif()) > 0 or any(key in image.info for key in METADATA_KEYS)
+
+
+def strip_metadata(original: Image.Image, path: str) -> bool:
+    """
+    Перезапись оригинала без EXIF (в том числе GPS), XMP и комментариев, с поворотом
+    по тегу Orientation; цветовой профиль и прозрачность сохраняются. False, если формат не поддерживается
+    """
+    params = STRIP_FORMATS.get(original.format)
+    if params is None or getattr(original, "n_frames", 1) > 1:
+        logger.warning("Metadata of %s (%s) is kept: format is not supported", path, original.format)
+        return False
+    image = ImageOps.exif_transpose(original)
+    image.info.clear()
+    params = {**params, **{key: original.info[key] for key in KEEP_INFO if key in original.info}}
+    tmp_path = f"{path}.tmp"
+    image.save(tmp_path, original.format, **params)
+    os.replace(tmp_path, path)
+    return True
+
+
+def process_image(path: str) -> Optional[ProcessedImage]:
+    """
+    Уменьшенные копии изображения и координаты съемки; оригинал перезаписывается
+    без метаданных (EXIF, в том числе GPS). Выполняется в потоке; уже созданные
+    варианты не пересоздаются. None, если файл не является изображением.
+    """
+    fmt, extension = image_format()
+    base = os.path.splitext(path)[0]
+    result = ProcessedImage()
+    try:
+        with Image.open(path) as original:
+            result.gps = read_gps(original)
+            if has_metadata(original):
+                original.load()  # данные читаются до замены файла
+                strip_metadata(original, path)
+            image = None
+            for name, max_side in sorted(settings.IMAGE_VARIANTS.items(), key=lambda item: -item[1]):
+                variant_path = f"{base}_{name}.{extension}"
+                result.variants[name] = variant_path
+                if os.path.exists(variant_path):
+                    continue
+                if image is None:
+                    # Поворот по тегу Orientation до удаления EXIF
+                    image = ImageOps.exif_transpose(original)
+                    has_alpha = image.mode in ("RGBA", "LA") or "transparency" in image.info
+                    image = image.convert("RGBA" if has_alpha and fmt == "WEBP" else "RGB")
+                    image.info.clear()
+                variant = image.copy()
+                variant.thumbnail((max_side, max_side), Image.LANCZOS)
+                tmp_path = f"{variant_path}.tmp"
+                variant.save(tmp_path, fmt, quality=settings.IMAGE_QUALITY, optimize=True)
+                os.replace(tmp_path, variant_path)
+    except (UnidentifiedImageError, FileNotFoundError) as e:
+        logger.warning("Skipping image %s: %s", path, e)
+        return None
+    return result
+
+
+class ImageService:
+    """
+    Фоновая обработка загруженных изображений: варианты для списков и карточек
+    (image_variants), удаление EXIF из оригинала и координаты из GPS-тегов для обращений без координат.
+    """
+
+    def __init__(self):
+        self.geolocation = GeolocationService()
+        self.pool = WorkerPool(
+            "images",
+            self._process,
+            workers=settings.IMAGE_WORKERS,
+            queue_size=settings.IMAGE_QUEUE_SIZE
+        )
+
+    def start(self):
+        self.pool.start()
+
+    async def stop(self):
+        await self.pool.stop()
+
+    def enqueue(self, appeal_id: int, path: str) -> bool:
+        """Постановка загруженного изображения в очередь обработки"""
+        return self.pool.submit((appeal_id, path))
+
+    async def process(self, appeal_id: int, path: str):
+        """Обработка изображения сразу, без очереди (если очередь переполнена)"""
+        await self._process((appeal_id, path))
+
+    async def _process(self, item):
+        appeal_id, path = item
+        processed = await asyncio.to_thread(process_image, path)
+        if processed is None:
+            return
+        await self.apply(appeal_id, path, processed)
+
+    async def apply(self, appeal_id: int, path: str, processed: ProcessedImage):
+        """Сохранение вариантов и координат из EXIF в обращении"""
+        location = None
+        if processed.gps and settings.IMAGE_GPS_FROM_EXIF:
+            async with AsyncSessionLocal() as db:
+                result = await db.execute(
+                    select(Appeal.latitude, Appeal.longitude, Appeal.address).where(Appeal.id == appeal_id)
+                )
+                row = result.one_or_none()
+            if row is not None and row.latitude is None and row.longitude is None:
+                # Геокодинг до блокировки строки: может ждать лимита Nominatim
+                location = await self.geolocation.resolve_location(
+                    *processed.gps,
+                    need_address=not row.address
+                )
+
+        async with image_lock(appeal_id):
+            async with AsyncSessionLocal() as db:
+                result = await db.execute(
+                    select(Appeal).where(Appeal.id == appeal_id).with_for_update()
+                )
+                appeal = result.scalar_one_or_none()
+                if appeal is None:
+                    return
+
+                variants = dict(appeal.image_variants or {})
+                variants[path] = processed.variants
+                appeal.image_variants = variants
+
+                located = location is not None and appeal.latitude is None and appeal.longitude is None
+                if located:
+                    before = stats_service.snapshot(appeal)
+                    appeal.latitude, appeal.longitude = processed.gps
+                    appeal.geohash = encode_geohash(*processed.gps)
+                    district, address = location
+                    appeal.district = appeal.district or district
+                    appeal.address = appeal.address or address
+                    await stats_service.move(db, before, stats_service.snapshot(appeal))
+                await db.commit()
+
+        if located:
+            await dashboard_cache.bump()
+            await cluster_service.invalidate(processed.gps)
+
+
+image_service = ImageService()
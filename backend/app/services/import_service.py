@@ -0,0 +1,540 @@
+import asyncio
+import codecs
+import csv
+import json
+import logging
+import os
+import uuid
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+from sqlalchemy import select, update, insert, and_, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.appeal import Appeal, AppealCategory, AppealPriority, AppealStatus, EnrichmentStatus
+from app.models.import_job import ImportJob, ImportStatus
+from app.ai.combined import CombinedAnalyzer
+from app.services.appeal_service import encode_geohash
+from app.services.geolocation_service import GeolocationService, get_district_resolver
+from app.services.stats_service import stats_service
+from app.services.analytics_service import dashboard_cache
+from app.services.cluster_service import cluster_cache
+
+logger = logging.getLogger(__name__)
+
+FORMATS = ("csv", "jsonl")
+CLASSIFY_MODES = ("rules", "llm")
+GEOCODE_MODES = ("offline", "full")
+
+# Строка файла: (номер строки, поля) или (номер строки, текст ошибки разбора)
+Record = Tuple[int, object]
+
+
+class ImportLeaseLost(Exception):
+    """Задачу импорта захватил другой процесс"""
+
+
+def detect_format(filename: Optional[str]) -> Optional[str]:
+    extension = os.path.splitext(filename or "")[1].lower()
+    if extension == ".csv":
+        return "csv"
+    if extension in (".jsonl", ".ndjson"):
+        return "jsonl"
+    return None
+
+
+class ImportReader:
+    """
+    Потоковое чтение CSV или JSONL. Файл читается построчно в двоичном режиме,
+    чтобы знать прочитанный объем (position) для прогресса.
+    """
+
+    def __init__(self, path: str, fmt: str, encoding: str = "utf-8"):
+        self.path = path
+        self.format = fmt
+        self.encoding = encoding
+        self.position = 0
+        self._file = open(path, "rb")
+        self._records = self._csv_records() if fmt == "csv" else self._jsonl_records()
+
+    def close(self):
+        self._file.close()
+
+    def _lines(self) -> Iterator[str]:
+        # utf-8-sig убирает BOM, который добавляют выгрузки из Excel
+        decoder = codecs.getincrementaldecoder("utf-8-sig" if self.encoding == "utf-8" else self.encoding)()
+        for line in self._file:
+            self.position += len(line)
+            yield decoder.decode(line)
+
+    def _sniff_dialect(self):
+        sample = self._file.read(64 * 1024)
+        self._file.seek(0)
+        try:
+            return csv.Sniffer().sniff(sample.decode(self.encoding, errors="ignore"), delimiters=",;\t")
+        except csv.Error:
+            return csv.excel
+
+    def _csv_records(self) -> Iterator[Record]:
+        reader = csv.DictReader(self._lines(), dialect=self._sniff_dialect())
+        for row in reader:
+            yield reader.line_num, row
+
+    def _jsonl_records(self) -> Iterator[Record]:
+        for number, line in enumerate(self._lines(), start=1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError as e:
+                yield number, f"Invalid JSON: {e}"
+                continue
+            yield number, row if isinstance(row, dict) else "Expected a JSON object"
+
+    def read(self, count: int) -> List[Record]:
+        """Следующие count строк (выполняется в потоке)"""
+        batch = []
+        for record in self._records:
+            batch.append(record)
+            if len(batch) >= count:
+                break
+        return batch
+
+    def skip(self, count: int):
+        """Пропуск уже импортированных строк при продолжении задачи"""
+        for _ in range(count):
+            if next(self._records, None) is None:
+                break
+
+
+def _text(row: Dict, name: str) -> Optional[str]:
+    value = row.get(name)
+    if value is None:
+        return None
+    value = str(value).strip()
+    return value or None
+
+
+def _float(row: Dict, name: str) -> Optional[float]:
+    value = row.get(name)
+    if isinstance(value, (int, float)):
+        return float(value)
+    value = _text(row, name)
+    # Десятичная запятая в выгрузках с русской локалью
+    return float(value.replace(",", ".")) if value is not None else None
+
+
+def _datetime(row: Dict, name: str) -> Optional[datetime]:
+    value = _text(row, name)
+    if value is None:
+        return None
+    parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def _enum(enum_class, row: Dict, name: str, strict: bool = True):
+    value = _text(row, name)
+    if value is None:
+        return None
+    try:
+        return enum_class(value.lower())
+    except ValueError:
+        if strict:
+            raise ValueError(f"Unknown {name}: {value}")
+        return None
+
+
+def parse_row(row: Dict, user_id: int, now: datetime) -> Dict:
+    """
+    Строка файла -> значения обращения. ValueError с описанием, если строка некорректна.
+    Неизвестная категория не ошибка: она определяется классификацией.
+    """
+    title = _text(row, "title")
+    description = _text(row, "description")
+    if title is None:
+        raise ValueError("title is required")
+    if description is None:
+        raise ValueError("description is required")
+
+    latitude = _float(row, "latitude")
+    longitude = _float(row, "longitude")
+    if (latitude is None) != (longitude is None):
+        raise ValueError("latitude and longitude must be set together")
+    if latitude is not None and not (-90.0 <= latitude <= 90.0 and -180.0 <= longitude <= 180.0):
+        raise ValueError("coordinates out of range")
+
+    status = _enum(AppealStatus, row, "status") or AppealStatus.PENDING
+    created_at = _datetime(row, "created_at") or now
+
+    return {
+        "title": title[:200],
+        "description": description,
+        "category": _enum(AppealCategory, row, "category", strict=False),
+        "status": status,
+        "priority": _enum(AppealPriority, row, "priority"),
+        "latitude": latitude,
+        "longitude": longitude,
+        "address": _text(row, "address"),
+        "district": _text(row, "district"),
+        "geohash": encode_geohash(latitude, longitude),
+        "images": [],
+        "user_id": user_id,
+        "created_at": created_at,
+        "resolved_at": _datetime(row, "resolved_at"),
+        "enrichment_status": EnrichmentStatus.COMPLETED,
+        "enriched_at": now
+    }
+
+
+class ImportService:
+    """
+    Массовый импорт обращений из CSV/JSONL: чтение потоком, классификация
+    пакетами (правила или параллельные запросы к модели), геокодинг через кэш,
+    многострочный INSERT. Пакет, свертка дашборда и счетчики задачи
+    записываются в одной транзакции — после сбоя импорт продолжается
+    с первой незаписанной строки. Пакеты пишет только владелец захвата
+    (owner), поэтому перехваченная задача не импортируется дважды.
+    """
+
+    def __init__(self):
+        self.combined = CombinedAnalyzer()
+        self.geolocation = GeolocationService()
+
+    async def create_job(
+        self,
+        db: AsyncSession,
+        source: str,
+        user_id: int,
+        fmt: str,
+        filename: Optional[str] = None,
+        classify: str = "rules",
+        geocode: str = "offline",
+        encoding: str = "utf-8",
+        batch_size: Optional[int] = None
+    ) -> ImportJob:
+        if fmt not in FORMATS:
+            raise ValueError(f"Unsupported format: {fmt}")
+        if classify not in CLASSIFY_MODES:
+            raise ValueError(f"Unsupported classify mode: {classify}")
+        if geocode not in GEOCODE_MODES:
+            raise ValueError(f"Unsupported geocode mode: {geocode}")
+        try:
+            codecs.lookup(encoding)
+        except LookupError:
+            raise ValueError(f"Unknown encoding: {encoding}")
+
+        job = ImportJob(
+            source=source,
+            filename=filename or os.path.basename(source),
+            format=fmt,
+            options={
+                "classify": classify,
+                "geocode": geocode,
+                "encoding": encoding,
+                "batch_size": batch_size or settings.IMPORT_BATCH_SIZE
+            },
+            status=ImportStatus.PENDING,
+            user_id=user_id,
+            rows_done=0,
+            inserted=0,
+            failed=0,
+            bytes_done=0,
+            bytes_total=os.path.getsize(source),
+            errors=[],
+            cancel_requested=False
+        )
+        db.add(job)
+        await db.commit()
+        await db.refresh(job)
+        return job
+
+    async def get_job(self, db: AsyncSession, job_id: int) -> Optional[ImportJob]:
+        result = await db.execute(select(ImportJob).where(ImportJob.id == job_id))
+        return result.scalar_one_or_none()
+
+    async def list_jobs(self, db: AsyncSession, limit: int = 50) -> List[ImportJob]:
+        result = await db.execute(select(ImportJob).order_by(ImportJob.id.desc()).limit(limit))
+        return list(result.scalars().all())
+
+    async def request_cancel(self, db: AsyncSession, job_id: int) -> Optional[ImportJob]:
+        """Остановка после текущего пакета (в любом процессе, выполняющем задачу)"""
+        job = await self.get_job(db, job_id)
+        if job is None:
+            return None
+        if job.status == ImportStatus.PENDING:
+            job.status = ImportStatus.CANCELLED
+        elif job.status == ImportStatus.RUNNING:
+            job.cancel_requested = True
+        await db.commit()
+        await db.refresh(job)
+        return job
+
+    async def claim(self, job_id: int) -> ImportJob:
+        """
+        Перевод задачи в RUNNING с новым токеном владельца. ValueError, если она
+        уже выполняется (и обновлялась недавно), завершена или файла нет на этом узле.
+        """
+        now = datetime.now(timezone.utc)
+        stale = now - timedelta(seconds=settings.IMPORT_STALE_AFTER)
+        token = uuid.uuid4().hex
+        async with AsyncSessionLocal() as db:
+            job = await self.get_job(db, job_id)
+            if job is None:
+                raise LookupError("Import job not found")
+            if not os.path.exists(job.source):
+                # IMPORT_DIR не общий для узлов: файл остался там, куда его загрузили
+                raise ValueError("Import file is not available on this node")
+            result = await db.execute(
+                update(ImportJob)
+                .where(
+                    ImportJob.id == job_id,
+                    or_(
+                        ImportJob.status.in_([ImportStatus.PENDING, ImportStatus.FAILED, ImportStatus.CANCELLED]),
+                        and_(
+                            ImportJob.status == ImportStatus.RUNNING,
+                            or_(ImportJob.updated_at.is_(None), ImportJob.updated_at < stale)
+                        )
+                    )
+                )
+                .values(
+                    status=ImportStatus.RUNNING,
+                    owner=token,
+                    cancel_requested=False,
+                    error=None,
+                    updated_at=now
+                )
+                .execution_options(synchronize_session=False)
+            )
+            await db.commit()
+            job = await self.get_job(db, job_id)
+            await db.refresh(job)
+        if result.rowcount == 0:
+            raise ValueError(f"Import job is {job.status.value}")
+        return job
+
+    async def run(
+        self,
+        job_id: int,
+        progress: Optional[Callable[[Dict], None]] = None
+    ) -> ImportJob:
+        """Выполнение (или продолжение) задачи импорта"""
+        return await self.process(await self.claim(job_id), progress)
+
+    async def process(
+        self,
+        job: ImportJob,
+        progress: Optional[Callable[[Dict], None]] = None
+    ) -> ImportJob:
+        """Импорт с точки продолжения задачи, захваченной через claim()"""
+        job_id = job.id
+        token = job.owner
+        options = job.options
+        errors = list(job.errors or [])
+        counters = {"rows_done": job.rows_done, "inserted": job.inserted, "failed": job.failed}
+        cancelled = False
+
+        reader = await asyncio.to_thread(ImportReader, job.source, job.format, options["encoding"])
+        # Классификация моделью и геокодинг пакета могут идти дольше IMPORT_STALE_AFTER
+        heartbeat = asyncio.create_task(self._heartbeat(job_id, token))
+        try:
+            await asyncio.to_thread(reader.skip, job.rows_done)
+            while True:
+                records = await asyncio.to_thread(reader.read, options["batch_size"])
+                if not records:
+                    break
+                rows = await self._prepare(records, job.user_id, options, errors)
+                counters["rows_done"] += len(records)
+                counters["inserted"] += len(rows)
+                counters["failed"] += len(records) - len(rows)
+                cancelled = await self._write_batch(job_id, token, rows, counters, reader.position, errors)
+                if progress is not None:
+                    progress({**counters, "bytes_done": reader.position, "bytes_total": job.bytes_total})
+                if cancelled:
+                    break
+        except ImportLeaseLost:
+            logger.warning("Import job %s was taken over by another worker", job_id)
+            async with AsyncSessionLocal() as db:
+                return await self.get_job(db, job_id)
+        except asyncio.CancelledError:
+            await self._finish(job_id, token, ImportStatus.FAILED, "Interrupted; resume to continue")
+            raise
+        except Exception as e:
+            logger.exception("Import job %s failed", job_id)
+            await self._finish(job_id, token, ImportStatus.FAILED, str(e))
+            raise
+        finally:
+            heartbeat.cancel()
+            reader.close()
+
+        job = await self._finish(job_id, token, ImportStatus.CANCELLED if cancelled else ImportStatus.COMPLETED)
+        if job.inserted:
+            await dashboard_cache.bump()
+            await cluster_cache.bump()  # тайлов импорта много, устаревают все
+        return job
+
+    async def _prepare(
+        self,
+        records: List[Record],
+        user_id: int,
+        options: Dict,
+        errors: List[Dict]
+    ) -> List[Dict]:
+        """Разбор, классификация и геокодинг пакета; ошибочные строки пропускаются"""
+        now = datetime.now(timezone.utc)
+        rows = []
+        for line, row in records:
+            try:
+                if isinstance(row, str):
+                    raise ValueError(row)
+                rows.append(parse_row(row, user_id, now))
+            except ValueError as e:
+                if len(errors) < settings.IMPORT_MAX_ERRORS:
+                    errors.append({"line": line, "error": str(e)})
+        if not rows:
+            return rows
+
+        if options["classify"] == "llm":
+            await self._classify_llm(rows)
+        else:
+            await asyncio.to_thread(self._classify_rules, rows)
+        await self._locate(rows, options["geocode"] == "full")
+        return rows
+
+    def _classify_rules(self, rows: List[Dict]):
+        for row in rows:
+            self._apply_analysis(row, self.combined.analyze_with_rules(row["title"], row["description"]))
+
+    async def _classify_llm(self, rows: List[Dict]):
+        """Параллельные запросы к модели (ответы кэшируются, при ошибке — правила)"""
+        semaphore = asyncio.Semaphore(settings.IMPORT_LLM_CONCURRENCY)
+
+        async def analyze(row: Dict):
+            async with semaphore:
+                result = await self.combined.analyze_appeal(row["title"], row["description"])
+            self._apply_analysis(row, result)
+
+        await asyncio.gather(*(analyze(row) for row in rows))
+
+    @staticmethod
+    def _apply_analysis(row: Dict, result: Dict):
+        # Категория и приоритет из файла приоритетнее классификации
+        row["category"] = row["category"] or result["category"]
+        row["priority"] = row["priority"] or result["priority"]
+        row["ai_summary"] = result["summary"]
+        row["ai_confidence"] = result["confidence"]
+        row["ai_sentiment"] = result["sentiment"]
+
+    async def _locate(self, rows: List[Dict], full: bool):
+        """
+        Район по границам районов; при geocode=full — адрес и район через Nominatim
+        (кэш по geohash) и координаты по адресу (кэш в пределах пакета)
+        """
+        resolver = get_district_resolver()
+        reverse = []
+        by_address: Dict[str, List[Dict]] = {}
+        for row in rows:
+            if row["latitude"] is not None:
+                if row["district"] is None and resolver is not None:
+                    row["district"] = resolver.resolve(row["latitude"], row["longitude"])
+                if full and (row["district"] is None or row["address"] is None):
+                    reverse.append(row)
+            elif full and row["address"]:
+                by_address.setdefault(row["address"].lower(), []).append(row)
+        if not full:
+            return
+
+        addresses = list(by_address)
+        results = await asyncio.gather(
+            *(self._reverse(row) for row in reverse),
+            *(self.geolocation.get_coordinates_from_address(by_address[key][0]["address"]) for key in addresses)
+        )
+        for key, location in zip(addresses, results[len(reverse):]):
+            if not location:
+                continue
+            for row in by_address[key]:
+                row["latitude"], row["longitude"] = location["latitude"], location["longitude"]
+                row["geohash"] = encode_geohash(row["latitude"], row["longitude"])
+                if row["district"] is None and resolver is not None:
+                    row["district"] = resolver.resolve(row["latitude"], row["longitude"])
+
+    async def _reverse(self, row: Dict):
+        district, address = await self.geolocation.resolve_location(
+            row["latitude"],
+            row["longitude"],
+            need_address=row["address"] is None
+        )
+        row["district"] = row["district"] or district
+        row["address"] = row["address"] or address
+
+    def _owned(self, job_id: int, token: str):
+        return update(ImportJob).where(ImportJob.id == job_id, ImportJob.owner == token)
+
+    async def _touch(self, job_id: int, token: str) -> bool:
+        """Продление захвата; False, если задачу захватил другой процесс"""
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                self._owned(job_id, token).values(updated_at=datetime.now(timezone.utc))
+            )
+            await db.commit()
+            return result.rowcount == 1
+
+    async def _heartbeat(self, job_id: int, token: str):
+        while True:
+            await asyncio.sleep(settings.IMPORT_HEARTBEAT_INTERVAL)
+            try:
+                if not await self._touch(job_id, token):
+                    return  # следующий пакет не будет записан (ImportLeaseLost)
+            except Exception as e:
+                logger.warning("Import job %s heartbeat failed: %s", job_id, e)
+
+    async def _write_batch(
+        self,
+        job_id: int,
+        token: str,
+        rows: List[Dict],
+        counters: Dict,
+        position: int,
+        errors: List[Dict]
+    ) -> bool:
+        """Пакет обращений, свертка и точка продолжения — одной транзакцией; True, если запрошена отмена"""
+        async with AsyncSessionLocal() as db:
+            # Сначала строка задачи: блокировка сериализует запись с перехватом в claim()
+            result = await db.execute(
+                self._owned(job_id, token).values(
+                    **counters,
+                    bytes_done=position,
+                    errors=errors,
+                    updated_at=datetime.now(timezone.utc)
+                )
+            )
+            if result.rowcount == 0:
+                await db.rollback()
+                raise ImportLeaseLost(job_id)
+            if rows:
+                await db.execute(insert(Appeal), rows)
+                await stats_service.add_many(
+                    db,
+                    (stats_service.snapshot(SimpleNamespace(**row)) for row in rows)
+                )
+            await db.commit()
+            result = await db.execute(select(ImportJob.cancel_requested).where(ImportJob.id == job_id))
+            return bool(result.scalar())
+
+    async def _finish(
+        self,
+        job_id: int,
+        token: str,
+        status: ImportStatus,
+        error: Optional[str] = None
+    ) -> ImportJob:
+        async with AsyncSessionLocal() as db:
+            values = {"status": status, "error": error, "updated_at": datetime.now(timezone.utc)}
+            if status == ImportStatus.COMPLETED:
+                values["finished_at"] = datetime.now(timezone.utc)
+            await db.execute(self._owned(job_id, token).values(**values))
+            await db.commit()
+            return await self.get_job(db, job_id)
+
+
+import_service = ImportService()
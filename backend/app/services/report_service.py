@@ -0,0 +1,153 @@
+import io
+import logging
+import os
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.lib.units import mm
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont
+from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Подписи как на дашборде фронтенда
+STATUS_LABELS = {
+    "pending": "Ожидает",
+    "in_progress": "В работе",
+    "resolved": "Решено",
+    "rejected": "Отклонено",
+    "closed": "Закрыто",
+}
+CATEGORY_LABELS = {
+    "roads": "Дороги и транспорт",
+    "lighting": "Освещение",
+    "improvement": "Благоустройство",
+    "ecology": "Экология и отходы",
+    "safety": "Безопасность",
+    "healthcare": "Здравоохранение",
+    "utilities": "Коммунальные услуги",
+    "social": "Социальная помощь",
+    "other": "Другое",
+}
+PRIORITY_LABELS = {"low": "Низкий", "medium": "Средний", "high": "Высокий", "urgent": "Срочный"}
+SENTIMENT_LABELS = {"positive": "Позитивная", "neutral": "Нейтральная", "negative": "Негативная"}
+
+_fonts: Optional[Tuple[str, str]] = None
+
+
+def report_fonts() -> Tuple[str, str]:
+    """
+    Обычный и полужирный шрифты отчета. Встроенные шрифты PDF не содержат кириллицы,
+    поэтому регистрируются TTF из настроек; без них — Helvetica (с предупреждением).
+    """
+    global _fonts
+    if _fonts is None:
+        if os.path.exists(settings.REPORT_FONT) and os.path.exists(settings.REPORT_FONT_BOLD):
+            pdfmetrics.registerFont(TTFont("ReportFont", settings.REPORT_FONT))
+            pdfmetrics.registerFont(TTFont("ReportFont-Bold", settings.REPORT_FONT_BOLD))
+            _fonts = ("ReportFont", "ReportFont-Bold")
+        else:
+            logger.warning("Report fonts not found (%s), Cyrillic text will not render", settings.REPORT_FONT)
+            _fonts = ("Helvetica", "Helvetica-Bold")
+    return _fonts
+
+
+def _table(header: List[str], rows: List[List], fonts: Tuple[str, str]) -> Table:
+    table = Table([header] + rows, hAlign="LEFT", repeatRows=1)
+    table.setStyle(TableStyle([
+        ("FONTNAME", (0, 0), (-1, -1), fonts[0]),
+        ("FONTNAME", (0, 0), (-1, 0), fonts[1]),
+        ("FONTSIZE", (0, 0), (-1, -1), 9),
+        ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#e8edf3")),
+        ("GRID", (0, 0), (-1, -1), 0.5, colors.HexColor("#b0b8c4")),
+        ("ALIGN", (1, 0), (-1, -1), "RIGHT"),
+        ("LEFTPADDING", (0, 0), (-1, -1), 6),
+        ("RIGHTPADDING", (0, 0), (-1, -1), 6),
+    ]))
+    return table
+
+
+def _breakdown(values: Dict[str, int], labels: Dict[str, str], total: int) -> List[List]:
+    """Строки «название — количество — доля», по убыванию количества"""
+    return [
+        [labels.get(key, key), count, f"{count * 100 / total:.1f}%" if total else "—"]
+        for key, count in sorted(values.items(), key=lambda item: -item[1])
+    ]
+
+
+def render_dashboard_pdf(stats: Dict, days: int) -> bytes:
+    """PDF-отчет по статистике дашборда (AnalyticsService.get_dashboard_stats); выполняется в потоке"""
+    fonts = report_fonts()
+    styles = getSampleStyleSheet()
+    title = styles["Title"].clone("ReportTitle", fontName=fonts[1])
+    heading = styles["Heading2"].clone("ReportHeading", fontName=fonts[1])
+    normal = styles["Normal"].clone("ReportNormal", fontName=fonts[0])
+
+    total = stats["total_appeals"]
+    in_window = sum(stats["appeals_by_status"].values())
+    generated = datetime.now(timezone.utc).strftime("%d.%m.%Y %H:%M UTC")
+
+    story = [
+        Paragraph(f"Отчет по обращениям за {days} дн.", title),
+        Paragraph(f"Сформирован {generated}", normal),
+        Spacer(1, 6 * mm),
+        _table(
+            ["Показатель", "Значение"],
+            [
+                ["Всего обращений", total],
+                [f"За {days} дн.", in_window],
+                ["Доля решенных", f"{stats['resolution_rate']:.1f}%"],
+                ["Среднее время решения", f"{stats['average_resolution_time']:.1f} ч"],
+            ],
+            fonts
+        ),
+    ]
+
+    sections = [
+        ("По статусам", stats["appeals_by_status"], STATUS_LABELS),
+        ("По категориям", stats["appeals_by_category"], CATEGORY_LABELS),
+        ("По приоритетам", stats["appeals_by_priority"], PRIORITY_LABELS),
+        ("Тональность", stats["sentiment_distribution"], SENTIMENT_LABELS),
+    ]
+    for name, values, labels in sections:
+        if values:
+            story += [
+                Paragraph(f"{name} (за {days} дн.)", heading),
+                _table(["", "Обращений", "Доля"], _breakdown(values, labels, in_window), fonts),
+            ]
+
+    if stats["top_districts"]:
+        story += [
+            Paragraph("Районы с наибольшим числом обращений", heading),
+            _table(
+                ["Район", "Обращений"],
+                [[item["district"], item["count"]] for item in stats["top_districts"]],
+                fonts
+            ),
+        ]
+    if stats["appeals_timeline"]:
+        story += [
+            Paragraph("Обращения по дням", heading),
+            _table(
+                ["Дата", "Обращений"],
+                [[item["date"], item["count"]] for item in stats["appeals_timeline"]],
+                fonts
+            ),
+        ]
+
+    buffer = io.BytesIO()
+    document = SimpleDocTemplate(
+        buffer,
+        pagesize=A4,
+        title=f"Отчет по обращениям за {days} дн.",
+        leftMargin=18 * mm,
+        rightMargin=18 * mm,
+        topMargin=18 * mm,
+        bottomMargin=18 * mm
+    )
+    document.build(story)
+    return buffer.getvalue()
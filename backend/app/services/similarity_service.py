@@ -0,0 +1,162 @@
+import asyncio
+import logging
+import os
+import re
+from datetime import datetime, timedelta
+from typing import List, Optional, Tuple
+import numpy as np
+from sqlalchemy import select, delete
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.ai import minhash
+from app.ai.embeddings import embedding_engine
+from app.ai.vector_index import VectorIndex
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.appeal import Appeal
+from app.models.embedding import AppealEmbedding
+from app.services.duplicate_service import DuplicateService
+
+logger = logging.getLogger(__name__)
+
+SYNC_BATCH_SIZE = 5000
+
+
+class SimilarityService:
+    """
+    Семантический поиск похожих обращений на локальных эмбеддингах.
+    Векторы хранятся в appeal_embeddings, поиск — по индексу в памяти процесса,
+    который догружает новые строки из БД и сохраняется на диск при остановке.
+    Без эмбеддингов похожие обращения ищутся по MinHash.
+    """
+
+    def __init__(self):
+        self.engine = embedding_engine
+        self.duplicates = DuplicateService()
+        self.index: Optional[VectorIndex] = None
+        self._sync_lock = asyncio.Lock()
+
+    @property
+    def available(self) -> bool:
+        return self.engine.available
+
+    @property
+    def index_path(self) -> str:
+        name = re.sub(r"[^0-9A-Za-z_.-]+", "_", settings.EMBEDDING_MODEL)
+        return os.path.join(settings.EMBEDDING_INDEX_DIR, f"{name}.npz")
+
+    async def start(self):
+        """Загрузка сохраненного индекса и догрузка новых векторов из БД"""
+        if not self.available:
+            return
+        if os.path.exists(self.index_path):
+            try:
+                self.index = await asyncio.to_thread(VectorIndex.load, self.index_path)
+            except Exception as e:
+                logger.warning("Could not load embedding index: %s", e)
+        try:
+            async with AsyncSessionLocal() as db:
+                await self.sync(db)
+        except Exception as e:
+            logger.warning("Could not sync embedding index: %s", e)
+
+    async def stop(self):
+        if self.index is not None:
+            await asyncio.to_thread(self.index.save, self.index_path)
+
+    async def sync(self, db: AsyncSession):
+        """Добавление в индекс векторов, записанных после последней синхронизации"""
+        async with self._sync_lock:
+            last_row_id = self.index.last_row_id if self.index else 0
+            while True:
+                result = await db.execute(
+                    select(AppealEmbedding.id, AppealEmbedding.appeal_id, AppealEmbedding.vector)
+                    .where(
+                        AppealEmbedding.id > last_row_id,
+                        AppealEmbedding.model == settings.EMBEDDING_MODEL
+                    )
+                    .order_by(AppealEmbedding.id)
+                    .limit(SYNC_BATCH_SIZE)
+                )
+                rows = result.all()
+                if not rows:
+                    break
+                vectors = np.vstack([np.frombuffer(row.vector, dtype=np.float32) for row in rows])
+                if self.index is None:
+                    self.index = VectorIndex(vectors.shape[1])
+                self.index.add([row.appeal_id for row in rows], vectors)
+                last_row_id = rows[-1].id
+                self.index.last_row_id = last_row_id
+
+    async def embed_appeal(self, db: AsyncSession, appeal: Appeal) -> np.ndarray:
+        """Вычисление и сохранение эмбеддинга обращения (в текущей транзакции)"""
+        vector = await self.engine.embed(f"{appeal.title}\n{appeal.description}")
+        await db.execute(delete(AppealEmbedding).where(AppealEmbedding.appeal_id == appeal.id))
+        db.add(AppealEmbedding(
+            appeal_id=appeal.id,
+            model=settings.EMBEDDING_MODEL,
+            vector=vector.astype(np.float32).tobytes()
+        ))
+        return vector
+
+    async def find_duplicate(
+        self,
+        db: AsyncSession,
+        vector: np.ndarray,
+        exclude_id: Optional[int] = None
+    ) -> Optional[Tuple[int, float]]:
+        """Семантический дубликат: (id исходного обращения, сходство) или None"""
+        await self.sync(db)
+        if self.index is None:
+            return None
+        for appeal_id, score in self.index.search(vector, k=5, exclude=exclude_id):
+            if score < settings.EMBEDDING_DUPLICATE_THRESHOLD:
+                break
+            cutoff_date = datetime.utcnow() - timedelta(days=settings.DUPLICATE_WINDOW_DAYS)
+            result = await db.execute(
+                select(Appeal.duplicate_of).where(
+                    Appeal.id == appeal_id,
+                    Appeal.created_at >= cutoff_date
+                )
+            )
+            row = result.first()
+            if row is not None:
+                return row.duplicate_of or appeal_id, score
+        return None
+
+    async def find_similar(
+        self,
+        db: AsyncSession,
+        appeal: Appeal,
+        k: int = 10
+    ) -> List[Tuple[int, float]]:
+        """Похожие обращения: список (id, сходство) по убыванию сходства"""
+        if self.available:
+            await self.sync(db)
+            result = await db.execute(
+                select(AppealEmbedding.vector).where(
+                    AppealEmbedding.appeal_id == appeal.id,
+                    AppealEmbedding.model == settings.EMBEDDING_MODEL
+                )
+            )
+            stored = result.scalar_one_or_none()
+            if stored is not None:
+                vector = np.frombuffer(stored, dtype=np.float32)
+            else:
+                vector = await self.engine.embed(f"{appeal.title}\n{appeal.description}")
+            if self.index is not None:
+                return self.index.search(vector, k=k, exclude=appeal.id)
+            return []
+
+        signature = appeal.minhash_signature or minhash.signature(
+            f"{appeal.title}\n{appeal.description}"
+        )
+        return await self.duplicates.find_similar(db, signature, k=k, exclude_id=appeal.id)
+
+    def add_to_index(self, appeal_id: int, vector: np.ndarray):
+        """Немедленное добавление вектора после коммита (без ожидания синхронизации)"""
+        if self.index is None:
+            self.index = VectorIndex(len(vector))
+        self.index.add([appeal_id], vector)
+
+
+similarity_service = SimilarityService()
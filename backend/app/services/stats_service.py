@@ -0,0 +1,178 @@
+import logging
+from datetime import date, datetime, timezone
+from typing import Dict, Iterable, Optional, Tuple
+from sqlalchemy import select, delete, insert, update, case, func, and_, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.database import AsyncSessionLocal
+from app.models.appeal import Appeal, AppealStatus
+from app.models.analytics import AppealStatsDaily
+
+logger = logging.getLogger(__name__)
+
+# (день, статус, категория, приоритет, район, тональность, часы до решения)
+StatsKey = Tuple[date, AppealStatus, object, object, str, str, Optional[float]]
+
+BUCKET_COLUMNS = ("day", "status", "category", "priority", "district", "sentiment")
+
+
+def _utc(value: datetime) -> datetime:
+    """Приведение к наивному UTC (из БД время может прийти с часовым поясом)"""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+class StatsService:
+    """
+    Свертка обращений для дашборда (appeal_stats_daily).
+    Каждое изменение обращения переносит его из одной корзины в другую
+    в той же транзакции, полная пересборка — rebuild().
+    """
+
+    def snapshot(self, appeal: Appeal) -> Optional[StatsKey]:
+        """Корзина свертки, в которую попадает обращение"""
+        if appeal.created_at is None:
+            return None
+        hours = None
+        if appeal.status == AppealStatus.RESOLVED and appeal.resolved_at is not None:
+            hours = (_utc(appeal.resolved_at) - _utc(appeal.created_at)).total_seconds() / 3600
+        return (
+            _utc(appeal.created_at).date(),
+            appeal.status,
+            appeal.category,
+            appeal.priority,
+            appeal.district or "",
+            appeal.ai_sentiment or "",
+            hours
+        )
+
+    async def move(
+        self,
+        db: AsyncSession,
+        before: Optional[StatsKey],
+        after: Optional[StatsKey]
+    ):
+        """Перенос обращения между корзинами (в текущей транзакции)"""
+        if before == after:
+            return
+        if before is not None:
+            await self._add(db, before, -1)
+        if after is not None:
+            await self._add(db, after, 1)
+
+    async def add_many(self, db: AsyncSession, keys: Iterable[Optional[StatsKey]]):
+        """Добавление пакета новых обращений: одно обновление на корзину (в текущей транзакции)"""
+        buckets: Dict[tuple, list] = {}
+        for key in keys:
+            if key is None:
+                continue
+            deltas = buckets.setdefault(key[:6], [0, 0, 0.0])
+            deltas[0] += 1
+            if key[6] is not None:
+                deltas[1] += 1
+                deltas[2] += key[6]
+        for bucket, (count, resolved_with_time, hours_sum) in buckets.items():
+            await self._apply(db, dict(zip(BUCKET_COLUMNS, bucket)), {
+                "count": count,
+                "resolved_with_time": resolved_with_time,
+                "resolution_hours_sum": hours_sum
+            })
+
+    async def _add(self, db: AsyncSession, key: StatsKey, sign: int):
+        hours = key[6]
+        await self._apply(db, dict(zip(BUCKET_COLUMNS, key[:6])), {
+            "count": sign,
+            "resolved_with_time": sign if hours is not None else 0,
+            "resolution_hours_sum": sign * hours if hours is not None else 0.0
+        })
+
+    async def _apply(self, db: AsyncSession, values: Dict, deltas: Dict):
+        dialect = db.get_bind().dialect.name
+        if dialect in ("postgresql", "sqlite"):
+            if dialect == "postgresql":
+                from sqlalchemy.dialects.postgresql import insert as dialect_insert
+            else:
+                from sqlalchemy.dialects.sqlite import insert as dialect_insert
+            statement = dialect_insert(AppealStatsDaily).values(**values, **deltas)
+            statement = statement.on_conflict_do_update(
+                index_elements=list(BUCKET_COLUMNS),
+                set_={
+                    name: getattr(AppealStatsDaily, name) + getattr(statement.excluded, name)
+                    for name in deltas
+                }
+            )
+            await db.execute(statement)
+            return
+
+        # Прочие СУБД: обновление, а при отсутствии строки — вставка
+        conditions = [getattr(AppealStatsDaily, name) == value for name, value in values.items()]
+        result = await db.execute(
+            update(AppealStatsDaily)
+            .where(*conditions)
+            .values({
+                name: getattr(AppealStatsDaily, name) + delta
+                for name, delta in deltas.items()
+            })
+        )
+        if result.rowcount == 0:
+            await db.execute(insert(AppealStatsDaily).values(**values, **deltas))
+
+    async def rebuild(self, db: AsyncSession) -> int:
+        """Полная пересборка свертки по таблице обращений; возвращает число корзин"""
+        dialect = db.get_bind().dialect.name
+        if dialect == "postgresql":
+            # Инкрементальные обновления ждут окончания пересборки и применяются поверх нее
+            await db.execute(text("LOCK TABLE appeal_stats_daily IN EXCLUSIVE MODE"))
+            day = func.date(func.timezone("UTC", Appeal.created_at))
+            hours = func.extract("epoch", Appeal.resolved_at - Appeal.created_at) / 3600
+        else:
+            day = func.date(Appeal.created_at)
+            hours = (func.julianday(Appeal.resolved_at) - func.julianday(Appeal.created_at)) * 24
+
+        resolved = and_(Appeal.status == AppealStatus.RESOLVED, Appeal.resolved_at.isnot(None))
+        district = func.coalesce(Appeal.district, "")
+        sentiment = func.coalesce(Appeal.ai_sentiment, "")
+        source = (
+            select(
+                day,
+                Appeal.status,
+                Appeal.category,
+                Appeal.priority,
+                district,
+                sentiment,
+                func.count(Appeal.id),
+                func.sum(case((resolved, 1), else_=0)),
+                func.coalesce(func.sum(case((resolved, hours), else_=0.0)), 0.0)
+            )
+            .group_by(day, Appeal.status, Appeal.category, Appeal.priority, district, sentiment)
+        )
+
+        await db.execute(delete(AppealStatsDaily))
+        await db.execute(
+            insert(AppealStatsDaily).from_select(
+                list(BUCKET_COLUMNS) + ["count", "resolved_with_time", "resolution_hours_sum"],
+                source
+            )
+        )
+        await db.commit()
+
+        result = await db.execute(select(func.count(AppealStatsDaily.id)))
+        return result.scalar() or 0
+
+    async def start(self):
+        """Первичное построение свертки, если она пуста, а обращения уже есть"""
+        try:
+            async with AsyncSessionLocal() as db:
+                has_stats = await db.execute(select(AppealStatsDaily.id).limit(1))
+                if has_stats.first() is not None:
+                    return
+                has_appeals = await db.execute(select(Appeal.id).limit(1))
+                if has_appeals.first() is None:
+                    return
+                buckets = await self.rebuild(db)
+                logger.info("Dashboard stats rebuilt: %s buckets", buckets)
+        except Exception as e:
+            logger.warning("Could not build dashboard stats: %s", e)
+
+
+stats_service = StatsService()
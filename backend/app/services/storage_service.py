@@ -0,0 +1,98 @@
+import asyncio
+import hashlib
+import logging
+import os
+import re
+import tempfile
+from dataclasses import dataclass
+from typing import Optional
+from fastapi import UploadFile
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_EXTENSION = re.compile(r"^\.[a-z0-9]{1,8}$")
+
+
+class FileTooLarge(ValueError):
+    """Файл больше MAX_UPLOAD_SIZE"""
+
+
+@dataclass
+class StoredFile:
+    path: str  # путь относительно рабочей директории, как хранится в Appeal.images
+    sha256: str
+    size: int
+    deduplicated: bool  # такой файл уже был сохранен раньше
+
+
+class StorageService:
+    """
+    Хранилище загруженных файлов с адресацией по содержимому:
+    файл сохраняется как {UPLOAD_DIR}/ab/cd/<sha256><ext>, одинаковые файлы хранятся один раз.
+    Запись идет потоково во временный файл в пуле потоков и переносится атомарно (os.replace).
+    """
+
+    def __init__(self, root: Optional[str] = None, chunk_size: Optional[int] = None):
+        self.root = root or settings.UPLOAD_DIR
+        self.chunk_size = chunk_size or settings.UPLOAD_CHUNK_SIZE
+
+    def path_for(self, digest: str, extension: str = "") -> str:
+        return f"{self.root}/{digest[:2]}/{digest[2:4]}/{digest}{extension}"
+
+    @staticmethod
+    def extension(filename: Optional[str]) -> str:
+        """Расширение исходного имени файла, если оно безопасно для пути"""
+        extension = os.path.splitext(filename or "")[1].lower()
+        return extension if _EXTENSION.match(extension) else ""
+
+    async def save_upload(self, file: UploadFile, max_size: Optional[int] = None) -> StoredFile:
+        """Потоковое сохранение загрузки; FileTooLarge — как только размер превышен"""
+        max_size = settings.MAX_UPLOAD_SIZE if max_size is None else max_size
+        tmp_dir = os.path.join(self.root, "tmp")
+        await asyncio.to_thread(os.makedirs, tmp_dir, exist_ok=True)
+        fd, tmp_path = await asyncio.to_thread(tempfile.mkstemp, dir=tmp_dir)
+
+        digest = hashlib.sha256()
+        size = 0
+        try:
+            with os.fdopen(fd, "wb") as tmp:
+                while True:
+                    chunk = await file.read(self.chunk_size)
+                    if not chunk:
+                        break
+                    size += len(chunk)
+                    if size > max_size:
+                        raise FileTooLarge("File too large")
+                    digest.update(chunk)
+                    await asyncio.to_thread(tmp.write, chunk)
+            path = self.path_for(digest.hexdigest(), self.extension(file.filename))
+            deduplicated = await asyncio.to_thread(self._commit, tmp_path, path)
+        except BaseException:
+            await asyncio.to_thread(self._remove, tmp_path)
+            raise
+
+        return StoredFile(path=path, sha256=digest.hexdigest(), size=size, deduplicated=deduplicated)
+
+    @staticmethod
+    def _commit(tmp_path: str, path: str) -> bool:
+        """Перенос временного файла на место; True, если такой файл уже есть"""
+        if os.path.exists(path):
+            os.remove(tmp_path)
+            return True
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        os.chmod(tmp_path, 0o644)  # mkstemp создает файл с правами 0600
+        os.replace(tmp_path, path)
+        return False
+
+    @staticmethod
+    def _remove(path: str):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.warning("Could not remove temporary upload %s: %s", path, e)
+
+
+storage_service = StorageService()
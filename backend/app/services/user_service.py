@@ -2,8 +2,9 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from typing import Optional
 from app.models.user import User
-from app.schemas.user import UserCreate
-from app.core.security import get_password_hash, verify_password
+from app.schemas.user import UserCreate, UserUpdate
+from app.core.principals import principal_cache
+from app.core.security import password_hasher
 from app.core.security import create_access_token
 from datetime import timedelta
 
@@ -22,7 +23,7 @@ class UserService:
         if existing_user:
             raise ValueError("User with this email already exists")
         
-        hashed_password = get_password_hash(user_data.password)
+        hashed_password = await password_hasher.hash(user_data.password)
         
         user = User(
             email=user_data.email,
@@ -59,6 +60,33 @@ class UserService:
         )
         return result.scalar_one_or_none()
     
+    async def update_user(
+        self,
+        db: AsyncSession,
+        user_id: int,
+        user_data: UserUpdate
+    ) -> Optional[User]:
+        """Обновление пользователя со сбросом кэша прав"""
+        user = await self.get_user_by_id(db, user_id)
+        if not user:
+            return None
+        
+        update_data = user_data.model_dump(exclude_unset=True)
+        
+        if "email" in update_data and update_data["email"] != user.email:
+            existing_user = await self.get_user_by_email(db, update_data["email"])
+            if existing_user:
+                raise ValueError("User with this email already exists")
+        
+        for field, value in update_data.items():
+            setattr(user, field, value)
+        
+        await db.commit()
+        await db.refresh(user)
+        await principal_cache.invalidate(user.id)
+        
+        return user
+    
     async def authenticate_user(
         self,
         db: AsyncSession,
@@ -73,15 +101,25 @@ class UserService:
         if not user.hashed_password:
             return None
         
-        if not verify_password(password, user.hashed_password):
+        verified, new_hash = await password_hasher.verify_and_update(
+            password,
+            user.hashed_password
+        )
+        if not verified:
             return None
         
+        # Хеш со старой стоимостью bcrypt пересчитывается прозрачно при входе
+        if new_hash:
+            user.hashed_password = new_hash
+            await db.commit()
+        
         return user
     
     async def create_access_token_for_user(self, user: User) -> str:
         """Создание JWT токена для пользователя"""
+        # sub — строка по спецификации JWT; права берутся из principal, а не из токена
         return create_access_token(
-            data={"sub": user.id},
+            data={"sub": str(user.id), "email": user.email},
             expires_delta=timedelta(seconds=604800)  # 7 days
         )
 
@@ -0,0 +1,99 @@
+"""
+Микро-бенчмарк правило-основанной классификации.
+
+Сравнивает прежнюю реализацию (поиск каждой подстроки отдельно, три прохода
+по тексту) с автоматом Ахо-Корасик из app.ai.rules.
+
+Запуск из каталога backend:
+    python -m benchmarks.bench_rules [--texts 2000] [--repeat 5]
+"""
+import argparse
+import random
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.ai.classifier import AIClassifier
+from app.ai.analyzer import AIAnalyzer
+from app.ai.combined import CombinedAnalyzer
+from app.ai.rules import (
+    CATEGORY_KEYWORDS,
+    URGENT_KEYWORDS,
+    HIGH_KEYWORDS,
+    NEGATIVE_WORDS,
+    POSITIVE_WORDS,
+)
+
+FILLER = (
+    "на улице возле дома уже несколько недель жители просят администрацию "
+    "обратить внимание и принять меры по ситуации во дворе и на остановке"
+).split()
+
+
+def legacy_rules(text: str):
+    """Прежняя реализация: подстроки, отдельные проходы для категорий, приоритета и тональности"""
+    text_lower = text.lower()
+    category_scores = {
+        category: sum(1 for keyword in keywords if keyword in text_lower)
+        for category, keywords in CATEGORY_KEYWORDS.items()
+    }
+    urgent = any(keyword in text_lower for keyword in URGENT_KEYWORDS)
+    high = any(keyword in text_lower for keyword in HIGH_KEYWORDS)
+    negative_count = sum(1 for word in NEGATIVE_WORDS if word in text_lower)
+    positive_count = sum(1 for word in POSITIVE_WORDS if word in text_lower)
+    return category_scores, urgent, high, negative_count, positive_count
+
+
+def make_texts(count: int, words: int, seed: int = 42):
+    rng = random.Random(seed)
+    vocabulary = [kw for kws in CATEGORY_KEYWORDS.values() for kw in kws]
+    vocabulary += URGENT_KEYWORDS + HIGH_KEYWORDS + NEGATIVE_WORDS + POSITIVE_WORDS
+    texts = []
+    for _ in range(count):
+        body = [rng.choice(FILLER) for _ in range(words)]
+        for _ in range(rng.randint(1, 4)):
+            body.insert(rng.randrange(len(body)), rng.choice(vocabulary))
+        texts.append(" ".join(body))
+    return texts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--texts", type=int, default=2000)
+    parser.add_argument("--words", type=int, default=60)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    texts = make_texts(args.texts, args.words)
+    classifier = AIClassifier()
+    analyzer = AIAnalyzer()
+    combined = CombinedAnalyzer()
+
+    def run_legacy():
+        for text in texts:
+            legacy_rules(text)
+
+    def run_separate():
+        # Классификация и тональность по отдельности, как в AIClassifier/AIAnalyzer
+        for text in texts:
+            classifier._classify_with_rules(text)
+            analyzer._analyze_with_rules(text)
+
+    def run_combined():
+        for text in texts:
+            combined._analyze_with_rules(text)
+
+    print(f"{args.texts} texts x {args.words} words, best of {args.repeat}")
+    results = {}
+    for name, func in [("legacy", run_legacy), ("automaton", run_separate), ("automaton_combined", run_combined)]:
+        best = min(timeit.repeat(func, number=1, repeat=args.repeat))
+        results[name] = best
+        print(f"{name:>20}: {best * 1000:8.2f} ms total, {best / len(texts) * 1e6:7.2f} us/text")
+
+    print(f"{'speedup (combined)':>20}: {results['legacy'] / results['automaton_combined']:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+"""
+Нагрузочный тест пула соединений с БД.
+
+Для каждой комбинации числа воркеров uvicorn и размера пула запускает сервер
+с соответствующими DB_POOL_SIZE / DB_MAX_OVERFLOW, нагружает эндпоинт
+(по умолчанию /health/db — один SELECT через пул) и печатает пропускную
+способность, задержки и ошибки. Нужна рабочая БД из DATABASE_URL.
+
+Запуск из каталога backend:
+    python -m benchmarks.load_pool --workers 1 2 4 --pool-sizes 5 10 20 \\
+        [--concurrency 100] [--duration 15] [--path /health/db] [--token JWT]
+"""
+import argparse
+import asyncio
+import json
+import os
+import signal
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import httpx
+
+BACKEND_DIR = Path(__file__).parent.parent
+
+
+def percentile(values, q):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    index = min(len(values) - 1, max(0, round(q / 100 * (len(values) - 1))))
+    return values[index]
+
+
+async def wait_ready(base_url: str, timeout: float = 30.0, path: str = "/health"):
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        while time.monotonic() < deadline:
+            try:
+                response = await client.get(path)
+                if response.status_code == 200:
+                    return
+            except httpx.HTTPError:
+                pass
+            await asyncio.sleep(0.2)
+    raise RuntimeError(f"Сервер {base_url} не запустился за {timeout} с")
+
+
+async def run_load(base_url: str, path: str, concurrency: int, duration: float, token: str = None):
+    """Замкнутая нагрузка: concurrency клиентов шлют запросы без пауз duration секунд"""
+    headers = {"Authorization": f"Bearer {token}"} if token else {}
+    latencies = []
+    errors = 0
+    deadline = time.monotonic() + duration
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, headers=headers, limits=limits, timeout=30.0) as client:
+        async def worker():
+            nonlocal errors
+            while time.monotonic() < deadline:
+                started = time.perf_counter()
+                try:
+                    response = await client.get(path)
+                    if response.status_code >= 400:
+                        errors += 1
+                        continue
+                except httpx.HTTPError:
+                    errors += 1
+                    continue
+                latencies.append(time.perf_counter() - started)
+
+        started = time.monotonic()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.monotonic() - started
+
+        pool = None
+        try:
+            pool = (await client.get("/health/pool")).json()
+        except (httpx.HTTPError, ValueError):
+            pass
+
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": len(latencies) / elapsed if elapsed else 0.0,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        # Статистика пула одного (случайного) воркера
+        "pool_wait_avg_ms": pool["wait_avg"] * 1000 if pool else None,
+        "pool_timeouts": pool["timeouts"] if pool else None,
+    }
+
+
+def start_server(workers: int, pool_size: int, max_overflow: int, port: int) -> subprocess.Popen:
+    env = dict(
+        os.environ,
+        DB_POOL_SIZE=str(pool_size),
+        DB_MAX_OVERFLOW=str(max_overflow),
+    )
+    return subprocess.Popen(
+        [
+            sys.executable, "-m", "uvicorn", "main:app",
+            "--host", "127.0.0.1",
+            "--port", str(port),
+            "--workers", str(workers),
+            "--log-level", "warning",
+        ],
+        cwd=BACKEND_DIR,
+        env=env,
+    )
+
+
+def stop_server(process: subprocess.Popen):
+    process.send_signal(signal.SIGINT)
+    try:
+        process.wait(timeout=15)
+    except subprocess.TimeoutExpired:
+        process.kill()
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--pool-sizes", type=int, nargs="+", default=[5, 10, 20])
+    parser.add_argument("--max-overflow", type=int, default=0)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--duration", type=float, default=15.0)
+    parser.add_argument("--path", default="/health/db")
+    parser.add_argument("--token", default=None, help="JWT для защищенных эндпоинтов")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--json", dest="json_path", default=None, help="сохранить результаты в JSON")
+    args = parser.parse_args()
+
+    results = []
+    print(f"{'workers':>7} {'pool':>5} {'rps':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>7} {'wait ms':>8}")
+    for workers in args.workers:
+        for pool_size in args.pool_sizes:
+            process = start_server(workers, pool_size, args.max_overflow, args.port)
+            base_url = f"http://127.0.0.1:{args.port}"
+            try:
+                await wait_ready(base_url)
+                # Прогрев: открытие соединений пула во всех воркерах
+                await run_load(base_url, args.path, args.concurrency, 2.0, args.token)
+                result = await run_load(base_url, args.path, args.concurrency, args.duration, args.token)
+            finally:
+                stop_server(process)
+
+            result.update(workers=workers, pool_size=pool_size, max_overflow=args.max_overflow)
+            results.append(result)
+            wait = "-" if result["pool_wait_avg_ms"] is None else f"{result['pool_wait_avg_ms']:.2f}"
+            print(
+                f"{workers:>7} {pool_size:>5} {result['rps']:>9.1f} {result['p50_ms']:>8.2f} "
+                f"{result['p95_ms']:>8.2f} {result['p99_ms']:>8.2f} {result['errors']:>7} {wait:>8}"
+            )
+
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
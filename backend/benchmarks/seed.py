@@ -0,0 +1,197 @@
+"""
+Наполнение БД обращениями для нагрузочных прогонов (benchmarks.api_bench).
+
+Создает администратора и пользователей с паролем PASSWORD, затем обращения
+пакетами многострочных INSERT: даты за последний год, статусы, категории и
+координаты вокруг центра города распределены как в рабочей базе. Обращения
+сразу помечаются обогащенными, чтобы сервер не ставил их в очередь при старте.
+В конце пересобирается свертка дашборда (appeal_stats_daily).
+Данные детерминированы (--seed); повторный запуск добавляет обращения.
+
+Запуск из каталога backend (БД из DATABASE_URL, на PostgreSQL схема — alembic upgrade head):
+    python -m benchmarks.seed --appeals 100000 [--users 1000] [--batch 5000] [--seed 42]
+"""
+import argparse
+import asyncio
+import random
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import func, insert, select, text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from app.core import geohash
+from app.core.config import settings
+from app.core.database import Base, async_url
+from app.core.security import get_password_hash
+from app.models import *  # noqa: F401,F403 — все таблицы для create_all
+from app.models.appeal import Appeal, AppealCategory, AppealPriority, AppealStatus, EnrichmentStatus
+from app.models.user import User, UserRole
+from app.services.stats_service import stats_service
+
+ADMIN_EMAIL = "bench-admin@example.com"
+USER_EMAIL = "bench-user-{}@example.com"
+PASSWORD = "bench-password"
+
+CENTER = (55.7558, 37.6173)
+DISTRICTS = ["Центральный", "Северный", "Южный", "Западный", "Восточный", "Юго-Западный", "Северо-Западный"]
+
+STATUS_WEIGHTS = {
+    AppealStatus.RESOLVED: 60,
+    AppealStatus.PENDING: 15,
+    AppealStatus.IN_PROGRESS: 15,
+    AppealStatus.REJECTED: 5,
+    AppealStatus.CLOSED: 5,
+}
+CATEGORY_WEIGHTS = {
+    AppealCategory.ROADS: 25,
+    AppealCategory.IMPROVEMENT: 18,
+    AppealCategory.UTILITIES: 15,
+    AppealCategory.LIGHTING: 12,
+    AppealCategory.ECOLOGY: 10,
+    AppealCategory.SAFETY: 8,
+    AppealCategory.SOCIAL: 5,
+    AppealCategory.HEALTHCARE: 3,
+    AppealCategory.OTHER: 4,
+}
+PRIORITY_WEIGHTS = {
+    AppealPriority.MEDIUM: 55,
+    AppealPriority.HIGH: 25,
+    AppealPriority.LOW: 15,
+    AppealPriority.URGENT: 5,
+}
+SENTIMENT_WEIGHTS = {"negative": 70, "neutral": 25, "positive": 5}
+
+TITLES = {
+    AppealCategory.ROADS: ["Яма на дороге", "Разбитый асфальт", "Не работает светофор"],
+    AppealCategory.IMPROVEMENT: ["Сломана скамейка", "Нужна детская площадка", "Не убран двор"],
+    AppealCategory.UTILITIES: ["Нет горячей воды", "Протекает крыша", "Не работает лифт"],
+    AppealCategory.LIGHTING: ["Не горит фонарь", "Темно во дворе"],
+    AppealCategory.ECOLOGY: ["Свалка мусора", "Вырубка деревьев"],
+    AppealCategory.SAFETY: ["Открытый люк", "Аварийное дерево"],
+    AppealCategory.SOCIAL: ["Нет пандуса у подъезда"],
+    AppealCategory.HEALTHCARE: ["Очереди в поликлинике"],
+    AppealCategory.OTHER: ["Другая проблема"],
+}
+FILLER = (
+    "на улице возле дома уже несколько недель жители просят администрацию "
+    "обратить внимание и принять меры по ситуации во дворе и на остановке"
+).split()
+
+
+def _choices(rng: random.Random, weights: dict):
+    return rng.choices(list(weights), weights=list(weights.values()))[0]
+
+
+def make_appeal(rng: random.Random, user_ids: list, now: datetime, days: int) -> dict:
+    """Одно обращение в виде строки для INSERT"""
+    category = _choices(rng, CATEGORY_WEIGHTS)
+    status = _choices(rng, STATUS_WEIGHTS)
+    created_at = now - timedelta(seconds=rng.uniform(0, days * 86400))
+    latitude = CENTER[0] + rng.gauss(0, 0.08)
+    longitude = CENTER[1] + rng.gauss(0, 0.12)
+    title = rng.choice(TITLES[category])
+    description = f"{title.lower()} " + " ".join(rng.choice(FILLER) for _ in range(rng.randint(15, 60)))
+    resolved_at = None
+    if status == AppealStatus.RESOLVED:
+        resolved_at = min(created_at + timedelta(hours=rng.expovariate(1 / 72)), now)
+    return {
+        "title": title,
+        "description": description,
+        "category": category,
+        "status": status,
+        "priority": _choices(rng, PRIORITY_WEIGHTS),
+        "latitude": latitude,
+        "longitude": longitude,
+        "address": f"ул. Тестовая, {rng.randint(1, 200)}",
+        "district": rng.choice(DISTRICTS),
+        "geohash": geohash.encode(latitude, longitude, settings.GEOHASH_PRECISION),
+        "images": [],
+        "ai_summary": title,
+        "ai_sentiment": _choices(rng, SENTIMENT_WEIGHTS),
+        "ai_confidence": round(rng.uniform(0.5, 1.0), 2),
+        "is_duplicate": False,
+        "enrichment_status": EnrichmentStatus.COMPLETED,
+        "enriched_at": created_at,
+        "user_id": rng.choice(user_ids),
+        "created_at": created_at,
+        "resolved_at": resolved_at,
+    }
+
+
+async def seed_users(db: AsyncSession, count: int) -> list:
+    """Администратор и пользователи (существующие не пересоздаются); id пользователей"""
+    hashed = get_password_hash(PASSWORD)
+    emails = [ADMIN_EMAIL] + [USER_EMAIL.format(i) for i in range(count)]
+    existing = set((await db.execute(select(User.email).where(User.email.in_(emails)))).scalars())
+    rows = [
+        {
+            "email": email,
+            "full_name": "Администратор" if email == ADMIN_EMAIL else f"Пользователь {i}",
+            "hashed_password": hashed,
+            "role": UserRole.ADMIN if email == ADMIN_EMAIL else UserRole.CITIZEN,
+            "is_admin": email == ADMIN_EMAIL,
+            "is_active": True,
+            "is_verified": True,
+        }
+        for i, email in enumerate(emails)
+        if email not in existing
+    ]
+    if rows:
+        await db.execute(insert(User), rows)
+        await db.commit()
+    result = await db.execute(select(User.id).where(User.email.in_(emails[1:])))
+    return list(result.scalars())
+
+
+async def seed(appeals: int, users: int, batch: int, days: int, seed_value: int):
+    url = async_url(settings.DATABASE_URL)
+    engine = create_async_engine(url)
+    if url.startswith("sqlite"):
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+    sessions = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    rng = random.Random(seed_value)
+    now = datetime.now(timezone.utc)
+
+    try:
+        async with sessions() as db:
+            user_ids = await seed_users(db, users)
+            before = (await db.execute(select(func.count(Appeal.id)))).scalar()
+
+            started = time.monotonic()
+            inserted = 0
+            while inserted < appeals:
+                rows = [make_appeal(rng, user_ids, now, days) for _ in range(min(batch, appeals - inserted))]
+                await db.execute(insert(Appeal), rows)
+                await db.commit()
+                inserted += len(rows)
+                elapsed = time.monotonic() - started
+                print(f"\r{inserted}/{appeals} appeals, {inserted / elapsed:.0f} rows/s", end="", flush=True)
+            print()
+
+            buckets = await stats_service.rebuild(db)
+            if engine.dialect.name == "postgresql":
+                await db.execute(text("ANALYZE appeals"))
+                await db.commit()
+            print(f"{before + inserted} appeals total, {buckets} dashboard buckets")
+    finally:
+        await engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--appeals", type=int, default=10000)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--batch", type=int, default=5000)
+    parser.add_argument("--days", type=int, default=365, help="период дат создания обращений")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    asyncio.run(seed(args.appeals, args.users, args.batch, args.days, args.seed))
+
+
+if __name__ == "__main__":
+    main()
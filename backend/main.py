@@ -1,25 +1,60 @@
-from fastapi import FastAPI
+import secrets
+from fastapi import FastAPI, HTTPException, Request, status
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
+from fastapi.responses import PlainTextResponse
 from contextlib import asynccontextmanager
 
 from app.core.config import settings
-from app.core.database import engine, Base
+from sqlalchemy import text
+from app.core.database import engine, Base, AsyncSessionLocal, pool_stats
+from app.core.metrics import MetricsMiddleware, registry
+from app.core.profiling import ProfilingMiddleware, profiler
+from app.core.jobs import job_runner
 from app.api.v1 import api_router
 from app.models import *  # Импорт всех моделей
+from app.core.redis import close_redis
+from app.core.replicas import replica_router
+from app.ai.llm import init_llm_client, close_llm_client
+from app.services.enrichment_service import enrichment_service
+from app.services.image_service import image_service
+from app.services.event_sink import event_sink
+from app.services.geolocation_service import get_district_resolver
+from app.services.similarity_service import similarity_service
+from app.services.stats_service import stats_service
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
-    try:
-        async with engine.begin() as conn:
-            await conn.run_sync(Base.metadata.create_all)
-    except Exception as e:
-        print(f"Database connection error: {e}")
+    # В production схема создается миграциями (alembic upgrade head)
+    if settings.ENVIRONMENT != "production":
+        try:
+            async with engine.begin() as conn:
+                await conn.run_sync(Base.metadata.create_all)
+        except Exception as e:
+            print(f"Database connection error: {e}")
+    init_llm_client()
+    await replica_router.start()
+    await event_sink.start()
+    await stats_service.start()
+    get_district_resolver()  # границы районов загружаются до первых запросов
+    await similarity_service.start()
+    await enrichment_service.start()
+    image_service.start()
+    if settings.PROFILING_ENABLED:
+        profiler.enable()
     yield
     # Shutdown
-    pass
+    profiler.disable()
+    await job_runner.stop()  # прерванный импорт продолжается через /imports/{id}/resume
+    await image_service.stop()
+    await enrichment_service.stop()
+    await event_sink.stop()  # оставшиеся события записываются до закрытия пула соединений
+    await similarity_service.stop()
+    await replica_router.stop()
+    await close_llm_client()
+    await close_redis()
 
 
 app = FastAPI(
@@ -47,6 +82,13 @@ if settings.ENVIRONMENT == "production":
         allowed_hosts=settings.ALLOWED_HOSTS
     )
 
+# Метрики запросов по шаблонам маршрутов
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
+# Профилирование медленных запросов (проверка флага, пока выключено)
+app.add_middleware(ProfilingMiddleware)
+
 # API Router
 app.include_router(api_router, prefix="/api/v1")
 
@@ -64,3 +106,40 @@ async def root():
 async def health_check():
     return {"status": "healthy"}
 
+
+@app.get("/health/db")
+async def health_db():
+    """Проверка соединения с БД (через пул)"""
+    async with AsyncSessionLocal() as db:
+        await db.execute(text("SELECT 1"))
+    return {"status": "healthy"}
+
+
+@app.get("/health/pool")
+async def health_pool():
+    """Состояние пула соединений с БД"""
+    return pool_stats.snapshot()
+
+
+@app.get("/health/replicas")
+async def health_replicas():
+    """Отставание и доступность реплик для чтения"""
+    return replica_router.status()
+
+
+
+if settings.METRICS_ENABLED:
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics(request: Request):
+        """Метрики процесса в текстовом формате Prometheus"""
+        if settings.METRICS_TOKEN:
+            expected = f"Bearer {settings.METRICS_TOKEN}"
+            if not secrets.compare_digest(request.headers.get("authorization", ""), expected):
+                raise HTTPException(
+                    status_code=status.HTTP_401_UNAUTHORIZED,
+                    detail="Invalid metrics token"
+                )
+        return PlainTextResponse(
+            registry.render(),
+            media_type="text/plain; version=0.0.4"
+        )
@@ -0,0 +1,62 @@
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import select, update, bindparam
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from app.core.config import settings
+from app.models import *  # Импорт всех моделей
+from app.models.appeal import Appeal
+from app.services.appeal_service import encode_geohash
+
+BATCH_SIZE = 1000
+
+
+async def backfill_geohash():
+    """Заполнение geohash для обращений с координатами (после миграции 0003 в режиме --sql)"""
+    engine = create_async_engine(
+        settings.DATABASE_URL.replace("postgresql://", "postgresql+asyncpg://"),
+        echo=False
+    )
+    
+    async_session = async_sessionmaker(engine, expire_on_commit=False)
+    
+    last_id = 0
+    total = 0
+    async with async_session() as session:
+        while True:
+            result = await session.execute(
+                select(Appeal.id, Appeal.latitude, Appeal.longitude)
+                .where(
+                    Appeal.id > last_id,
+                    Appeal.geohash.is_(None),
+                    Appeal.latitude.is_not(None),
+                    Appeal.longitude.is_not(None)
+                )
+                .order_by(Appeal.id)
+                .limit(BATCH_SIZE)
+            )
+            rows = result.all()
+            if not rows:
+                break
+            
+            await session.execute(
+                update(Appeal.__table__).where(Appeal.__table__.c.id == bindparam("appeal_id")),
+                [
+                    {"appeal_id": row.id, "geohash": encode_geohash(row.latitude, row.longitude)}
+                    for row in rows
+                ]
+            )
+            await session.commit()
+            last_id = rows[-1].id
+            total += len(rows)
+            print(f"Заполнено обращений: {total}")
+    
+    await engine.dispose()
+    print("geohash заполнен!")
+
+
+if __name__ == "__main__":
+    asyncio.run(backfill_geohash())
@@ -0,0 +1,55 @@
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from app.ai import minhash
+from app.core.config import settings
+from app.models import *  # Импорт всех моделей
+from app.models.appeal import Appeal
+from app.services.duplicate_service import DuplicateService
+
+BATCH_SIZE = 1000
+
+
+async def build_duplicate_index():
+    """Построение MinHash-сигнатур и LSH-корзин для обращений без сигнатуры"""
+    engine = create_async_engine(
+        settings.DATABASE_URL.replace("postgresql://", "postgresql+asyncpg://"),
+        echo=False
+    )
+    
+    async_session = async_sessionmaker(engine, expire_on_commit=False)
+    duplicates = DuplicateService()
+    
+    last_id = 0
+    total = 0
+    async with async_session() as session:
+        while True:
+            result = await session.execute(
+                select(Appeal)
+                .where(Appeal.id > last_id, Appeal.minhash_signature.is_(None))
+                .order_by(Appeal.id)
+                .limit(BATCH_SIZE)
+            )
+            appeals = list(result.scalars().all())
+            if not appeals:
+                break
+            
+            for appeal in appeals:
+                signature = minhash.signature(f"{appeal.title}\n{appeal.description}")
+                await duplicates.index_appeal(session, appeal, signature)
+            
+            await session.commit()
+            last_id = appeals[-1].id
+            total += len(appeals)
+            print(f"Проиндексировано обращений: {total}")
+    
+    print("Индекс дубликатов построен!")
+
+
+if __name__ == "__main__":
+    asyncio.run(build_duplicate_index())
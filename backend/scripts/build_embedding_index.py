@@ -0,0 +1,72 @@
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from app.ai.embeddings import embedding_engine
+from app.core.config import settings
+from app.models import *  # Импорт всех моделей
+from app.models.appeal import Appeal
+from app.models.embedding import AppealEmbedding
+from app.services.similarity_service import similarity_service
+
+BATCH_SIZE = 256
+
+
+async def build_embedding_index():
+    """Вычисление эмбеддингов для обращений без них и сохранение индекса на диск"""
+    if not embedding_engine.available:
+        print("Эмбеддинги отключены: нужны EMBEDDINGS_ENABLED=true, torch и transformers")
+        return
+    
+    engine = create_async_engine(
+        settings.DATABASE_URL.replace("postgresql://", "postgresql+asyncpg://"),
+        echo=False
+    )
+    
+    async_session = async_sessionmaker(engine, expire_on_commit=False)
+    
+    last_id = 0
+    total = 0
+    async with async_session() as session:
+        while True:
+            embedded = select(AppealEmbedding.appeal_id).where(
+                AppealEmbedding.model == settings.EMBEDDING_MODEL
+            )
+            result = await session.execute(
+                select(Appeal.id, Appeal.title, Appeal.description)
+                .where(Appeal.id > last_id, Appeal.id.not_in(embedded))
+                .order_by(Appeal.id)
+                .limit(BATCH_SIZE)
+            )
+            rows = result.all()
+            if not rows:
+                break
+            
+            vectors = await embedding_engine.encode_async(
+                [f"{row.title}\n{row.description}" for row in rows]
+            )
+            for row, vector in zip(rows, vectors):
+                session.add(AppealEmbedding(
+                    appeal_id=row.id,
+                    model=settings.EMBEDDING_MODEL,
+                    vector=vector.astype(np.float32).tobytes()
+                ))
+            
+            await session.commit()
+            last_id = rows[-1].id
+            total += len(rows)
+            print(f"Обработано обращений: {total}")
+        
+        await similarity_service.sync(session)
+    
+    await similarity_service.stop()
+    print(f"Индекс сохранен: {similarity_service.index_path}")
+
+
+if __name__ == "__main__":
+    asyncio.run(build_embedding_index())
@@ -0,0 +1,105 @@
+"""
+Массовый импорт обращений из CSV или JSONL без HTTP-загрузки файла.
+
+Колонки (поля JSON): title, description — обязательные; category, priority,
+status, latitude, longitude, address, district, created_at, resolved_at.
+Прогресс сохраняется после каждого пакета: после сбоя или Ctrl+C импорт
+продолжается с первой незаписанной строки (--resume ID).
+После импорта индекс дубликатов: python scripts/build_duplicate_index.py
+
+Запуск из каталога backend:
+    python scripts/import_appeals.py appeals.csv [--classify llm] [--geocode full]
+    python scripts/import_appeals.py --resume 12
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import select
+from app.core.database import AsyncSessionLocal
+from app.models import *  # Импорт всех моделей
+from app.models.user import User
+from app.ai.llm import init_llm_client, close_llm_client
+from app.services.import_service import import_service, detect_format
+
+
+def print_progress(started: float):
+    def report(progress: dict):
+        elapsed = time.monotonic() - started
+        percent = progress["bytes_done"] * 100 / progress["bytes_total"] if progress["bytes_total"] else 100
+        print(
+            f"\r{percent:5.1f}%  строк: {progress['rows_done']}, "
+            f"добавлено: {progress['inserted']}, ошибок: {progress['failed']}, "
+            f"{progress['rows_done'] / elapsed:.0f} строк/с",
+            end="",
+            flush=True
+        )
+    return report
+
+
+async def import_appeals(args):
+    """Создание (или продолжение) задачи импорта и ее выполнение"""
+    async with AsyncSessionLocal() as session:
+        if args.resume:
+            job = await import_service.get_job(session, args.resume)
+            if job is None:
+                sys.exit(f"Задача импорта {args.resume} не найдена")
+        else:
+            fmt = args.format or detect_format(args.path)
+            if fmt is None:
+                sys.exit("Неизвестный формат файла, укажите --format csv или --format jsonl")
+            result = await session.execute(select(User.id).where(User.email == args.user_email))
+            user_id = result.scalar_one_or_none()
+            if user_id is None:
+                sys.exit(f"Пользователь {args.user_email} не найден")
+            job = await import_service.create_job(
+                session,
+                os.path.abspath(args.path),
+                user_id=user_id,
+                fmt=fmt,
+                classify=args.classify,
+                geocode=args.geocode,
+                encoding=args.encoding,
+                batch_size=args.batch
+            )
+            print(f"Задача импорта {job.id}")
+
+    if job.options["classify"] == "llm":
+        init_llm_client()
+    try:
+        job = await import_service.run(job.id, progress=print_progress(time.monotonic()))
+    finally:
+        print()
+        await close_llm_client()
+
+    print(f"Статус: {job.status.value}, добавлено: {job.inserted}, ошибок: {job.failed}")
+    for error in job.errors[:20]:
+        print(f"  строка {error['line']}: {error['error']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("path", nargs="?", help="файл CSV или JSONL")
+    parser.add_argument("--format", choices=["csv", "jsonl"], help="по умолчанию — по расширению файла")
+    parser.add_argument("--classify", choices=["rules", "llm"], default="rules")
+    parser.add_argument("--geocode", choices=["offline", "full"], default="offline")
+    parser.add_argument("--encoding", default="utf-8")
+    parser.add_argument("--batch", type=int, help="строк в пакете (по умолчанию IMPORT_BATCH_SIZE)")
+    parser.add_argument("--user-email", default="admin@glas.ru", help="автор импортированных обращений")
+    parser.add_argument("--resume", type=int, metavar="JOB_ID", help="продолжить прерванную задачу")
+    args = parser.parse_args()
+    if not args.path and not args.resume:
+        parser.error("укажите файл или --resume JOB_ID")
+    try:
+        asyncio.run(import_appeals(args))
+    except ValueError as e:
+        sys.exit(str(e))
+
+
+if __name__ == "__main__":
+    main()
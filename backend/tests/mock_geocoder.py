@@ -0,0 +1,47 @@
+"""
+Mock-сервер Nominatim (reverse и search) для нагрузочных прогонов.
+
+Запуск отдельным процессом:
+    uvicorn tests.mock_geocoder:app --port 8101
+    GEOCODER_DOMAIN=localhost:8101 GEOCODER_SCHEME=http GEOCODER_MIN_INTERVAL=0 uvicorn main:app
+"""
+import asyncio
+import os
+from fastapi import FastAPI
+
+app = FastAPI(title="Mock Nominatim")
+
+# Искусственная задержка ответа, секунды
+LATENCY = float(os.environ.get("MOCK_GEOCODER_LATENCY", "0"))
+
+DISTRICTS = ["Центральный", "Северный", "Южный", "Западный", "Восточный"]
+
+calls = {"count": 0}
+
+
+@app.get("/reverse")
+async def reverse(lat: float, lon: float):
+    calls["count"] += 1
+    if LATENCY:
+        await asyncio.sleep(LATENCY)
+    district = DISTRICTS[int(abs(lat * 100) + abs(lon * 100)) % len(DISTRICTS)]
+    return {
+        "lat": str(lat),
+        "lon": str(lon),
+        "display_name": f"ул. Тестовая, {int(abs(lon * 1000)) % 200 + 1}, {district} район",
+        "address": {
+            "road": "ул. Тестовая",
+            "house_number": str(int(abs(lon * 1000)) % 200 + 1),
+            "suburb": district,
+            "city": "Москва",
+            "country": "Россия",
+        },
+    }
+
+
+@app.get("/search")
+async def search(q: str):
+    calls["count"] += 1
+    if LATENCY:
+        await asyncio.sleep(LATENCY)
+    return [{"lat": "55.7558", "lon": "37.6173", "display_name": q}]
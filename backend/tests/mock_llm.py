@@ -0,0 +1,70 @@
+"""
+Mock-сервер OpenAI Chat Completions API для тестов и нагрузочных прогонов.
+
+Запуск отдельным процессом:
+    uvicorn tests.mock_llm:app --port 8100
+    OPENAI_API_KEY=test OPENAI_BASE_URL=http://localhost:8100/v1 uvicorn main:app
+"""
+import asyncio
+import json
+import os
+import time
+from fastapi import FastAPI, Request
+
+app = FastAPI(title="Mock LLM")
+
+# Искусственная задержка ответа, секунды
+LATENCY = float(os.environ.get("MOCK_LLM_LATENCY", "0"))
+
+_RULES = [
+    ("яма", "roads"),
+    ("дорог", "roads"),
+    ("фонар", "lighting"),
+    ("мусор", "ecology"),
+    ("вода", "utilities"),
+]
+
+calls = {"count": 0}
+
+
+def _answer(prompt: str) -> dict:
+    text = prompt.lower()
+    category = next((cat for word, cat in _RULES if word in text), "other")
+    priority = "urgent" if "срочно" in text else "medium"
+    sentiment = "positive" if "спасибо" in text else "negative"
+    return {
+        "category": category,
+        "priority": priority,
+        "summary": "Тестовое резюме",
+        "confidence": 0.9,
+        "sentiment": sentiment,
+        "sentiment_confidence": 0.8,
+    }
+
+
+@app.post("/v1/chat/completions")
+async def chat_completions(request: Request):
+    body = await request.json()
+    calls["count"] += 1
+    if LATENCY:
+        await asyncio.sleep(LATENCY)
+
+    prompt = body["messages"][-1]["content"]
+    # Текст обращения идет после метки "Обращение:" в промпте
+    text = prompt.split("Обращение:", 1)[-1].split("Ответь в формате JSON", 1)[0]
+    content = json.dumps(_answer(text), ensure_ascii=False)
+
+    return {
+        "id": f"chatcmpl-mock-{calls['count']}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": body.get("model", "mock"),
+        "choices": [
+            {
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop",
+            }
+        ],
+        "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+    }
@@ -0,0 +1,59 @@
+import asyncio
+import pytest
+from app.core.background import WorkerPool
+
+
+@pytest.mark.asyncio
+async def test_worker_pool_processes_tasks():
+    processed = []
+
+    async def handler(item):
+        await asyncio.sleep(0)
+        processed.append(item)
+
+    pool = WorkerPool("test", handler, workers=2, queue_size=10)
+    pool.start()
+    for i in range(5):
+        assert pool.submit(i)
+    await pool.stop()
+
+    assert sorted(processed) == [0, 1, 2, 3, 4]
+    assert not pool.running
+
+
+@pytest.mark.asyncio
+async def test_worker_pool_rejects_when_full_or_stopped():
+    release = asyncio.Event()
+
+    async def handler(item):
+        await release.wait()
+
+    pool = WorkerPool("test", handler, workers=1, queue_size=1)
+    assert not pool.submit(1)  # еще не запущен
+
+    pool.start()
+    assert pool.submit(1)
+    await asyncio.sleep(0)  # воркер забирает первую задачу
+    assert pool.submit(2)
+    assert not pool.submit(3)
+
+    release.set()
+    await pool.stop()
+
+
+@pytest.mark.asyncio
+async def test_worker_pool_survives_failing_task():
+    processed = []
+
+    async def handler(item):
+        if item == "bad":
+            raise RuntimeError("boom")
+        processed.append(item)
+
+    pool = WorkerPool("test", handler, workers=1, queue_size=10)
+    pool.start()
+    pool.submit("bad")
+    pool.submit("good")
+    await pool.stop()
+
+    assert processed == ["good"]
@@ -0,0 +1,118 @@
+import asyncio
+import httpx
+import pytest
+from app.ai import llm
+from app.ai.cache import AIResultCache, normalize_text
+from app.ai.combined import CombinedAnalyzer, analysis_cache
+from app.core.cache import TTLCache, SWRCache
+from app.core.config import settings
+from tests import mock_llm
+
+
+def test_ttl_cache_evicts_least_recently_used():
+    cache = TTLCache(max_size=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+
+
+def test_ttl_cache_expires_entries(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("app.core.cache.time.monotonic", lambda: now[0])
+    cache = TTLCache(max_size=10, ttl=5)
+    cache.set("a", 1)
+
+    now[0] += 4
+    assert cache.get("a") == 1
+    now[0] += 2
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_key_depends_on_normalized_text_model_and_prompt(monkeypatch):
+    cache = AIResultCache("test", prompt_version=1)
+
+    assert normalize_text("  Яма  на\nдороге ") == "яма на дороге"
+    assert cache.make_key("Яма на дороге") == cache.make_key("яма   НА дороге")
+
+    key = cache.make_key("яма на дороге")
+    monkeypatch.setattr(settings, "AI_MODEL", "gpt-4o-mini")
+    assert cache.make_key("яма на дороге") != key
+    assert AIResultCache("test", prompt_version=2).make_key("яма на дороге") != cache.make_key("яма на дороге")
+
+
+async def test_repeated_analysis_hits_cache(monkeypatch):
+    monkeypatch.setattr(settings, "OPENAI_API_KEY", "test-key")
+    monkeypatch.setattr(settings, "OPENAI_BASE_URL", "http://mock-llm/v1")
+    await llm.close_llm_client()
+    llm.init_llm_client(
+        http_client=httpx.AsyncClient(app=mock_llm.app, base_url="http://mock-llm")
+    )
+    await analysis_cache.invalidate()
+    mock_llm.calls["count"] = 0
+    misses = analysis_cache.misses
+
+    analyzer = CombinedAnalyzer()
+    first = await analyzer.analyze_appeal("Яма на дороге", "Большая яма у дома")
+    second = await analyzer.analyze_appeal("яма на дороге", "Большая  яма у дома")
+
+    assert first == second
+    assert mock_llm.calls["count"] == 1
+    assert analysis_cache.misses == misses + 1
+    assert analysis_cache.hits >= 1
+
+    assert await analysis_cache.invalidate() == 1
+    await analyzer.analyze_appeal("Яма на дороге", "Большая яма у дома")
+    assert mock_llm.calls["count"] == 2
+
+    await llm.close_llm_client()
+
+
+async def test_swr_cache_single_flight_and_stale_after_bump():
+    calls = []
+
+    async def loader(key):
+        calls.append(key)
+        await asyncio.sleep(0.01)
+        return {"key": key, "n": len(calls)}
+
+    cache = SWRCache("test", loader, ttl=60, stale_ttl=60)
+    first, second = await asyncio.gather(cache.get(30), cache.get(30))
+    assert first is second
+    assert calls == [30]
+
+    await cache.bump()
+    stale = await cache.get(30)
+    assert stale is first  # устаревший ответ отдается, пока идет пересчет
+    await asyncio.sleep(0.05)
+
+    fresh = await cache.get(30)
+    assert fresh.value["n"] == 2
+    assert fresh.etag != first.etag
+    assert calls == [30, 30]
+
+
+
+async def test_swr_cache_partition_bump_marks_only_its_entries_stale():
+    calls = []
+
+    async def loader(key):
+        calls.append(key)
+        return {"key": key}
+
+    cache = SWRCache("test", loader, ttl=60, stale_ttl=60, partition=lambda key: key[0])
+    await cache.get(("a", 1))
+    await cache.get(("a", 2))
+    await cache.get(("b", 1))
+
+    await cache.bump(["a"])
+    for key in [("a", 1), ("a", 2), ("b", 1)]:
+        await cache.get(key)
+    await asyncio.sleep(0.01)
+
+    assert sorted(calls) == [("a", 1), ("a", 1), ("a", 2), ("a", 2), ("b", 1)]
@@ -0,0 +1,94 @@
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from app.core.database import Base
+from app.models import *  # noqa: F401,F403 — все таблицы для create_all
+from app.models.appeal import Appeal, AppealCategory, AppealStatus
+from app.services import cluster_service as clusters
+from app.services.appeal_service import encode_geohash
+
+
+def test_tile_bounds_contain_point():
+    lat, lon = 55.7558, 37.6173
+    for zoom in (0, 5, 12, 18):
+        (x, y), = clusters.tiles_for_bbox((lat, lon, lat, lon), zoom)
+        min_lat, min_lon, max_lat, max_lon = clusters.tile_bounds(zoom, x, y)
+        assert min_lat <= lat < max_lat
+        assert min_lon <= lon < max_lon
+
+
+def test_cluster_precision_grows_with_zoom_and_is_capped():
+    precisions = [clusters.cluster_precision(zoom) for zoom in range(0, 21)]
+    assert precisions == sorted(precisions)
+    assert precisions[0] == 2
+    assert precisions[-1] == 9
+
+
+async def test_too_many_tiles_rejected():
+    with pytest.raises(ValueError):
+        await clusters.cluster_service.get_clusters((55.0, 37.0, 56.0, 38.0), 14)
+
+
+async def test_tile_groups_appeals_by_cell():
+    engine = create_async_engine("sqlite+aiosqlite://")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    points = [
+        (55.75580, 37.61730, AppealStatus.PENDING),
+        (55.75581, 37.61731, AppealStatus.PENDING),
+        (55.75582, 37.61732, AppealStatus.RESOLVED),
+        (55.70000, 37.80000, AppealStatus.PENDING),
+    ]
+    try:
+        await _check_tile(engine, points)
+    finally:
+        await engine.dispose()
+
+
+async def _check_tile(engine, points):
+    async with AsyncSession(engine, expire_on_commit=False) as db:
+        for lat, lon, status in points:
+            db.add(Appeal(
+                title="Обращение",
+                description="Описание обращения",
+                category=AppealCategory.ROADS,
+                status=status,
+                latitude=lat,
+                longitude=lon,
+                geohash=encode_geohash(lat, lon),
+                user_id=1
+            ))
+        await db.commit()
+
+        zoom = 10
+        (x, y), = clusters.tiles_for_bbox((55.7558, 37.6173, 55.7558, 37.6173), zoom)
+        tile = await clusters.cluster_service.get_tile(db, zoom, x, y)
+        assert sorted(cluster["count"] for cluster in tile) == [1, 3]
+        single = next(cluster for cluster in tile if cluster["count"] == 1)
+        assert single["appeal_id"] == 4
+
+        tile = await clusters.cluster_service.get_tile(db, zoom, x, y, status="resolved")
+        assert [cluster["count"] for cluster in tile] == [1]
+
+
+def test_point_partitions_match_tiles_of_every_zoom():
+    lat, lon = 55.7558, 37.6173
+    partitions = clusters.point_partitions(lat, lon)
+
+    assert len(partitions) == clusters.MAX_ZOOM + 1
+    for zoom in (0, 10, 20):
+        (x, y), = clusters.tiles_for_bbox((lat, lon, lat, lon), zoom)
+        assert clusters.tile_partition(zoom, x, y) in partitions
+
+
+def test_border_cell_is_merged_across_tiles():
+    merged = clusters.merge_clusters([
+        {"geohash": "ucfv0", "count": 1, "latitude": 55.0, "longitude": 37.0, "appeal_id": 7},
+        {"geohash": "ucfv1", "count": 2, "latitude": 55.1, "longitude": 37.1, "appeal_id": None},
+        {"geohash": "ucfv0", "count": 3, "latitude": 55.4, "longitude": 37.4, "appeal_id": None},
+    ])
+
+    cell = next(cluster for cluster in merged if cluster["geohash"] == "ucfv0")
+    assert len(merged) == 2
+    assert cell["count"] == 4 and cell["appeal_id"] is None
+    assert cell["latitude"] == pytest.approx(55.3)
+    assert cell["longitude"] == pytest.approx(37.3)
@@ -0,0 +1,133 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+import pytest
+from sqlalchemy import insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from app.core.background import WorkerPool
+from app.core.config import settings
+from app.core.database import Base
+from app.models import *  # noqa: F401,F403 — все таблицы для create_all
+from app.models.appeal import Appeal, AppealCategory, AppealPriority, EnrichmentStatus
+from app.services import enrichment_service as enrichment_module
+from app.services.enrichment_service import EnrichmentService
+
+
+@pytest.fixture
+async def sessions(monkeypatch, tmp_path):
+    # Файл, а не :memory: — у каждой сессии свое соединение, как с настоящей БД
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'enrichment.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with factory() as db:
+        await db.execute(insert(Appeal), [
+            {
+                "title": f"Обращение {i}",
+                "description": "Яма на проезжей части",
+                "category": AppealCategory.ROADS,
+                "user_id": 1,
+                "enrichment_status": EnrichmentStatus.COMPLETED if i == 3 else EnrichmentStatus.PENDING,
+                "images": []
+            }
+            for i in range(1, 4)
+        ])
+        await db.commit()
+    monkeypatch.setattr(enrichment_module, "AsyncSessionLocal", factory)
+    yield factory
+    await engine.dispose()
+
+
+async def test_waiter_is_removed_on_timeout(sessions):
+    service = EnrichmentService()
+    assert not await service.wait_for(1, timeout=0.01)
+    assert service._waiters == {}
+
+
+async def test_wait_sees_enrichment_finished_by_another_process(sessions, monkeypatch):
+    monkeypatch.setattr(settings, "ENRICHMENT_POLL_INTERVAL", 0.01)
+    service = EnrichmentService()
+
+    async def finish_elsewhere():
+        await asyncio.sleep(0.05)
+        async with sessions() as db:
+            await db.execute(update(Appeal).where(Appeal.id == 1).values(enrichment_status=EnrichmentStatus.COMPLETED))
+            await db.commit()
+
+    task = asyncio.create_task(finish_elsewhere())
+    started = asyncio.get_running_loop().time()
+    assert await service.wait_for(1, timeout=30)
+    assert asyncio.get_running_loop().time() - started < 10  # не ждали весь таймаут
+    await task
+
+
+async def test_claim_is_taken_once_until_it_expires(sessions):
+    service = EnrichmentService()
+    async with sessions() as db:
+        assert await service._claim(db, 1)
+        assert not await service._claim(db, 1)  # уже в обработке
+        assert not await service._claim(db, 3)  # уже обогащено
+
+        await db.execute(
+            update(Appeal)
+            .where(Appeal.id == 1)
+            .values(enrichment_claimed_at=datetime.now(timezone.utc) - timedelta(seconds=settings.ENRICHMENT_CLAIM_TTL + 1))
+        )
+        await db.commit()
+        assert await service._claim(db, 1)  # воркер, взявший обращение, упал
+
+
+async def test_sweep_requeues_unclaimed_pending_appeals_once(sessions):
+    service = EnrichmentService()
+    release = asyncio.Event()
+    processed = []
+
+    async def handler(item):
+        await release.wait()
+        processed.append(item)
+
+    service.pool = WorkerPool("test", handler, workers=1, queue_size=10)
+    service.pool.start()
+    async with sessions() as db:
+        assert await service._claim(db, 2)  # обрабатывается другим процессом
+
+    assert await service.sweep_pending() == 1
+    assert await service.sweep_pending() == 0  # уже в очереди этого процесса
+    release.set()
+    await service.pool.stop()
+    assert processed == [(1, False)]
+
+
+class StubAnalyzer:
+    async def analyze_appeal(self, title, description):
+        return {
+            "category": AppealCategory.LIGHTING,
+            "priority": AppealPriority.HIGH,
+            "summary": title,
+            "confidence": 0.9,
+            "sentiment": "negative"
+        }
+
+
+class NoEmbeddings:
+    available = False
+
+
+async def test_swept_appeal_gets_ai_category_unless_author_chose_it(sessions):
+    service = EnrichmentService()
+    service.combined = StubAnalyzer()
+    service.similarity = NoEmbeddings()
+    async with sessions() as db:
+        await db.execute(update(Appeal).where(Appeal.id == 2).values(category_from_user=True))
+        await db.commit()
+
+    service.pool = WorkerPool("test", service._process, workers=1, queue_size=10)
+    service.pool.start()
+    assert await service.sweep_pending() == 2
+    await service.pool.stop()
+
+    async with sessions() as db:
+        result = await db.execute(select(Appeal.id, Appeal.category, Appeal.enrichment_status).where(Appeal.id < 3))
+        assert sorted(result.all()) == [
+            (1, AppealCategory.LIGHTING, EnrichmentStatus.COMPLETED),  # категория по правилам заменена AI
+            (2, AppealCategory.ROADS, EnrichmentStatus.COMPLETED),
+        ]
@@ -0,0 +1,100 @@
+import asyncio
+import os
+import pytest
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from app.core.database import Base
+from app.models import *  # noqa: F401,F403 — все таблицы для create_all
+from app.models.analytics import AnalyticsEvent
+from app.services import event_sink as sink_module
+from app.services.event_sink import AnalyticsEventSink
+
+
+@pytest.fixture
+async def sessions(monkeypatch, tmp_path_factory):
+    # Файл, а не :memory: — у каждой сессии свое соединение, как с настоящей БД
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path_factory.mktemp('db') / 'events.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    monkeypatch.setattr(sink_module, "AsyncSessionLocal", factory)
+    yield factory
+    await engine.dispose()
+
+
+async def count_events(sessions) -> int:
+    async with sessions() as db:
+        return (await db.execute(select(func.count(AnalyticsEvent.id)))).scalar()
+
+
+async def test_events_are_written_in_batches_and_on_stop(sessions, tmp_path):
+    sink = AnalyticsEventSink(max_size=100, batch_size=10, flush_interval=60, spill_path=str(tmp_path / "s.jsonl"))
+    await sink.start()
+    for i in range(25):
+        sink.emit("appeal_created", user_id=1, appeal_id=i, metadata={"n": i})
+    await asyncio.sleep(0.1)  # два полных пакета по размеру, остаток ждет таймера
+    assert await count_events(sessions) == 20
+
+    await sink.stop()
+    assert await count_events(sessions) == 25
+    async with sessions() as db:
+        event = (await db.execute(select(AnalyticsEvent).where(AnalyticsEvent.appeal_id == 3))).scalar_one()
+    assert event.event_metadata == {"n": 3}
+    assert event.created_at is not None
+
+
+async def test_overflow_drops_new_events(sessions, tmp_path):
+    sink = AnalyticsEventSink(max_size=5, batch_size=100, overflow="drop", spill_path=str(tmp_path / "s.jsonl"))
+    for i in range(8):
+        sink.emit("appeal_updated", appeal_id=i)
+    assert sink.stats()["buffered"] == 5
+    assert sink.dropped == 3
+
+
+async def test_overflow_spills_to_file_and_replays(sessions, tmp_path):
+    spill_path = str(tmp_path / "spill.jsonl")
+    sink = AnalyticsEventSink(max_size=5, batch_size=100, overflow="spill", spill_path=spill_path)
+    for i in range(8):
+        sink.emit("appeal_updated", appeal_id=i)
+    await asyncio.sleep(0.1)
+    assert (sink.spilled, sink.stats()["buffered"], sink.dropped) == (5, 3, 0)
+
+    restarted = AnalyticsEventSink(max_size=5, batch_size=100, overflow="spill", spill_path=spill_path)
+    await restarted.start()
+    await restarted.stop()
+    await sink.stop()
+    assert await count_events(sessions) == 8
+
+
+async def test_spilled_events_are_replayed_while_running(sessions, tmp_path):
+    spill_path = str(tmp_path / "spill.jsonl")
+    sink = AnalyticsEventSink(max_size=5, batch_size=100, flush_interval=0.05, overflow="spill", spill_path=spill_path)
+    await sink.start()
+    for i in range(8):
+        sink.emit("appeal_updated", appeal_id=i)
+
+    for _ in range(100):
+        await asyncio.sleep(0.05)
+        if await count_events(sessions) == 8:
+            break
+    assert (await count_events(sessions), sink.spilled) == (8, 5)  # без stop()/start()
+    assert not os.path.exists(sink._spill_file(os.getpid()))
+    await sink.stop()
+
+async def test_replay_takes_only_files_of_finished_processes(sessions, tmp_path):
+    spill_path = str(tmp_path / "spill.jsonl")
+    line = '{"event_type": "appeal_updated", "user_id": null, "appeal_id": 1, "event_metadata": {}, "created_at": "2024-05-01T12:00:00+00:00"}\n'
+    dead_pid = 2 ** 22 + 1  # больше pid_max Linux
+    live = tmp_path / f"spill.{os.getppid()}.jsonl"
+    (tmp_path / f"spill.{dead_pid}.jsonl").write_text(line * 2)
+    (tmp_path / f"spill.replay-{dead_pid}.jsonl").write_text(line)
+    live.write_text(line)
+
+    sink = AnalyticsEventSink(max_size=2, batch_size=100, overflow="spill", spill_path=spill_path)
+    await sink.start()
+    await sink.stop()
+
+    assert await count_events(sessions) == 2  # сколько поместилось в буфер
+    assert live.read_text() == line
+    assert (tmp_path / f"spill.{os.getpid()}.jsonl").read_text() == line  # остаток — при следующем старте
+    assert len(list(tmp_path.iterdir())) == 2
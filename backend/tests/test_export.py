@@ -0,0 +1,166 @@
+import csv
+import io
+import json
+from datetime import datetime, timedelta, timezone
+import pytest
+from openpyxl import load_workbook
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from app.core.config import settings
+from app.core.database import Base
+from app.models import *  # noqa: F401,F403 — все таблицы для create_all
+from app.models.appeal import Appeal, AppealCategory, AppealPriority, AppealStatus
+from app.models.export_job import ExportStatus
+from app.services import export_service as export_module
+from app.services.export_service import AppealExport, export_service
+from app.services.report_service import render_dashboard_pdf
+
+NOW = datetime(2024, 5, 1, 12, 0, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+async def sessions(monkeypatch, tmp_path):
+    engine = create_async_engine("sqlite+aiosqlite://")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with factory() as db:
+        await db.execute(insert(Appeal), [
+            {
+                "title": title,
+                "description": f"Описание {i}",
+                "category": AppealCategory.ROADS,
+                "priority": AppealPriority.MEDIUM,
+                "status": AppealStatus.RESOLVED if i % 2 else AppealStatus.PENDING,
+                "latitude": 55.75,
+                "longitude": 37.61,
+                "user_id": 1 + i % 2,
+                "created_at": NOW + timedelta(hours=i),
+                "images": []
+            }
+            for i, title in enumerate(["Яма", "=1+2", "Фонарь", "Двор, у дома", "Свалка"])
+        ])
+        await db.commit()
+
+    async def session_factory(user_id=None):
+        return factory
+
+    monkeypatch.setattr(export_module, "AsyncSessionLocal", factory)
+    monkeypatch.setattr(export_module.replica_router, "session_factory", session_factory)
+    monkeypatch.setattr(settings, "EXPORT_DIR", str(tmp_path / "exports"))
+    monkeypatch.setattr(settings, "EXPORT_FETCH_SIZE", 2)
+    yield factory
+    await engine.dispose()
+
+
+async def collect(export: AppealExport, sessions):
+    """(содержимое файла, число частей)"""
+    chunks = [chunk async for chunk in export.chunks(sessions)]
+    return b"".join(chunks), len(chunks)
+
+
+async def test_csv_export_streams_batches_with_filters(sessions):
+    export = AppealExport("csv", status=AppealStatus.PENDING)
+
+    content, chunks = await collect(export, sessions)
+
+    rows = list(csv.DictReader(io.StringIO(content.decode("utf-8-sig"))))
+    assert [row["title"] for row in rows] == ["Свалка", "Фонарь", "Яма"]  # новые первыми
+    assert rows[0]["created_at"].startswith("2024-05-01T16:00:00")
+    assert export.rows == 3
+    assert chunks == 2  # по EXPORT_FETCH_SIZE строк
+
+
+async def test_csv_and_xlsx_do_not_export_formulas(sessions, tmp_path):
+    content, _ = await collect(AppealExport("csv", user_id=2), sessions)
+    titles = [row["title"] for row in csv.DictReader(io.StringIO(content.decode("utf-8-sig")))]
+    assert titles == ["Двор, у дома", "'=1+2"]
+
+    content, _ = await collect(AppealExport("xlsx", user_id=2), sessions)
+    sheet = load_workbook(io.BytesIO(content)).active
+    rows = [[cell.value for cell in row] for row in sheet.iter_rows()]
+    assert rows[0][:3] == ["id", "title", "description"]
+    assert [row[1] for row in rows[1:]] == ["Двор, у дома", "=1+2"]
+    assert all(cell.data_type == "s" for cell in sheet["B"])
+    assert rows[1][10] == datetime(2024, 5, 1, 15, 0)
+    assert not list((tmp_path / "exports").iterdir())  # временный файл удален
+
+
+async def test_jsonl_export(sessions):
+    content, _ = await collect(AppealExport("jsonl", status=AppealStatus.RESOLVED), sessions)
+    rows = [json.loads(line) for line in content.decode("utf-8").splitlines()]
+    assert [(row["title"], row["status"], row["category"]) for row in rows] == [
+        ("Двор, у дома", "resolved", "roads"),
+        ("=1+2", "resolved", "roads"),
+    ]
+
+
+def test_unknown_format_and_category_are_rejected():
+    with pytest.raises(ValueError):
+        AppealExport("pdf")
+    with pytest.raises(ValueError):
+        AppealExport("csv", category="potholes")
+
+
+async def test_background_export_writes_downloadable_file(sessions):
+    async with sessions() as db:
+        job = await export_service.create_job(db, user_id=1, kind="appeals", fmt="jsonl")
+
+    job = await export_service.run(job.id)
+
+    assert job.status == ExportStatus.COMPLETED
+    assert job.download_ready
+    assert job.rows_done == 5
+    with open(job.path, "rb") as file:
+        assert len(file.read().splitlines()) == 5
+    assert job.size > 0 and job.filename.endswith(".jsonl")
+
+
+async def test_expired_export_files_are_removed(sessions):
+    async with sessions() as db:
+        job = await export_service.create_job(db, user_id=1, kind="appeals")
+    job = await export_service.run(job.id)
+    async with sessions() as db:
+        job = await export_service.get_job(db, job.id)
+        job.expires_at = datetime.now(timezone.utc) - timedelta(seconds=1)
+        await db.commit()
+
+        assert await export_service.purge_expired(db) == 1
+        job = await export_service.get_job(db, job.id)
+    assert not job.download_ready
+
+
+async def test_crashed_export_is_marked_failed(sessions):
+    async with sessions() as db:
+        job = await export_service.create_job(db, user_id=1, kind="appeals")
+        running = await export_service.create_job(db, user_id=1, kind="appeals")
+        job.status = running.status = ExportStatus.RUNNING
+        job.updated_at = datetime.now(timezone.utc) - timedelta(seconds=settings.EXPORT_STALE_AFTER + 1)
+        running.updated_at = datetime.now(timezone.utc)
+        await db.commit()
+
+        assert await export_service.fail_stale(db) == 1
+        job = await export_service.get_job(db, job.id)
+        running = await export_service.get_job(db, running.id)
+    assert (job.status, job.error) == (ExportStatus.FAILED, "Interrupted")
+    assert running.status == ExportStatus.RUNNING
+
+
+async def test_run_of_missing_job_returns_none(sessions):
+    assert await export_service.run(404) is None
+
+
+def test_dashboard_report_is_pdf():
+    stats = {
+        "total_appeals": 10,
+        "appeals_by_status": {"pending": 4, "resolved": 6},
+        "appeals_by_category": {"roads": 10},
+        "appeals_by_priority": {"medium": 10},
+        "average_resolution_time": 12.5,
+        "resolution_rate": 60.0,
+        "appeals_timeline": [{"date": "2024-05-01", "count": 10}],
+        "top_districts": [{"district": "Центральный", "count": 10}],
+        "sentiment_distribution": {"negative": 10}
+    }
+    content = render_dashboard_pdf(stats, 30)
+    assert content.startswith(b"%PDF")
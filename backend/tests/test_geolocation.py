@@ -0,0 +1,234 @@
+import asyncio
+from types import SimpleNamespace
+import numpy as np
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from app.core import geohash
+from app.core.config import settings
+from app.core.database import Base
+from app.models import *  # noqa: F401,F403 — все таблицы для create_all
+from app.models.appeal import Appeal, AppealCategory
+from app.services.appeal_service import AppealService, encode_geohash
+from app.services import geolocation_service
+from app.services.district_resolver import DistrictResolver
+from app.services.geolocation_service import GeolocationService, RateLimiter
+
+
+def test_geohash_known_value_and_round_trip():
+    assert geohash.encode(42.6, -5.6, 5) == "ezs42"
+    lat, lon = geohash.decode(geohash.encode(55.7558, 37.6173, 9))
+    assert abs(lat - 55.7558) < 1e-4
+    assert abs(lon - 37.6173) < 1e-4
+
+
+def test_geohash_neighbors_are_adjacent():
+    cell = geohash.encode(55.7558, 37.6173, 6)
+    neighbors = geohash.neighbors(cell)
+    assert len(neighbors) == 8
+    assert cell not in neighbors
+    assert all(len(n) == 6 for n in neighbors)
+
+
+def _square(x0, y0, x1, y1):
+    return [[x0, y0], [x1, y0], [x1, y1], [x0, y1], [x0, y0]]
+
+
+DISTRICTS = {
+    "type": "FeatureCollection",
+    "features": [
+        {
+            "type": "Feature",
+            "properties": {"name": "Центральный"},
+            "geometry": {
+                "type": "Polygon",
+                "coordinates": [_square(37.0, 55.0, 37.1, 55.1), _square(37.04, 55.04, 37.06, 55.06)]
+            }
+        },
+        {
+            "type": "Feature",
+            "properties": {"name": "Островной"},
+            "geometry": {
+                "type": "MultiPolygon",
+                "coordinates": [
+                    [_square(37.04, 55.04, 37.06, 55.06)],
+                    [_square(37.2, 55.0, 37.3, 55.1)]
+                ]
+            }
+        }
+    ]
+}
+
+
+def test_district_resolver_polygons_holes_and_multipolygons():
+    resolver = DistrictResolver.from_geojson(DISTRICTS)
+
+    assert resolver.resolve(55.02, 37.02) == "Центральный"
+    assert resolver.resolve(55.05, 37.05) == "Островной"  # дыра первого района
+    assert resolver.resolve(55.05, 37.25) == "Островной"
+    assert resolver.resolve(55.05, 37.15) is None
+
+
+class FakeGeolocator:
+    def __init__(self):
+        self.calls = 0
+
+    def reverse(self, query, language=None):
+        self.calls += 1
+        return SimpleNamespace(
+            address="ул. Ленина, 1",
+            raw={"address": {"city_district": "Ленинский"}}
+        )
+
+
+@pytest.fixture
+def geolocation(monkeypatch):
+    monkeypatch.setattr(geolocation_service, "_rate_limiter", RateLimiter(0))
+    monkeypatch.setattr(geolocation_service, "_district_resolver", None)
+    monkeypatch.setattr(geolocation_service, "_district_resolver_loaded", True)
+    geolocation_service._reverse_cache.clear()
+    service = GeolocationService()
+    service.geolocator = FakeGeolocator()
+    yield service
+    geolocation_service._reverse_cache.clear()
+
+
+async def test_reverse_geocoding_is_shared_per_cell(geolocation):
+    district, address = await geolocation.resolve_location(55.75580, 37.61730)
+    assert (district, address) == ("Ленинский", "ул. Ленина, 1")
+
+    await geolocation.get_district(55.75581, 37.61731)  # та же ячейка geohash
+    assert geolocation.geolocator.calls == 1
+
+    # одновременные запросы к одной ячейке ждут общий результат
+    geolocation_service._reverse_cache.clear()
+    results = await asyncio.gather(
+        geolocation.get_district(55.75581, 37.61731),
+        geolocation.get_address_from_coordinates(55.75581, 37.61731)
+    )
+    assert results == ["Ленинский", "ул. Ленина, 1"]
+    assert geolocation.geolocator.calls == 2
+
+
+async def test_cancelled_leader_does_not_cancel_followers(geolocation, monkeypatch):
+    started = asyncio.Event()
+    release = asyncio.Event()
+    remote = geolocation._reverse_remote
+
+    async def slow_remote(latitude, longitude):
+        started.set()
+        await release.wait()
+        return await remote(latitude, longitude)
+
+    monkeypatch.setattr(geolocation, "_reverse_remote", slow_remote)
+    leader = asyncio.create_task(geolocation.get_district(55.75581, 37.61731))
+    await started.wait()
+    follower = asyncio.create_task(geolocation.get_district(55.75581, 37.61731))
+    await asyncio.sleep(0)
+
+    leader.cancel()
+    release.set()
+
+    assert await follower == "Ленинский"
+    with pytest.raises(asyncio.CancelledError):
+        await leader
+    assert geolocation.geolocator.calls == 1
+
+
+async def test_offline_district_skips_network(geolocation, monkeypatch):
+    monkeypatch.setattr(
+        geolocation_service, "_district_resolver", DistrictResolver.from_geojson(DISTRICTS)
+    )
+
+    district, address = await geolocation.resolve_location(55.02, 37.02, need_address=False)
+    assert (district, address) == ("Центральный", None)
+    assert await geolocation.get_district(55.02, 37.02) == "Центральный"
+    assert geolocation.geolocator.calls == 0
+
+
+def test_geohash_cover_contains_area_corners():
+    prefixes = geohash.cover(55.70, 37.50, 55.80, 37.70, max_precision=9, max_cells=16)
+    assert 1 <= len(prefixes) <= 16
+    for lat, lon in [(55.70, 37.50), (55.80, 37.70), (55.75, 37.60)]:
+        assert any(geohash.encode(lat, lon, 9).startswith(p) for p in prefixes)
+
+
+def test_haversine_matches_known_distance():
+    distances = geolocation_service.haversine_km(
+        55.7558, 37.6173, np.array([59.9343, 55.7558]), np.array([30.3351, 37.6173])
+    )
+    assert abs(distances[0] - 634) < 2  # Москва — Санкт-Петербург
+    assert distances[1] == 0
+
+
+def test_parse_bbox_validates_order():
+    assert geolocation_service.parse_bbox("37.5,55.7,37.7,55.8") == (55.7, 37.5, 55.8, 37.7)
+    with pytest.raises(ValueError):
+        geolocation_service.parse_bbox("37.7,55.7,37.5,55.8")
+    with pytest.raises(ValueError):
+        geolocation_service.parse_bbox("37.5,55.7")
+
+
+async def test_nearby_orders_by_distance_and_filters_radius():
+    engine = create_async_engine("sqlite+aiosqlite://")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    service = AppealService()
+    points = {"center": (55.7558, 37.6173), "near": (55.7600, 37.6200), "far": (55.8500, 37.6173)}
+    async with AsyncSession(engine, expire_on_commit=False) as db:
+        for title, (lat, lon) in points.items():
+            db.add(Appeal(
+                title=title,
+                description="Описание обращения",
+                category=AppealCategory.ROADS,
+                latitude=lat,
+                longitude=lon,
+                geohash=encode_geohash(lat, lon),
+                user_id=1
+            ))
+        await db.commit()
+
+        found = await service.get_nearby(db, 55.7558, 37.6173, radius_km=2.0)
+        assert [appeal.title for appeal, _ in found] == ["center", "near"]
+        assert found[0][1] < 0.01 < found[1][1] < 1.0
+
+        found = await service.get_in_bbox(db, (55.70, 37.50, 55.90, 37.70), limit=2)
+        assert len(found) == 2
+    await engine.dispose()
+
+
+def test_radius_bbox_is_split_at_antimeridian():
+    bbox = geolocation_service.radius_bbox(65.0, 179.9, 20.0)
+    assert bbox[3] > 180
+
+    parts = geolocation_service.split_antimeridian(bbox)
+    assert [shift for _, shift in parts] == [0.0, -360.0]
+    assert parts[0][0][1:4:2] == (bbox[1], 180.0)
+    assert parts[1][0][1] == -180.0 and parts[1][0][3] == pytest.approx(bbox[3] - 360)
+
+
+async def test_nearby_across_antimeridian_and_candidate_cap(monkeypatch):
+    engine = create_async_engine("sqlite+aiosqlite://")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    service = AppealService()
+    points = {"west": (65.0, 179.95), "east": (65.0, -179.95), "far": (65.0, 179.6)}
+    async with AsyncSession(engine, expire_on_commit=False) as db:
+        for title, (lat, lon) in points.items():
+            db.add(Appeal(
+                title=title,
+                description="Описание обращения",
+                category=AppealCategory.ROADS,
+                latitude=lat,
+                longitude=lon,
+                geohash=encode_geohash(lat, lon),
+                user_id=1
+            ))
+        await db.commit()
+
+        found = await service.get_nearby(db, 65.0, 179.99, radius_km=10.0)
+        assert [appeal.title for appeal, _ in found] == ["west", "east"]
+
+        monkeypatch.setattr(settings, "GEO_QUERY_MAX_CANDIDATES", 1)
+        found = await service.get_in_bbox(db, (64.9, 179.5, 65.1, 180.0), limit=1)
+        assert [appeal.title for appeal, _ in found] == ["far"]  # LIMIT берет ближайшего к центру, а не первого по id
+    await engine.dispose()
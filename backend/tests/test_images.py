@@ -0,0 +1,65 @@
+import os
+from PIL import Image, TiffImagePlugin
+from app.core.config import settings
+from app.services.image_service import process_image, read_gps, image_format
+
+
+def make_photo(path, size=(800, 600), gps=None):
+    exif = Image.Exif()
+    exif[0x010F] = "Camera"  # Make
+    if gps:
+        lat, lon = gps
+        ifd = exif.get_ifd(0x8825)
+        ifd[1] = "N" if lat >= 0 else "S"
+        ifd[2] = tuple(TiffImagePlugin.IFDRational(v) for v in (abs(lat), 0, 0))
+        ifd[3] = "E" if lon >= 0 else "W"
+        ifd[4] = tuple(TiffImagePlugin.IFDRational(v) for v in (abs(lon), 0, 0))
+    Image.new("RGB", size, (200, 100, 50)).save(path, "JPEG", exif=exif)
+
+
+def test_variants_are_resized_and_stripped(tmp_path):
+    path = str(tmp_path / "photo.jpg")
+    make_photo(path, gps=(55.75, -37.5))
+
+    result = process_image(path)
+
+    assert set(result.variants) == set(settings.IMAGE_VARIANTS)
+    assert result.gps == (55.75, -37.5)
+    fmt, extension = image_format()
+    for name, variant_path in result.variants.items():
+        assert variant_path.endswith(f"_{name}.{extension}")
+        with Image.open(variant_path) as variant:
+            assert max(variant.size) == min(settings.IMAGE_VARIANTS[name], 800)
+            assert len(variant.getexif()) == 0
+    assert not any(name.endswith(".tmp") for name in os.listdir(tmp_path))
+
+
+def test_photo_without_gps_and_non_image(tmp_path):
+    path = str(tmp_path / "photo.jpg")
+    make_photo(path)
+    with Image.open(path) as image:
+        assert read_gps(image) is None
+
+    text = tmp_path / "notes.jpg"
+    text.write_text("не изображение")
+    assert process_image(str(text)) is None
+
+
+def test_original_is_rewritten_without_metadata(tmp_path):
+    path = str(tmp_path / "photo.jpg")
+    exif = Image.Exif()
+    exif[0x0112] = 6  # Orientation: повернуть на 90°
+    gps = exif.get_ifd(0x8825)
+    gps.update({1: "N", 2: (55, 45, 0), 3: "E", 4: (37, 37, 0)})
+    Image.new("RGB", (800, 600), (200, 100, 50)).save(path, "JPEG", exif=exif)
+
+    result = process_image(path)
+
+    assert result.gps is not None
+    with Image.open(path) as original:
+        assert len(original.getexif()) == 0
+        assert original.size == (600, 800)
+    modified = os.path.getmtime(path)
+    process_image(path)  # без метаданных файл больше не перезаписывается
+    assert os.path.getmtime(path) == modified
+    assert not any(name.endswith(".tmp") for name in os.listdir(tmp_path))
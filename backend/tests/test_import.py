@@ -0,0 +1,147 @@
+import json
+import pytest
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from app.core.database import Base
+from app.models import *  # noqa: F401,F403 — все таблицы для create_all
+from app.models.analytics import AppealStatsDaily
+from app.models.appeal import Appeal, AppealCategory, AppealStatus
+from app.models.import_job import ImportStatus
+from app.services import import_service as import_module
+from app.services.import_service import ImportReader, import_service
+
+
+@pytest.fixture
+async def sessions(monkeypatch):
+    engine = create_async_engine("sqlite+aiosqlite://")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    monkeypatch.setattr(import_module, "AsyncSessionLocal", factory)
+    yield factory
+    await engine.dispose()
+
+
+async def create_job(sessions, path, fmt, batch_size=2):
+    async with sessions() as db:
+        return await import_service.create_job(db, str(path), user_id=1, fmt=fmt, batch_size=batch_size)
+
+
+async def totals(sessions):
+    """(обращений в таблице, обращений в свертке дашборда)"""
+    async with sessions() as db:
+        appeals = (await db.execute(select(func.count(Appeal.id)))).scalar()
+        counted = (await db.execute(select(func.sum(AppealStatsDaily.count)))).scalar() or 0
+    return appeals, counted
+
+
+def test_csv_reader_sniffs_semicolon_and_tracks_position(tmp_path):
+    path = tmp_path / "a.csv"
+    path.write_bytes("\ufefftitle;description;latitude\nЯма;Яма во дворе;55,75\n".encode("utf-8"))
+    reader = ImportReader(str(path), "csv")
+    try:
+        assert reader.read(10) == [(2, {"title": "Яма", "description": "Яма во дворе", "latitude": "55,75"})]
+        assert reader.position == path.stat().st_size
+    finally:
+        reader.close()
+
+
+async def test_csv_import_skips_bad_rows_and_updates_stats(sessions, tmp_path):
+    path = tmp_path / "appeals.csv"
+    path.write_text(
+        "title;description;category;status;latitude;longitude;created_at\n"
+        "Яма на дороге;Большая яма на асфальте;;;55,75;37,61;2024-05-01T10:00:00\n"
+        "Не горит фонарь;Темно во дворе;lighting;resolved;;;\n"
+        ";Нет заголовка;;;;;\n"
+        "Фонарь;Без долготы;;;55.7;;\n"
+        "Мусор;Свалка у дома;unknown;nonsense;;;\n",
+        encoding="utf-8"
+    )
+    job = await create_job(sessions, path, "csv")
+
+    job = await import_service.run(job.id)
+
+    assert job.status == ImportStatus.COMPLETED
+    assert (job.rows_done, job.inserted, job.failed) == (5, 2, 3)
+    assert job.bytes_done == job.bytes_total
+    assert [error["line"] for error in job.errors] == [4, 5, 6]
+    async with sessions() as db:
+        appeals = (await db.execute(select(Appeal).order_by(Appeal.id))).scalars().all()
+    assert appeals[0].category == AppealCategory.ROADS  # по правилам
+    assert appeals[0].geohash is not None
+    assert (appeals[1].category, appeals[1].status) == (AppealCategory.LIGHTING, AppealStatus.RESOLVED)
+    assert await totals(sessions) == (2, 2)
+
+
+async def test_interrupted_import_resumes_without_duplicates(sessions, tmp_path):
+    path = tmp_path / "appeals.jsonl"
+    lines = [json.dumps({"title": f"Яма {i}", "description": "Яма на дороге"}, ensure_ascii=False) for i in range(5)]
+    path.write_text("\n".join(lines[:2] + ["{broken"] + lines[2:]) + "\n", encoding="utf-8")
+    job = await create_job(sessions, path, "jsonl")
+
+    def crash(progress):
+        raise RuntimeError("worker crashed")
+
+    with pytest.raises(RuntimeError):
+        await import_service.run(job.id, progress=crash)
+    async with sessions() as db:
+        job = await import_service.get_job(db, job.id)
+    assert (job.status, job.rows_done) == (ImportStatus.FAILED, 2)
+
+    job = await import_service.run(job.id)
+
+    assert job.status == ImportStatus.COMPLETED
+    assert (job.rows_done, job.inserted, job.failed) == (6, 5, 1)
+    assert job.errors[0]["line"] == 3
+    assert await totals(sessions) == (5, 5)
+
+    with pytest.raises(ValueError):
+        await import_service.run(job.id)
+
+
+async def test_cancel_stops_after_current_batch(sessions, tmp_path):
+    path = tmp_path / "appeals.jsonl"
+    path.write_text(
+        "".join(json.dumps({"title": "Яма", "description": f"Яма {i}"}) + "\n" for i in range(6)),
+        encoding="utf-8"
+    )
+    job = await create_job(sessions, path, "jsonl")
+    job = await import_service.claim(job.id)
+    async with sessions() as db:
+        await import_service.request_cancel(db, job.id)
+
+    job = await import_service.process(job)
+
+    assert (job.status, job.inserted) == (ImportStatus.CANCELLED, 2)
+
+
+async def test_taken_over_job_does_not_write_batches(sessions, tmp_path, monkeypatch):
+    path = tmp_path / "appeals.jsonl"
+    path.write_text(
+        "".join(json.dumps({"title": "Яма", "description": f"Яма {i}"}) + "\n" for i in range(4)),
+        encoding="utf-8"
+    )
+    job = await create_job(sessions, path, "jsonl")
+    stalled = await import_service.claim(job.id)
+    monkeypatch.setattr(import_module.settings, "IMPORT_STALE_AFTER", -1)  # первый процесс «завис»
+    current = await import_service.claim(job.id)
+    assert current.owner != stalled.owner
+
+    job = await import_service.process(stalled)
+
+    assert (job.status, job.owner, job.inserted) == (ImportStatus.RUNNING, current.owner, 0)
+    assert await totals(sessions) == (0, 0)
+    job = await import_service.process(current)
+    assert (job.status, job.inserted) == (ImportStatus.COMPLETED, 4)
+
+
+async def test_claim_requires_file_on_this_node(sessions, tmp_path):
+    path = tmp_path / "appeals.jsonl"
+    path.write_text(json.dumps({"title": "Яма", "description": "Яма"}) + "\n", encoding="utf-8")
+    job = await create_job(sessions, path, "jsonl")
+    path.unlink()
+
+    with pytest.raises(ValueError):
+        await import_service.claim(job.id)
+    async with sessions() as db:
+        assert (await import_service.get_job(db, job.id)).status == ImportStatus.PENDING
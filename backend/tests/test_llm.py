@@ -0,0 +1,52 @@
+import httpx
+import pytest
+from app.ai import llm
+from app.ai.combined import CombinedAnalyzer, analysis_cache
+from app.core.config import settings
+from app.models.appeal import AppealCategory, AppealPriority
+from tests import mock_llm
+
+
+@pytest.fixture
+async def mock_llm_client(monkeypatch):
+    monkeypatch.setattr(settings, "OPENAI_API_KEY", "test-key")
+    monkeypatch.setattr(settings, "OPENAI_BASE_URL", "http://mock-llm/v1")
+    mock_llm.calls["count"] = 0
+    await analysis_cache.invalidate()
+    await llm.close_llm_client()
+    llm.init_llm_client(
+        http_client=httpx.AsyncClient(app=mock_llm.app, base_url="http://mock-llm")
+    )
+    yield
+    await llm.close_llm_client()
+
+
+async def test_combined_analysis_makes_single_request(mock_llm_client):
+    result = await CombinedAnalyzer().analyze_appeal(
+        "Яма на дороге",
+        "Срочно заделайте яму у дома 5"
+    )
+
+    assert mock_llm.calls["count"] == 1
+    assert result["category"] == AppealCategory.ROADS
+    assert result["priority"] == AppealPriority.URGENT
+    assert result["sentiment"] == "negative"
+    assert result["summary"] == "Тестовое резюме"
+
+
+async def test_client_is_shared(mock_llm_client):
+    assert llm.get_llm_client() is llm.get_llm_client()
+
+
+async def test_combined_analysis_falls_back_to_rules(monkeypatch):
+    monkeypatch.setattr(settings, "OPENAI_API_KEY", "")
+    await llm.close_llm_client()
+
+    result = await CombinedAnalyzer().analyze_appeal(
+        "Не работает фонарь",
+        "Во дворе темно, фонарь не работает уже неделю"
+    )
+
+    assert result["category"] == AppealCategory.LIGHTING
+    assert result["priority"] == AppealPriority.HIGH
+    assert result["sentiment"] == "negative"
@@ -0,0 +1,65 @@
+import httpx
+from fastapi import FastAPI, HTTPException
+from app.ai import combined
+from app.core.config import settings
+from app.core.metrics import HTTP_LATENCY, HTTP_REQUESTS, LLM_FALLBACKS, MetricsMiddleware, Registry
+from app.models.appeal import AppealCategory
+
+
+def test_render_counter_and_histogram():
+    registry = Registry()
+    requests = registry.counter("jobs", "Jobs", ("kind",))
+    latency = registry.histogram("job_seconds", "Job latency", ("kind",), buckets=(0.1, 1.0))
+    requests.inc(kind="import")
+    requests.inc(2, kind="import")
+    latency.observe(0.05, kind="import")
+    latency.observe(0.5, kind="import")
+    latency.observe(5, kind="import")
+
+    text = registry.render()
+
+    assert "# TYPE jobs_total counter" in text
+    assert 'jobs_total{kind="import"} 3' in text
+    assert 'job_seconds_bucket{kind="import",le="0.1"} 1' in text
+    assert 'job_seconds_bucket{kind="import",le="1"} 2' in text
+    assert 'job_seconds_bucket{kind="import",le="+Inf"} 3' in text
+    assert 'job_seconds_count{kind="import"} 3' in text
+    assert text.endswith("\n")
+
+
+async def test_middleware_labels_by_route_template():
+    app = FastAPI()
+    app.add_middleware(MetricsMiddleware)
+
+    @app.get("/things/{thing_id}")
+    async def get_thing(thing_id: int):
+        if thing_id == 0:
+            raise HTTPException(status_code=404, detail="Not found")
+        return {"id": thing_id}
+
+    before = HTTP_REQUESTS.value(method="GET", route="/things/{thing_id}", status="200")
+    async with httpx.AsyncClient(app=app, base_url="http://test") as client:
+        for thing_id in (1, 2, 3):
+            assert (await client.get(f"/things/{thing_id}")).status_code == 200
+        assert (await client.get("/things/0")).status_code == 404
+        assert (await client.get("/missing")).status_code == 404
+
+    assert HTTP_REQUESTS.value(method="GET", route="/things/{thing_id}", status="200") == before + 3
+    assert HTTP_REQUESTS.value(method="GET", route="/things/{thing_id}", status="404") >= 1
+    assert HTTP_REQUESTS.value(method="GET", route="unmatched", status="404") >= 1
+    assert HTTP_LATENCY.count(method="GET", route="/things/{thing_id}") >= 4
+
+
+async def test_llm_fallback_is_counted(monkeypatch):
+    async def failing_chat_json(*args, **kwargs):
+        raise RuntimeError("model is unavailable")
+
+    monkeypatch.setattr(settings, "OPENAI_API_KEY", "test-key")
+    monkeypatch.setattr(combined, "chat_json", failing_chat_json)
+    await combined.analysis_cache.invalidate()
+    before = LLM_FALLBACKS.value(operation="analysis")
+
+    result = await combined.CombinedAnalyzer().analyze_appeal("Не работает фонарь", "Во дворе темно уже неделю")
+
+    assert result["category"] == AppealCategory.LIGHTING
+    assert LLM_FALLBACKS.value(operation="analysis") == before + 1
@@ -0,0 +1,31 @@
+from app.ai import minhash
+from app.ai.classifier import AIClassifier
+
+
+def test_similar_texts_share_lsh_buckets():
+    a = minhash.signature("Огромная яма на дороге у дома 5 по улице Ленина, машины объезжают")
+    b = minhash.signature("Огромная яма на дороге возле дома 5 по улице Ленина, машины объезжают")
+    c = minhash.signature("Во дворе не работает фонарь, вечером очень темно")
+
+    assert len(a) == minhash.NUM_PERM
+    assert minhash.similarity(a, b) > 0.5
+    assert minhash.similarity(a, c) < 0.2
+    assert set(minhash.band_keys(a)) & set(minhash.band_keys(b))
+
+
+def test_signature_is_deterministic_and_case_insensitive():
+    assert minhash.signature("Яма на дороге") == minhash.signature("яма  на ДОРОГЕ")
+    assert minhash.signature("...") == []
+    assert minhash.band_keys([]) == []
+
+
+async def test_detect_duplicate_returns_best_match():
+    idx = await AIClassifier().detect_duplicate(
+        "Огромная яма на дороге у дома 5 по улице Ленина",
+        [
+            "Не работает фонарь во дворе",
+            "Огромная яма на дороге у дома 5 на улице Ленина",
+        ]
+    )
+
+    assert idx == 1
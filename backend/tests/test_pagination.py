@@ -0,0 +1,106 @@
+import base64
+from datetime import datetime, timezone
+import httpx
+import pytest
+from fastapi import FastAPI
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from app.api.v1 import appeals
+from app.core.database import Base
+from app.core.dependencies import get_current_active_user, get_read_db
+from app.core.principals import Principal
+from app.models import *  # noqa: F401,F403 — все таблицы для create_all
+from app.models.appeal import Appeal, AppealCategory, AppealPriority, AppealStatus
+from app.models.user import UserRole
+from app.services.appeal_service import encode_cursor, decode_cursor
+
+
+def test_cursor_round_trip():
+    created_at = datetime(2024, 5, 1, 12, 30, 15, 123456, tzinfo=timezone.utc)
+    cursor = encode_cursor(Appeal(id=42, created_at=created_at))
+
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == (created_at, 42)
+
+
+def test_invalid_cursor_raises_value_error():
+    with pytest.raises(ValueError):
+        decode_cursor("not-a-cursor")
+
+
+@pytest.fixture
+async def client():
+    engine = create_async_engine("sqlite+aiosqlite://")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    created_at = datetime(2024, 5, 1, 12, 0, tzinfo=timezone.utc)
+    async with factory() as db:
+        # Пять обращений с одинаковым created_at: порядок определяется id
+        await db.execute(insert(Appeal), [
+            {
+                "title": f"Обращение {i}",
+                "description": "Яма на проезжей части",
+                "category": AppealCategory.ROADS,
+                "priority": AppealPriority.MEDIUM,
+                "status": AppealStatus.PENDING,
+                "latitude": 55.75,
+                "longitude": 37.61,
+                "user_id": 1,
+                "created_at": created_at,
+                "images": []
+            }
+            for i in range(5)
+        ])
+        await db.commit()
+
+    async def read_db():
+        async with factory() as session:
+            yield session
+
+    app = FastAPI()
+    app.include_router(appeals.router, prefix="/appeals")
+    app.dependency_overrides[get_read_db] = read_db
+    app.dependency_overrides[get_current_active_user] = lambda: Principal(
+        id=1, email="admin@example.com", role=UserRole.ADMIN, is_active=True, is_admin=True
+    )
+    async with httpx.AsyncClient(app=app, base_url="http://test") as client:
+        yield client
+    await engine.dispose()
+
+
+async def test_cursor_pages_are_stable_for_equal_created_at(client):
+    seen = []
+    cursor = None
+    for _ in range(3):
+        params = {"size": 2, **({"cursor": cursor} if cursor else {})}
+        response = await client.get("/appeals", params=params)
+        assert response.status_code == 200
+        body = response.json()
+        seen += [item["id"] for item in body["items"]]
+        cursor = body["next_cursor"]
+
+    assert seen == [5, 4, 3, 2, 1]
+    assert cursor is None  # последняя страница
+    assert body["total"] is None
+
+
+async def test_full_last_page_has_no_next_cursor(client):
+    response = await client.get("/appeals", params={"size": 5})
+    body = response.json()
+
+    assert len(body["items"]) == 5
+    assert body["next_cursor"] is None
+    assert body["total"] == 5
+
+
+@pytest.mark.parametrize("cursor", [
+    "not-a-cursor",
+    base64.urlsafe_b64encode(b'["2024-05-01T12:00:00+00:00", "x"]').decode(),
+    base64.urlsafe_b64encode(b'{"id": 1}').decode(),
+])
+async def test_invalid_cursor_returns_400(client, cursor):
+    response = await client.get("/appeals", params={"cursor": cursor})
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid cursor"
@@ -0,0 +1,27 @@
+import pytest
+from sqlalchemy import exc, text
+from sqlalchemy.ext.asyncio import create_async_engine
+from app.core.database import InstrumentedPool, pool_stats
+
+
+async def test_instrumented_pool_counts_waits_and_timeouts(tmp_path):
+    engine = create_async_engine(
+        f"sqlite+aiosqlite:///{tmp_path / 'pool.db'}",
+        poolclass=InstrumentedPool,
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=0.05
+    )
+    waits, timeouts = pool_stats.wait_count, pool_stats.timeouts
+    try:
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+            with pytest.raises(exc.TimeoutError):
+                async with engine.connect() as other:
+                    await other.execute(text("SELECT 1"))
+    finally:
+        await engine.dispose()
+
+    assert pool_stats.wait_count == waits + 2
+    assert pool_stats.timeouts == timeouts + 1
+    assert pool_stats.wait_max >= 0.05
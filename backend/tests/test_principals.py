@@ -0,0 +1,47 @@
+from app.core.principals import PrincipalCache
+from app.core.security import decode_access_token
+from app.models.user import User, UserRole
+from app.services.user_service import UserService
+
+
+class CountingSession:
+    """Минимальная замена AsyncSession: возвращает одного пользователя и считает запросы"""
+
+    def __init__(self, user):
+        self.user = user
+        self.queries = 0
+
+    async def execute(self, query):
+        self.queries += 1
+        return self
+
+    def scalar_one_or_none(self):
+        return self.user
+
+
+def make_user(**kwargs):
+    fields = dict(id=5, email="op@city.ru", role=UserRole.OPERATOR, is_active=True, is_admin=False)
+    fields.update(kwargs)
+    return User(**fields)
+
+
+async def test_token_does_not_carry_permissions():
+    token = await UserService().create_access_token_for_user(make_user(is_admin=True))
+    payload = decode_access_token(token)
+
+    assert payload["sub"] == "5"
+    assert "role" not in payload and "adm" not in payload  # права — только из principal
+
+
+async def test_principal_cache_hits_and_invalidation():
+    cache = PrincipalCache()
+    db = CountingSession(make_user())
+
+    assert (await cache.get(db, 5)).role == UserRole.OPERATOR
+    assert (await cache.get(db, 5)).role == UserRole.OPERATOR
+    assert db.queries == 1
+
+    db.user = make_user(is_active=False)
+    await cache.invalidate(5)
+    assert (await cache.get(db, 5)).is_active is False
+    assert db.queries == 2
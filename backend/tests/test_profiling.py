@@ -0,0 +1,94 @@
+import asyncio
+import time
+import httpx
+import pytest
+from fastapi import FastAPI
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+from app.core.profiling import ProfilingMiddleware, profiler
+
+
+@pytest.fixture
+async def client():
+    engine = create_async_engine("sqlite+aiosqlite://")
+    app = FastAPI()
+    app.add_middleware(ProfilingMiddleware)
+
+    @app.get("/slow")
+    async def slow_endpoint():
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+            await conn.execute(text("SELECT 2"))
+        deadline = time.perf_counter() + 0.1
+        while time.perf_counter() < deadline:  # работа в цикле событий
+            pass
+        await asyncio.sleep(0.1)  # ожидание
+        return {"ok": True}
+
+    @app.get("/error")
+    async def error_endpoint():
+        async with engine.connect() as conn:
+            try:
+                await conn.execute(text("SELECT * FROM missing_table"))
+            except Exception:
+                pass
+            await conn.execute(text("SELECT 1"))
+            return {"pending": len(conn.info.get("profiling_started", []))}
+
+    @app.get("/fast")
+    async def fast_endpoint():
+        return {"ok": True}
+
+    async with httpx.AsyncClient(app=app, base_url="http://test") as client:
+        yield client
+    profiler.disable()
+    profiler.clear()
+    await engine.dispose()
+
+
+async def test_disabled_profiler_records_nothing(client):
+    assert (await client.get("/slow")).status_code == 200
+    assert profiler.records() == []
+
+
+async def test_slow_request_is_captured_with_sql_and_stacks(client, monkeypatch):
+    monkeypatch.setattr(profiler, "threshold_ms", 50)
+    monkeypatch.setattr(profiler, "sample_interval", 0.005)
+    profiler.enable()
+
+    assert (await client.get("/fast")).status_code == 200
+    assert (await client.get("/slow")).status_code == 200
+
+    records = profiler.records()
+    assert [record["path"] for record in records] == ["/slow"]
+    record = profiler.get(records[0]["id"])
+    assert record["status_code"] == 200
+    assert record["duration_ms"] >= 200
+    assert [s["statement"] for s in record["statements"]] == ["SELECT 1", "SELECT 2"]
+    assert record["samples"] > 0
+    stacks = [stack["stack"] for stack in record["stacks"]]
+    assert any("slow_endpoint" in stack and not stack.startswith("(await)") for stack in stacks)
+    assert any(stack.startswith("(await)") and "slow_endpoint" in stack for stack in stacks)
+
+
+async def test_buffer_keeps_latest_requests(client, monkeypatch):
+    monkeypatch.setattr(profiler, "threshold_ms", 0)
+    profiler.enable()
+
+    for _ in range(profiler._records.maxlen + 5):
+        await client.get("/fast")
+
+    records = profiler.records()
+    assert len(records) == profiler._records.maxlen
+    assert records[0]["id"] > records[-1]["id"]
+
+
+async def test_failed_statement_does_not_leak_start_time(client, monkeypatch):
+    monkeypatch.setattr(profiler, "threshold_ms", 0)
+    profiler.enable()
+
+    response = await client.get("/error")
+
+    assert response.json() == {"pending": 0}
+    record = profiler.get(profiler.records()[0]["id"])
+    assert [s["statement"] for s in record["statements"]] == ["SELECT 1"]
@@ -0,0 +1,32 @@
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core.replicas import ReplicaRouter
+
+
+async def test_reads_go_to_fresh_replicas_only(tmp_path):
+    router = ReplicaRouter([
+        f"sqlite+aiosqlite:///{tmp_path / 'a.db'}",
+        f"sqlite+aiosqlite:///{tmp_path / 'b.db'}"
+    ])
+    fresh, lagging = router.replicas
+    try:
+        # До первой проверки реплики не используются
+        assert await router.session_factory() is AsyncSessionLocal
+
+        fresh.lag = 0.1
+        lagging.lag = settings.DB_REPLICA_MAX_LAG + 1
+        assert await router.session_factory() is fresh.sessionmaker
+        assert await router.session_factory() is fresh.sessionmaker
+    finally:
+        await router.stop()
+
+
+async def test_read_your_writes_uses_primary(tmp_path):
+    router = ReplicaRouter([f"sqlite+aiosqlite:///{tmp_path / 'a.db'}"])
+    router.replicas[0].lag = 0.0
+    try:
+        await router.mark_write(7)
+        assert await router.session_factory("7") is AsyncSessionLocal
+        assert await router.session_factory("8") is router.replicas[0].sessionmaker
+    finally:
+        await router.stop()
@@ -0,0 +1,55 @@
+from app.ai.classifier import AIClassifier
+from app.ai.analyzer import AIAnalyzer
+from app.ai.keywords import KeywordMatcher, stem
+from app.ai.rules import match_rules
+from app.models.appeal import AppealCategory, AppealPriority
+
+
+def test_stem_reduces_case_forms_to_one_stem():
+    assert stem("дорога") == stem("дороги") == stem("дорогами")
+    assert stem("яма") == stem("ямы") == stem("ямой")
+    assert stem("работает") == stem("работают")
+
+
+def test_matcher_finds_phrases_in_any_case_form():
+    matcher = KeywordMatcher({
+        "improvement": ["детская площадка"],
+        "high": ["не работает"],
+    })
+
+    found = matcher.find("На детской площадке фонари не работают")
+
+    assert found == {
+        "improvement": {"детская площадка"},
+        "high": {"не работает"},
+    }
+    assert matcher.find("не очень работает") == {}
+
+
+def test_matcher_respects_word_boundaries():
+    matcher = KeywordMatcher({"lighting": ["свет"], "roads": ["парк"]})
+
+    assert matcher.find("Рассвет над парковкой") == {}
+    assert matcher.find("Нет света в парке") == {"lighting": {"свет"}, "roads": {"парк"}}
+
+
+def test_match_rules_single_pass_results():
+    match = match_rules("Срочно! Сломанная скамейка во дворе, фонари не работают, ужасно")
+
+    assert match.category_scores[AppealCategory.IMPROVEMENT] == 2
+    assert match.category_scores[AppealCategory.LIGHTING] == 1
+    assert match.urgent
+    assert match.high
+    assert match.negative_count == 3
+    assert match.positive_count == 0
+
+
+def test_rule_classification_and_sentiment():
+    text = "Ямы на дорогах\nПосле зимы на дорогах нашего района появились огромные ямы"
+    result = AIClassifier()._classify_with_rules(text)
+
+    assert result["category"] == AppealCategory.ROADS
+    assert result["priority"] == AppealPriority.MEDIUM
+
+    assert AIClassifier()._classify_with_rules("Вопрос")["category"] == AppealCategory.OTHER
+    assert AIAnalyzer()._analyze_with_rules("Спасибо, все отлично")["sentiment"] == "positive"
@@ -0,0 +1,26 @@
+import asyncio
+import pytest
+from passlib.context import CryptContext
+from app.core.security import PasswordHasher, PasswordHasherBusy, pwd_context
+
+
+async def test_hasher_rejects_when_queue_is_full():
+    hasher = PasswordHasher(workers=1, max_pending=1)
+    first = asyncio.ensure_future(hasher.hash("secret"))
+    await asyncio.sleep(0)
+
+    with pytest.raises(PasswordHasherBusy):
+        await hasher.hash("other")
+
+    assert pwd_context.verify("secret", await first)
+    assert hasher.pending == 0
+
+
+async def test_verify_rehashes_when_cost_changes():
+    hasher = PasswordHasher(workers=1, max_pending=4)
+    old_hash = CryptContext(schemes=["bcrypt"], bcrypt__rounds=4).hash("secret")
+
+    verified, new_hash = await hasher.verify_and_update("secret", old_hash)
+    assert verified and new_hash and new_hash != old_hash
+    assert await hasher.verify_and_update("secret", new_hash) == (True, None)
+    assert (await hasher.verify_and_update("wrong", new_hash))[0] is False
@@ -0,0 +1,201 @@
+from datetime import datetime, timezone, timedelta
+import pytest
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from app.core.database import Base
+from app.models import *  # noqa: F401,F403 — все таблицы для create_all
+from app.models.analytics import AppealStatsDaily
+from app.models.appeal import Appeal, AppealStatus, AppealCategory, AppealPriority
+from app.schemas.appeal import AppealCreate, AppealUpdate
+from app.services.analytics_service import AnalyticsService
+from app.services.appeal_service import AppealService
+from app.services.enrichment_service import EnrichmentService
+from app.services.stats_service import StatsService
+
+
+def make_appeal(**kwargs):
+    fields = dict(
+        title="Яма",
+        description="Яма на дороге",
+        user_id=1,
+        status=AppealStatus.PENDING,
+        category=AppealCategory.ROADS,
+        priority=AppealPriority.MEDIUM,
+        created_at=datetime(2024, 5, 1, 23, 30, tzinfo=timezone(timedelta(hours=3)))
+    )
+    fields.update(kwargs)
+    return Appeal(**fields)
+
+
+def test_snapshot_uses_utc_day_and_empty_dimensions():
+    key = StatsService().snapshot(make_appeal())
+    assert key[0].isoformat() == "2024-05-01"
+    assert key[4:] == ("", "", None)
+
+
+def test_snapshot_counts_resolution_time_only_for_resolved():
+    stats = StatsService()
+    appeal = make_appeal(resolved_at=datetime(2024, 5, 2, 8, 30))
+    assert stats.snapshot(appeal)[6] is None
+
+    appeal.status = AppealStatus.RESOLVED
+    assert stats.snapshot(appeal)[6] == 12.0
+
+
+@pytest.fixture
+async def db():
+    engine = create_async_engine("sqlite+aiosqlite://")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with factory() as session:
+        yield session
+    await engine.dispose()
+
+
+@pytest.fixture
+async def sessions(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'stats.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    await engine.dispose()
+
+
+async def stats_rows(db):
+    result = await db.execute(
+        select(
+            AppealStatsDaily.status,
+            AppealStatsDaily.category,
+            AppealStatsDaily.count,
+            AppealStatsDaily.resolved_with_time
+        )
+        .where(AppealStatsDaily.count != 0)
+        .order_by(AppealStatsDaily.status, AppealStatsDaily.category)
+    )
+    return [tuple(row) for row in result.all()]
+
+
+async def test_move_transfers_appeal_between_buckets(db):
+    stats = StatsService()
+    appeal = make_appeal(resolved_at=datetime(2024, 5, 2, 8, 30))
+    await stats.move(db, None, stats.snapshot(appeal))
+    await stats.move(db, None, stats.snapshot(appeal))
+    before = stats.snapshot(appeal)
+
+    appeal.status = AppealStatus.RESOLVED
+    await stats.move(db, before, stats.snapshot(appeal))
+    await stats.move(db, stats.snapshot(appeal), stats.snapshot(appeal))  # без изменений
+
+    assert await stats_rows(db) == [
+        (AppealStatus.PENDING, AppealCategory.ROADS, 1, 0),
+        (AppealStatus.RESOLVED, AppealCategory.ROADS, 1, 1),
+    ]
+
+
+async def test_rebuild_matches_incremental_updates(db):
+    stats = StatsService()
+    appeals = [
+        make_appeal(created_at=datetime(2024, 5, 1, 10)),
+        make_appeal(created_at=datetime(2024, 5, 1, 11), category=AppealCategory.LIGHTING),
+        make_appeal(
+            created_at=datetime(2024, 5, 2, 9),
+            status=AppealStatus.RESOLVED,
+            resolved_at=datetime(2024, 5, 2, 15)
+        ),
+    ]
+    db.add_all(appeals)
+    await db.flush()
+    await stats.add_many(db, [stats.snapshot(appeal) for appeal in appeals])
+    await db.commit()
+    incremental = await stats_rows(db)
+
+    assert await stats.rebuild(db) == 3
+    assert await stats_rows(db) == incremental
+    hours = await db.scalar(select(func.sum(AppealStatsDaily.resolution_hours_sum)))
+    assert hours == pytest.approx(6.0)
+
+
+class StubAnalyzer:
+    async def analyze_appeal(self, title, description):
+        return {
+            "category": AppealCategory.LIGHTING,
+            "priority": AppealPriority.HIGH,
+            "summary": title,
+            "confidence": 0.9,
+            "sentiment": "negative"
+        }
+
+
+class StubGeolocation:
+    async def resolve_location(self, latitude, longitude, need_address=True):
+        return "Центральный", "ул. Ленина, 1"
+
+
+class NoEmbeddings:
+    available = False
+
+
+async def live_stats(db):
+    """Те же разрезы дашборда, посчитанные прямо по таблице обращений"""
+    stats = {"total_appeals": await db.scalar(select(func.count(Appeal.id)))}
+    for key, column in [
+        ("appeals_by_status", Appeal.status),
+        ("appeals_by_category", Appeal.category),
+        ("appeals_by_priority", Appeal.priority),
+    ]:
+        result = await db.execute(select(column, func.count(Appeal.id)).group_by(column))
+        stats[key] = {value.value: count for value, count in result.all()}
+    result = await db.execute(
+        select(Appeal.ai_sentiment, func.count(Appeal.id))
+        .where(Appeal.ai_sentiment.isnot(None))
+        .group_by(Appeal.ai_sentiment)
+    )
+    stats["sentiment_distribution"] = dict(result.all())
+    return stats
+
+
+async def test_dashboard_matches_live_aggregate_after_changes(db):
+    appeals = AppealService()
+    enrichment = EnrichmentService()
+    enrichment.combined = StubAnalyzer()
+    enrichment.geolocation = StubGeolocation()
+    enrichment.similarity = NoEmbeddings()
+
+    data = dict(description="Яма на проезжей части", latitude=55.75, longitude=37.61)
+    first = await appeals.create_appeal(db, AppealCreate(title="Яма у дома", **data), user_id=1)
+    await appeals.create_appeal(db, AppealCreate(title="Яма во дворе", **data), user_id=1)
+    await appeals.update_appeal(db, first.id, AppealUpdate(status=AppealStatus.RESOLVED))
+    await enrichment.enrich_appeal(db, first)
+
+    dashboard = await AnalyticsService().get_dashboard_stats(db)
+    live = await live_stats(db)
+    for key, value in live.items():
+        assert dashboard[key] == value, key
+    assert dashboard["appeals_by_category"] == {"roads": 1, "lighting": 1}
+
+
+async def test_update_takes_snapshot_after_concurrent_change(sessions):
+    appeals = AppealService()
+    stats = StatsService()
+    data = dict(description="Яма на проезжей части", latitude=55.75, longitude=37.61)
+    async with sessions() as db:
+        created = await appeals.create_appeal(db, AppealCreate(title="Яма у дома", **data), user_id=1)
+
+    async with sessions() as db:
+        stale = await appeals.get_appeal(db, created.id)  # прочитано до параллельной записи
+
+        async with sessions() as other:
+            appeal = await appeals.get_appeal(other, created.id)
+            before = stats.snapshot(appeal)
+            appeal.district, appeal.ai_sentiment = "Центральный", "negative"
+            await stats.move(other, before, stats.snapshot(appeal))
+            await other.commit()
+
+        updated = await appeals.update_appeal(db, stale.id, AppealUpdate(status=AppealStatus.RESOLVED))
+        assert updated.district == "Центральный"
+        dashboard = await AnalyticsService().get_dashboard_stats(db)
+        live = await live_stats(db)
+    for key, value in live.items():
+        assert dashboard[key] == value, key
+    assert dashboard["top_districts"] == [{"district": "Центральный", "count": 1}]
@@ -0,0 +1,42 @@
+import hashlib
+import io
+import os
+import pytest
+from starlette.datastructures import UploadFile
+from app.services.storage_service import StorageService, FileTooLarge
+
+
+def upload(data: bytes, filename: str = "photo.JPG") -> UploadFile:
+    return UploadFile(file=io.BytesIO(data), filename=filename)
+
+
+async def test_upload_is_content_addressed_and_deduplicated(tmp_path):
+    storage = StorageService(root=str(tmp_path), chunk_size=4)
+    data = b"jpeg-bytes" * 10
+    digest = hashlib.sha256(data).hexdigest()
+
+    first = await storage.save_upload(upload(data), max_size=1000)
+    second = await storage.save_upload(upload(data, "other.jpg"), max_size=1000)
+
+    assert first.path == f"{tmp_path}/{digest[:2]}/{digest[2:4]}/{digest}.jpg"
+    assert (first.sha256, first.size, first.deduplicated) == (digest, len(data), False)
+    assert second.path == first.path and second.deduplicated
+    with open(first.path, "rb") as f:
+        assert f.read() == data
+    assert os.listdir(tmp_path / "tmp") == []
+
+
+async def test_too_large_upload_is_rejected_without_leftovers(tmp_path):
+    storage = StorageService(root=str(tmp_path), chunk_size=4)
+
+    with pytest.raises(FileTooLarge):
+        await storage.save_upload(upload(b"x" * 100), max_size=10)
+
+    assert sorted(os.listdir(tmp_path)) == ["tmp"]
+    assert os.listdir(tmp_path / "tmp") == []
+
+
+def test_unsafe_extension_is_dropped():
+    assert StorageService.extension("../../etc/passwd") == ""
+    assert StorageService.extension("photo.tar.gz") == ".gz"
+    assert StorageService.extension("x.p/hp") == ""
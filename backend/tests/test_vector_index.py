@@ -0,0 +1,57 @@
+import numpy as np
+from app.ai.vector_index import VectorIndex
+
+
+def _data(n=2000, dim=32, seed=0):
+    rng = np.random.RandomState(seed)
+    return rng.standard_normal((n, dim)).astype(np.float32)
+
+
+def test_search_returns_nearest_neighbours():
+    vectors = _data()
+    index = VectorIndex(32)
+    index.add(list(range(len(vectors))), vectors)
+
+    query = vectors[10] + 0.01
+    result = index.search(query, k=3)
+
+    assert result[0][0] == 10
+    assert result[0][1] > 0.99
+    assert [item_id for item_id, _ in index.search(query, k=3, exclude=10)][0] != 10
+
+
+def test_approximate_search_finds_close_vectors():
+    vectors = _data(n=3000)
+    index = VectorIndex(32, exact_threshold=100)
+    index.add(list(range(len(vectors))), vectors)
+
+    hits = sum(index.search(vectors[i] * 1.5, k=1)[0][0] == i for i in range(0, 3000, 100))
+    assert hits >= 25
+
+
+def test_incremental_add_and_persistence(tmp_path):
+    vectors = _data(n=10)
+    index = VectorIndex(32)
+    index.add([1, 2, 3], vectors[:3])
+    index.add([4], vectors[3])
+    index.add([2], vectors[5])  # обновление существующего id
+    index.last_row_id = 42
+
+    path = str(tmp_path / "index.npz")
+    index.save(path)
+    loaded = VectorIndex.load(path)
+
+    assert len(loaded) == 4
+    assert loaded.last_row_id == 42
+    assert loaded.search(vectors[5], k=1)[0][0] == 2
+
+
+def test_readding_id_moves_it_between_lsh_buckets():
+    vectors = _data(n=2)
+    index = VectorIndex(32, exact_threshold=0)
+    index.add([1], vectors[0])
+    index.add([1], vectors[1])
+
+    new_hashes = index._hashes(vectors[1:2] / np.linalg.norm(vectors[1]))[:, 0]
+    assert [dict(table) for table in index._tables] == [{int(bucket): [0]} for bucket in new_hashes]
+    assert index.search(vectors[1], k=1)[0][0] == 1